@@ -380,6 +380,7 @@ def _timelapse_create_impl(
             instance_path=instance,
             skip_days=skip_days_list if skip_days_list else None,
             skip_hours=skip_hours_list if skip_hours_list else None,
+            use_index=True,
         )
 
     # Report file counts and calculate sizes
@@ -4,17 +4,25 @@ Finds recording segments overlapping a time range and concatenates them
 into a single output file.
 """
 
+import os
 import re
 import subprocess
 import tempfile
+import threading
 from collections.abc import Callable
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 
 from frigate_tools.file_list import find_recording_files
 from frigate_tools.observability import get_logger, traced_operation
-from frigate_tools.timelapse import HWAccel, get_hwaccel
+from frigate_tools.timelapse import (
+    HW_DECODE_OPTS,
+    HWAccel,
+    concat_list_bytes,
+    fall_back_to_software,
+    get_hwaccel,
+)
 
 
 @dataclass
@@ -26,9 +34,15 @@ class ClipProgress:
     message: str | None = None
 
 
+TIME_PATTERN = re.compile(r"time=(\d+):(\d+):([\d.]+)")
+
+
 def parse_ffmpeg_progress(line: str, total_duration: float | None = None) -> float | None:
     """Parse FFmpeg progress line and return percent complete."""
-    time_match = re.search(r"time=(\d+):(\d+):([\d.]+)", line)
+    # Most -progress lines (bitrate=, total_size=, ...) carry no time at all
+    if "time=" not in line:
+        return None
+    time_match = TIME_PATTERN.search(line)
     if not time_match:
         return None
 
@@ -78,6 +92,7 @@ def concat_clip(
     preset: str = "fast",
     progress_callback: Callable[[float], None] | None = None,
     estimated_duration: float | None = None,
+    hwaccel: HWAccel | None = None,
 ) -> bool:
     """Concatenate video segments into a single clip.
 
@@ -89,6 +104,8 @@ def concat_clip(
         preset: FFmpeg encoding preset (only used if reencode=True)
         progress_callback: Optional callback receiving percent complete (0-100)
         estimated_duration: Estimated duration for progress calculation
+        hwaccel: Hardware acceleration for re-encoding (auto-detected if None);
+            a failed hardware re-encode is retried once in software
 
     Returns:
         True if successful, False otherwise
@@ -103,53 +120,59 @@ def concat_clip(
         "concat_clip",
         {"file_count": len(input_files), "reencode": reencode},
     ):
-        # Create concat file list
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
+        # Create concat file list (built as one bytes buffer, single write)
+        with tempfile.NamedTemporaryFile(mode="wb", suffix=".txt", delete=False) as f:
             concat_file = Path(f.name)
-            for file_path in input_files:
-                escaped = str(file_path).replace("'", "'\\''")
-                f.write(f"file '{escaped}'\n")
+            f.write(concat_list_bytes([os.fspath(file_path) for file_path in input_files]))
 
         try:
-            cmd = [
-                "ffmpeg",
-                "-y",
-                "-f", "concat",
-                "-safe", "0",
-                "-i", str(concat_file),
-            ]
+            input_opts: list[str] = []
+            output_opts: list[str] = []
 
             if reencode:
-                # Auto-detect hardware acceleration
-                hwaccel = get_hwaccel()
+                # Auto-detect hardware acceleration if not specified
+                if hwaccel is None:
+                    hwaccel = get_hwaccel()
                 logger.info("Using hardware acceleration for clip re-encoding", hwaccel=hwaccel.value)
 
-                # Build command based on hardware acceleration type
+                # Build command based on hardware acceleration type. Hardware
+                # paths decode straight to GPU surfaces (input options must
+                # precede -i), so frames never round-trip through system memory
                 if hwaccel == HWAccel.QSV:
-                    cmd.extend([
-                        "-hwaccel", "qsv",
-                        "-hwaccel_output_format", "qsv",
+                    input_opts = HW_DECODE_OPTS[HWAccel.QSV]
+                    output_opts = [
                         "-c:v", "h264_qsv",
                         "-preset", "medium", # QSV presets are different, "medium" is a good balance
                         "-global_quality", "23",
-                    ])
+                    ]
                 elif hwaccel == HWAccel.VAAPI:
-                    cmd.extend([
-                        "-vaapi_device", "/dev/dri/renderD128",
-                        "-vf", "format=nv12,hwupload",
+                    input_opts = HW_DECODE_OPTS[HWAccel.VAAPI]
+                    output_opts = [
+                        "-vf", "scale_vaapi=format=nv12",
                         "-c:v", "h264_vaapi",
                         "-qp", "23",
-                    ])
+                    ]
                 else:
                     # Software encoding
-                    cmd.extend(["-c:v", "libx264", "-preset", preset])
+                    output_opts = ["-c:v", "libx264", "-preset", preset]
 
-                # Add progress output if callback provided
-                if progress_callback:
-                    cmd.extend(["-progress", "pipe:1"])
-            else:
+            cmd = [
+                "ffmpeg",
+                "-nostdin",
+                "-y",
+                *input_opts,
+                "-f", "concat",
+                "-safe", "0",
+                "-i", str(concat_file),
+                *output_opts,
+            ]
+
+            if not reencode:
                 # Stream copy (fast, no re-encoding)
                 cmd.extend(["-c", "copy"])
+            elif progress_callback:
+                # Add progress output if callback provided
+                cmd.extend(["-progress", "pipe:1"])
 
             cmd.append(str(output_path))
 
@@ -167,18 +190,33 @@ def concat_clip(
             )
 
             if reencode and progress_callback and process.stdout:
-                # Parse progress from stdout during re-encode
+                # Drain stderr on a thread so it can't fill up and stall
+                # ffmpeg while we parse progress from stdout
+                stderr_chunks: list[str] = []
+                stderr_reader = threading.Thread(
+                    target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True
+                )
+                stderr_reader.start()
                 for line in process.stdout:
                     percent = parse_ffmpeg_progress(line.strip(), estimated_duration)
                     if percent is not None:
                         progress_callback(percent)
-                stderr = process.stderr.read() if process.stderr else ""
                 process.wait()
+                stderr_reader.join()
+                stderr = "".join(stderr_chunks)
             else:
                 _, stderr = process.communicate()
 
             if process.returncode != 0:
                 logger.error("Clip concatenation failed", stderr=stderr)
+                # The GPU may be unable to decode the source or to start at
+                # all, so retry a failed hardware re-encode in software
+                if reencode and hwaccel != HWAccel.NONE:
+                    fall_back_to_software(hwaccel, stderr)
+                    return concat_clip(
+                        input_files, output_path, reencode, preset,
+                        progress_callback, estimated_duration, hwaccel=HWAccel.NONE,
+                    )
                 return False
 
             logger.info("Clip created", output=str(output_path))
@@ -6,7 +6,9 @@ Frigate stores recordings in the structure:
 This module finds and filters recording files by time range and calendar rules.
 """
 
-import re
+import hashlib
+import os
+import pickle
 import time as time_module
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
@@ -14,9 +16,6 @@ from pathlib import Path
 
 from frigate_tools.observability import get_logger, traced_operation
 
-# Frigate filename pattern: MM.SS.mp4
-FILENAME_PATTERN = re.compile(r"^(\d{2})\.(\d{2})\.mp4$")
-
 # Day name mapping for skip_days
 DAY_NAMES = {
     "mon": 0,
@@ -35,6 +34,12 @@ DAY_NAMES = {
     "sunday": 6,
 }
 
+# Naive epoch used for integer timestamp comparisons (file paths are UTC)
+EPOCH = datetime(1970, 1, 1)
+
+# Bitmask with one bit set for each hour of the day (bit N = hour N)
+ALL_HOURS_MASK = (1 << 24) - 1
+
 
 @dataclass
 class HourRange:
@@ -53,6 +58,133 @@ class HourRange:
             return hour >= self.start or hour <= self.end
 
 
+# Bump when the pickled RecordingIndex layout changes
+INDEX_SCHEMA_VERSION = 1
+
+# Listings of directories modified more recently than this are not cached,
+# since a file written in the same mtime tick would otherwise be missed
+INDEX_MIN_AGE_NS = 2_000_000_000
+
+
+def get_cache_dir() -> Path:
+    """Get the frigate-tools cache directory (honours XDG_CACHE_HOME)."""
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "frigate-tools"
+
+
+class RecordingIndex:
+    """Directory listing cache for a Frigate recordings tree.
+
+    Listings are keyed by directory path and validated against the directory's
+    st_mtime_ns, so on later runs only directories that changed (typically the
+    current hour) are re-listed. Persisted with pickle between CLI invocations;
+    listings of directories that Frigate's retention has since deleted are
+    dropped on save, so the index stays as large as the recordings tree.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self._listings: dict[str, tuple[int, list[str]]] = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, instance_path: Path) -> "RecordingIndex":
+        """Load the index for an instance, or start an empty one."""
+        key = hashlib.sha1(str(instance_path.resolve()).encode()).hexdigest()
+        index = cls(get_cache_dir() / f"index-{key}.pkl")
+
+        try:
+            with open(index.path, "rb") as f:
+                data = pickle.load(f)
+            if data.get("version") == INDEX_SCHEMA_VERSION:
+                index._listings = data["listings"]
+        except Exception as e:
+            # Any unreadable, corrupt or foreign cache file (unpickling can
+            # raise nearly anything) just means rebuilding the index
+            get_logger().debug("Ignoring unreadable recording index", error=str(e))
+
+        return index
+
+    def list_dir(self, dir_path: Path) -> list[str] | None:
+        """Return sorted entry names of a directory, or None if it is missing."""
+        key = str(dir_path)
+        try:
+            mtime_ns = os.stat(key).st_mtime_ns
+            cached = self._listings.get(key)
+            if cached is not None and cached[0] == mtime_ns:
+                return cached[1]
+            names = sorted(os.listdir(key))
+        except OSError:
+            if self._listings.pop(key, None) is not None:
+                self._dirty = True
+            return None
+
+        if time_module.time_ns() - mtime_ns >= INDEX_MIN_AGE_NS:
+            self._listings[key] = (mtime_ns, names)
+            self._dirty = True
+        return names
+
+    def _prune(self) -> None:
+        """Drop listings of directories that no longer exist.
+
+        A directory is gone if its nearest cached ancestor is gone or no
+        longer lists it. Only directories without a cached ancestor (the
+        date directories, one per retained day) need a stat.
+        """
+        listings = self._listings
+        # Surviving directories, with their entry names as a set once needed
+        alive: dict[str, set[str] | None] = {}
+        # Shorter paths first, so ancestors are decided before descendants
+        for key in sorted(listings, key=len):
+            parent, name = os.path.split(key)
+            while parent not in listings and os.path.dirname(parent) != parent:
+                parent, name = os.path.split(parent)
+
+            if parent in listings:
+                exists = parent in alive
+                if exists:
+                    if alive[parent] is None:
+                        alive[parent] = set(listings[parent][1])
+                    exists = name in alive[parent]
+            else:
+                exists = os.path.isdir(key)
+
+            if exists:
+                alive[key] = None
+        self._listings = {key: listings[key] for key in alive}
+
+    def save(self) -> None:
+        """Write the index back to disk if anything changed."""
+        if self.path is None or not self._dirty:
+            return
+
+        self._prune()
+
+        tmp_path = self.path.with_suffix(".tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(
+                    {"version": INDEX_SCHEMA_VERSION, "listings": self._listings},
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            get_logger().debug("Could not save recording index", error=str(e))
+
+
+def _list_dir(dir_path: Path, index: RecordingIndex | None) -> list[str] | None:
+    """List a directory through the index if given, else directly."""
+    if index is not None:
+        return index.list_dir(dir_path)
+    try:
+        return sorted(os.listdir(dir_path))
+    except OSError:
+        return None
+
+
 def parse_skip_days(skip_days: list[str]) -> set[int]:
     """Parse day names into weekday numbers (0=Monday, 6=Sunday)."""
     result = set()
@@ -96,6 +228,26 @@ def parse_skip_hours(skip_hours: list[str]) -> list[HourRange]:
     return result
 
 
+def build_hour_mask(skip_hours: list[HourRange]) -> int:
+    """Build a 24-bit mask of skipped hours (bit N set = hour N skipped)."""
+    mask = 0
+    for hour in range(24):
+        if any(hour_range.contains(hour) for hour_range in skip_hours):
+            mask |= 1 << hour
+    return mask
+
+
+def weekdays_in_range(start: datetime, end: datetime) -> set[int]:
+    """Return the local-time weekdays (0=Monday) touched by a UTC time range."""
+    current_date = utc_to_local(start).date()
+    end_date = utc_to_local(end).date()
+    weekdays = set()
+    while current_date <= end_date and len(weekdays) < 7:
+        weekdays.add(current_date.weekday())
+        current_date += timedelta(days=1)
+    return weekdays
+
+
 def parse_file_timestamp(
     date_dir: str,
     hour_dir: str,
@@ -111,20 +263,61 @@ def parse_file_timestamp(
     Returns:
         datetime or None if parsing fails
     """
-    match = FILENAME_PATTERN.match(filename)
-    if not match:
+    offset = parse_segment_offset(filename)
+    if offset is None:
+        return None
+
+    # Fixed-width slicing instead of a regex: date directories are always YYYY-MM-DD
+    if len(date_dir) != 10 or date_dir[4] != "-" or date_dir[7] != "-":
         return None
 
     try:
-        minute = int(match.group(1))
-        second = int(match.group(2))
-        year, month, day = map(int, date_dir.split("-"))
+        year = int(date_dir[:4])
+        month = int(date_dir[5:7])
+        day = int(date_dir[8:10])
         hour = int(hour_dir)
 
-        return datetime(year, month, day, hour, minute, second)
-    except (ValueError, AttributeError):
+        return datetime(year, month, day, hour, offset // 60, offset % 60)
+    except ValueError:
+        return None
+
+
+def parse_segment_offset(filename: str) -> int | None:
+    """Extract the offset in seconds into the hour from a MM.SS.mp4 filename.
+
+    Args:
+        filename: File name like "30.00.mp4"
+
+    Returns:
+        minute * 60 + second, or None if the name is not a valid segment
+    """
+    # Fixed-width slicing instead of a regex: filenames are always MM.SS.mp4.
+    # isdigit() alone would accept characters such as "²" that int() rejects
+    if (
+        len(filename) != 9
+        or filename[2] != "."
+        or not filename.endswith(".mp4")
+        or not filename.isascii()
+        or not filename[:2].isdecimal()
+        or not filename[3:5].isdecimal()
+    ):
         return None
 
+    minute = int(filename[:2])
+    second = int(filename[3:5])
+    if minute > 59 or second > 59:
+        return None
+    return minute * 60 + second
+
+
+def epoch_seconds(dt: datetime) -> int:
+    """Whole seconds since 1970-01-01 for a naive datetime, rounded up.
+
+    Rounding up keeps integer comparisons equivalent to datetime ones:
+    for a whole-second ts, ts < dt exactly when ts < epoch_seconds(dt).
+    """
+    return -((EPOCH - dt) // timedelta(seconds=1))
+
 
 def utc_to_local(dt: datetime) -> datetime:
     """Convert naive UTC datetime to naive local datetime.
@@ -183,6 +376,29 @@ def should_skip_timestamp(
     return False
 
 
+def hour_skip_decision(
+    hour_start: datetime,
+    skip_days: set[int],
+    skip_hours: list[HourRange],
+) -> bool | None:
+    """Apply calendar rules to a whole UTC hour at once.
+
+    Args:
+        hour_start: UTC timestamp at the start of the hour
+        skip_days: Days of week to skip (0=Monday, 6=Sunday) - in local time
+        skip_hours: Hour ranges to skip - in local time
+
+    Returns:
+        True/False if every second of the hour gets the same decision, or
+        None if the local hour changes within it (e.g. half-hour UTC offsets)
+    """
+    local_first = utc_to_local(hour_start)
+    local_last = utc_to_local(hour_start + timedelta(seconds=3599))
+    if local_first.hour != local_last.hour or local_first.date() != local_last.date():
+        return None
+    return should_skip_timestamp(hour_start, skip_days, skip_hours)
+
+
 def find_recording_files(
     instance_path: Path,
     camera: str,
@@ -190,6 +406,7 @@ def find_recording_files(
     end: datetime,
     skip_days: set[int] | None = None,
     skip_hours: list[HourRange] | None = None,
+    index: RecordingIndex | None = None,
 ) -> list[Path]:
     """Find recording files for a camera within a time range.
 
@@ -202,6 +419,7 @@ def find_recording_files(
         end: End of time range (exclusive)
         skip_days: Set of weekday numbers to skip (0=Monday, 6=Sunday)
         skip_hours: List of hour ranges to skip
+        index: Optional directory listing cache (see RecordingIndex)
 
     Returns:
         Sorted list of file paths
@@ -214,6 +432,11 @@ def find_recording_files(
         return []
 
     files = []
+    check_calendar = bool(skip_days or skip_hours)
+
+    # Compare integer epoch seconds rather than building a datetime per file
+    start_epoch = epoch_seconds(start)
+    end_epoch = epoch_seconds(end)
 
     # Iterate through date directories
     current_date = start.date()
@@ -222,38 +445,63 @@ def find_recording_files(
     while current_date <= end_date:
         date_dir = current_date.strftime("%Y-%m-%d")
         date_path = recordings_path / date_dir
+        date_epoch = (current_date - EPOCH.date()).days * 86400
+
+        # Check each hour directory (missing date dirs list as None)
+        for hour_name in _list_dir(date_path, index) or []:
+            if not (hour_name.isascii() and hour_name.isdecimal()):
+                continue
+
+            hour = int(hour_name)
+            if hour > 23:
+                continue
+            hour_epoch = date_epoch + hour * 3600
+
+            # When the whole hour is inside the range and the calendar rules
+            # agree for all of it, decide once for the directory instead of
+            # per file
+            whole_hour = None
+            if start_epoch <= hour_epoch and hour_epoch + 3600 <= end_epoch:
+                whole_hour = False
+                if check_calendar:
+                    whole_hour = hour_skip_decision(
+                        EPOCH + timedelta(seconds=hour_epoch), skip_days, skip_hours
+                    )
+                    if whole_hour:
+                        continue
 
-        if date_path.exists():
-            # Check each hour directory
-            for hour_path in sorted(date_path.iterdir()):
-                if not hour_path.is_dir():
+            # Camera is inside the hour directory
+            camera_path = date_path / hour_name / camera
+            file_names = _list_dir(camera_path, index)
+            if file_names is None:
+                continue
+
+            if whole_hour is False:
+                files.extend(
+                    camera_path / file_name
+                    for file_name in file_names
+                    if parse_segment_offset(file_name) is not None
+                )
+                continue
+
+            # Find .mp4 files in this camera directory
+            for file_name in file_names:
+                offset = parse_segment_offset(file_name)
+                if offset is None:
                     continue
 
-                try:
-                    hour = int(hour_path.name)
-                except ValueError:
+                # Check time range
+                ts_epoch = hour_epoch + offset
+                if ts_epoch < start_epoch or ts_epoch >= end_epoch:
                     continue
 
-                # Camera is inside the hour directory
-                camera_path = hour_path / camera
-                if not camera_path.exists():
+                # Check calendar filters (only these need a datetime)
+                if check_calendar and should_skip_timestamp(
+                    EPOCH + timedelta(seconds=ts_epoch), skip_days, skip_hours
+                ):
                     continue
 
-                # Find .mp4 files in this camera directory
-                for file_path in sorted(camera_path.glob("*.mp4")):
-                    ts = parse_file_timestamp(date_dir, hour_path.name, file_path.name)
-                    if ts is None:
-                        continue
-
-                    # Check time range
-                    if ts < start or ts >= end:
-                        continue
-
-                    # Check calendar filters
-                    if should_skip_timestamp(ts, skip_days, skip_hours):
-                        continue
-
-                    files.append(file_path)
+                files.append(camera_path / file_name)
 
         current_date += timedelta(days=1)
 
@@ -267,6 +515,7 @@ def generate_file_lists(
     instance_path: Path,
     skip_days: list[str] | None = None,
     skip_hours: list[str] | None = None,
+    use_index: bool = False,
 ) -> dict[str, list[Path]]:
     """Generate file lists for multiple cameras with calendar filtering.
 
@@ -277,6 +526,7 @@ def generate_file_lists(
         instance_path: Path to Frigate instance
         skip_days: Day names to skip (e.g., ["sat", "sun"])
         skip_hours: Hour ranges to skip (e.g., ["16-8"])
+        use_index: Reuse the on-disk recordings index between runs
 
     Returns:
         Dict mapping camera name to sorted list of file paths
@@ -296,6 +546,20 @@ def generate_file_lists(
             "skip_hours": ",".join(skip_hours or []),
         },
     ):
+        # Skip the directory walk entirely if the calendar filters cover
+        # every hour of the day or every weekday in the range
+        hour_mask = build_hour_mask(parsed_skip_hours)
+        if hour_mask == ALL_HOURS_MASK or (
+            parsed_skip_days
+            and weekdays_in_range(start, end) <= parsed_skip_days
+        ):
+            logger.info(
+                "Calendar filters exclude entire range",
+                hour_mask=hour_mask,
+            )
+            return {camera: [] for camera in cameras}
+
+        index = RecordingIndex.load(instance_path) if use_index else None
         result = {}
 
         for camera in cameras:
@@ -306,6 +570,7 @@ def generate_file_lists(
                 end=end,
                 skip_days=parsed_skip_days,
                 skip_hours=parsed_skip_hours,
+                index=index,
             )
             result[camera] = files
             logger.info(
@@ -314,4 +579,7 @@ def generate_file_lists(
                 file_count=len(files),
             )
 
+        if index is not None:
+            index.save()
+
         return result
@@ -4,16 +4,76 @@ Automatically calculates optimal grid dimensions and generates ffmpeg
 filter_complex for xstack-based video tiling.
 """
 
+import functools
 import math
+import os
 import re
+import selectors
 import subprocess
 import tempfile
+import time
 from collections.abc import Callable
 from dataclasses import dataclass
 from pathlib import Path
 
 from frigate_tools.observability import get_logger, traced_operation
-from frigate_tools.timelapse import HWAccel, get_hwaccel
+from frigate_tools.timelapse import (
+    HW_DECODE_OPTS,
+    HWAccel,
+    concat_list_bytes,
+    fall_back_to_software,
+    get_hwaccel,
+)
+
+
+# Hardware stacking paths: (scale filter, xstack filter, per-input decode options)
+# Decoding straight to GPU surfaces keeps scale+stack off the CPU entirely
+HW_STACK_FILTERS: dict[HWAccel, tuple[str, str, list[str]]] = {
+    HWAccel.QSV: ("scale_qsv", "xstack_qsv", HW_DECODE_OPTS[HWAccel.QSV]),
+    HWAccel.VAAPI: ("scale_vaapi", "xstack_vaapi", HW_DECODE_OPTS[HWAccel.VAAPI]),
+}
+
+
+def detect_hw_filters() -> frozenset[str]:
+    """Detect which hardware scale/xstack filters this ffmpeg build provides."""
+    wanted = {name for scale, xstack, _ in HW_STACK_FILTERS.values() for name in (scale, xstack)}
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-filters"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return frozenset()
+
+    found = set()
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[1] in wanted:
+            found.add(parts[1])
+    return frozenset(found)
+
+
+# Cache hardware filter detection result
+_hw_filters_cache: frozenset[str] | None = None
+
+
+def get_hw_filters() -> frozenset[str]:
+    """Get cached set of available hardware stacking filters."""
+    global _hw_filters_cache
+    if _hw_filters_cache is None:
+        _hw_filters_cache = detect_hw_filters()
+    return _hw_filters_cache
+
+
+def hw_stack_supported(hwaccel: HWAccel) -> bool:
+    """Check if grid scale+stack can run on the GPU for this acceleration type."""
+    if hwaccel not in HW_STACK_FILTERS:
+        return False
+    scale, xstack, _ = HW_STACK_FILTERS[hwaccel]
+    available = get_hw_filters()
+    return scale in available and xstack in available
 
 
 @dataclass
@@ -26,24 +86,48 @@ class GridProgress:
     time_seconds: float = 0.0
 
 
-def parse_ffmpeg_progress(line: str, total_duration: float | None = None) -> GridProgress | None:
-    """Parse FFmpeg progress line for grid encoding."""
-    time_match = re.search(r"time=(\d+):(\d+):([\d.]+)", line)
-    fps_match = re.search(r"fps=\s*([\d.]+)", line)
-    speed_match = re.search(r"speed=\s*([\d.]+)x", line)
+# Progress line pattern: time plus optional fps (before it) and speed
+# (after it), matched in one scan of e.g.
+# "frame=  100 fps= 30 q=28.0 size=  1024kB time=00:00:10.00 speed=1.2x"
+PROGRESS_PATTERN = re.compile(
+    r"(?:fps=\s*(?P<fps>[\d.]+).*?)?"
+    r"time=(?P<hours>\d+):(?P<minutes>\d+):(?P<seconds>[\d.]+)"
+    r"(?:.*?speed=\s*(?P<speed>[\d.]+)x)?"
+)
+
+# Minimum seconds between progress callbacks
+PROGRESS_INTERVAL = 0.25
+
 
-    if not time_match:
+def parse_ffmpeg_progress(
+    line: str,
+    total_duration: float | None = None,
+    *,
+    percent_scale: float | None = None,
+) -> GridProgress | None:
+    """Parse FFmpeg progress line for grid encoding.
+
+    Args:
+        line: ffmpeg stats or -progress output line
+        total_duration: Expected output duration (for percent complete)
+        percent_scale: Precomputed 100 / total_duration, used instead of
+            total_duration by callers parsing many lines
+    """
+    match = PROGRESS_PATTERN.search(line)
+    if not match:
         return None
 
-    hours, minutes, seconds = time_match.groups()
+    hours, minutes, seconds, fps_str, speed_str = match.group(
+        "hours", "minutes", "seconds", "fps", "speed"
+    )
     time_seconds = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
 
-    fps = float(fps_match.group(1)) if fps_match else 0.0
-    speed = float(speed_match.group(1)) if speed_match else 0.0
+    fps = float(fps_str) if fps_str else 0.0
+    speed = float(speed_str) if speed_str else 0.0
 
-    percent = None
-    if total_duration and total_duration > 0:
-        percent = min(100.0, (time_seconds / total_duration) * 100)
+    if percent_scale is None and total_duration and total_duration > 0:
+        percent_scale = 100.0 / total_duration
+    percent = min(100.0, time_seconds * percent_scale) if percent_scale else None
 
     return GridProgress(
         percent=percent,
@@ -53,7 +137,139 @@ def parse_ffmpeg_progress(line: str, total_duration: float | None = None) -> Gri
     )
 
 
-@dataclass
+def parse_ffmpeg_progress_kv(
+    line: str,
+    fields: dict[str, str],
+    percent_scale: float | None = None,
+) -> GridProgress | None:
+    """Parse one line of ffmpeg's -progress key=value output.
+
+    -progress emits a block of key=value lines per update, ending with a
+    progress=continue (or progress=end) line. Keys are collected in fields
+    until that sentinel, which produces a GridProgress and resets fields.
+
+    Args:
+        line: One -progress output line
+        fields: Accumulator for the current block (shared across calls)
+        percent_scale: Precomputed 100 / total_duration for percent complete
+
+    Returns:
+        GridProgress at the end of each block, None otherwise
+    """
+    key, _, value = line.partition("=")
+    if key != "progress":
+        fields[key] = value
+        return None
+
+    out_time_us = fields.get("out_time_us", "")
+    fps = fields.get("fps", "")
+    speed = fields.get("speed", "").rstrip("x")
+    fields.clear()
+
+    # Values are "N/A" until ffmpeg has output to report
+    try:
+        time_seconds = int(out_time_us) / 1_000_000
+    except ValueError:
+        return None
+    try:
+        fps_value = float(fps)
+    except ValueError:
+        fps_value = 0.0
+    try:
+        speed_value = float(speed)
+    except ValueError:
+        speed_value = 0.0
+
+    return GridProgress(
+        percent=min(100.0, time_seconds * percent_scale) if percent_scale else None,
+        fps=fps_value,
+        speed=speed_value,
+        time_seconds=time_seconds,
+    )
+
+
+def _pump_progress(
+    process: subprocess.Popen,
+    total_duration: float | None,
+    progress_callback: Callable[[GridProgress], None],
+) -> str:
+    """Read ffmpeg's binary stdout/stderr pipes to EOF, reporting progress.
+
+    Both pipes are polled with a selector so a chatty stderr can't fill up
+    and stall ffmpeg while we wait on stdout. Every -progress block on
+    stdout is parsed, but the callback fires at most every PROGRESS_INTERVAL seconds; the
+    latest update is always delivered before returning. Until a -progress
+    block arrives, the "frame=... time=..." stats lines ffmpeg prints on
+    stderr are parsed instead, so builds that ignore -progress still report.
+
+    Returns:
+        Decoded stderr output
+    """
+    stderr_chunks: list[bytes] = []
+    pending = b""
+    stderr_pending = b""
+    have_kv = False
+    latest: GridProgress | None = None
+    last_report = -math.inf
+    percent_scale = 100.0 / total_duration if total_duration and total_duration > 0 else None
+    fields: dict[str, str] = {}
+
+    def parse_lines(lines: list[bytes]) -> None:
+        nonlocal latest, have_kv
+        for line in lines:
+            progress = parse_ffmpeg_progress_kv(
+                line.decode(errors="replace").strip(), fields, percent_scale
+            )
+            if progress:
+                latest = progress
+                have_kv = True
+
+    def parse_stats(lines: list[bytes]) -> None:
+        nonlocal latest
+        for line in lines:
+            progress = parse_ffmpeg_progress(
+                line.decode(errors="replace"), percent_scale=percent_scale
+            )
+            if progress:
+                latest = progress
+
+    with selectors.DefaultSelector() as selector:
+        selector.register(process.stdout, selectors.EVENT_READ)
+        if process.stderr:
+            selector.register(process.stderr, selectors.EVENT_READ)
+
+        while selector.get_map():
+            for key, _ in selector.select():
+                chunk = os.read(key.fd, 4096)
+                if not chunk:
+                    selector.unregister(key.fileobj)
+                    if key.fileobj is process.stdout:
+                        parse_lines([pending])
+                elif key.fileobj is process.stderr:
+                    stderr_chunks.append(chunk)
+                    if not have_kv:
+                        # Stats lines are terminated by \r, log lines by \n
+                        *lines, stderr_pending = (
+                            (stderr_pending + chunk).replace(b"\r", b"\n").split(b"\n")
+                        )
+                        parse_stats(lines)
+                else:
+                    *lines, pending = (pending + chunk).split(b"\n")
+                    parse_lines(lines)
+
+            now = time.monotonic()
+            if latest and now - last_report >= PROGRESS_INTERVAL:
+                progress_callback(latest)
+                latest = None
+                last_report = now
+
+    if latest:
+        progress_callback(latest)
+
+    return b"".join(stderr_chunks).decode(errors="replace")
+
+
+@dataclass(frozen=True)
 class GridLayout:
     """Grid layout dimensions."""
 
@@ -77,6 +293,14 @@ def calculate_grid_layout(camera_count: int) -> GridLayout:
     Returns:
         GridLayout with rows and columns
     """
+    layout = _LAYOUT_TABLE.get(camera_count)
+    if layout is not None:
+        return layout
+    return _compute_grid_layout(camera_count)
+
+
+def _compute_grid_layout(camera_count: int) -> GridLayout:
+    """Compute the grid layout for calculate_grid_layout."""
     if camera_count <= 0:
         return GridLayout(rows=0, cols=0)
 
@@ -94,66 +318,93 @@ def calculate_grid_layout(camera_count: int) -> GridLayout:
     return GridLayout(rows=rows, cols=cols)
 
 
+# Precomputed layouts for every camera count we expect to see
+_LAYOUT_TABLE: dict[int, GridLayout] = {n: _compute_grid_layout(n) for n in range(65)}
+
+
 def generate_xstack_filter(
     input_count: int,
     layout: GridLayout,
     width: int | None = None,
     height: int | None = None,
+    hwaccel: HWAccel | None = None,
 ) -> str:
     """Generate ffmpeg xstack filter for grid layout.
 
+    A single row or column of scaled (equally sized) software inputs uses
+    hstack/vstack instead, which skip xstack's per-input positioning.
+
     Args:
         input_count: Number of input videos
         layout: Grid layout (rows x cols)
         width: Optional output width per cell
         height: Optional output height per cell
+        hwaccel: Emit the GPU scale/xstack variants for this acceleration type
+            (inputs must be decoded to hardware frames)
 
     Returns:
         ffmpeg filter_complex string
     """
+    return _build_xstack_filter(input_count, layout, width, height, hwaccel)
+
+
+@functools.lru_cache(maxsize=128)
+def _build_xstack_filter(
+    input_count: int,
+    layout: GridLayout,
+    width: int | None,
+    height: int | None,
+    hwaccel: HWAccel | None,
+) -> str:
+    """Build (and cache) the filter_complex string for generate_xstack_filter."""
     if input_count <= 0 or layout.total_cells <= 0:
         return ""
 
     # Build layout string: pipe-separated row positions
-    # e.g., "0_0|w0_0|0_h0|w0_h0" for 2x2 grid
-    positions = []
-    for i in range(input_count):
-        row = i // layout.cols
-        col = i % layout.cols
-
-        # Position using relative widths/heights
-        if col == 0:
-            x = "0"
-        else:
-            # Sum of previous column widths
-            x = "+".join(f"w{j}" for j in range(col))
-
-        if row == 0:
-            y = "0"
-        else:
-            # Sum of previous row heights
-            y = "+".join(f"h{j * layout.cols}" for j in range(row))
-
-        positions.append(f"{x}_{y}")
-
-    layout_str = "|".join(positions)
-
-    # Build filter chain
-    filters = []
-
-    # Scale each input if dimensions specified
+    # e.g., "0_0|w0_0|0_h0|w0_h0" for 2x2 grid. Column offsets are sums of
+    # previous column widths, row offsets sums of previous row heights;
+    # build each prefix sum once and index into it.
+    col_x = ["0"]
+    for c in range(1, layout.cols):
+        col_x.append(f"w{c - 1}" if c == 1 else f"{col_x[-1]}+w{c - 1}")
+    row_y = ["0"]
+    for r in range(1, layout.rows):
+        h = f"h{(r - 1) * layout.cols}"
+        row_y.append(h if r == 1 else f"{row_y[-1]}+{h}")
+
+    scale_filter, xstack_filter = "scale", "xstack"
+    if hwaccel in HW_STACK_FILTERS:
+        scale_filter, xstack_filter, _ = HW_STACK_FILTERS[hwaccel]
+
+    # Emit every piece into one buffer and join once:
+    # "[0:v]scale=W:H[v0];...[v0][v1]...xstack=inputs=N:layout=...[out]"
+    parts: list[str] = []
     if width and height:
-        for i in range(input_count):
-            filters.append(f"[{i}:v]scale={width}:{height}[v{i}]")
-        input_refs = "".join(f"[v{i}]" for i in range(input_count))
+        # Scale each input if dimensions specified
+        parts.extend(
+            f"[{i}:v]{scale_filter}={width}:{height}[v{i}];" for i in range(input_count)
+        )
+        parts.extend(f"[v{i}]" for i in range(input_count))
     else:
-        input_refs = "".join(f"[{i}:v]" for i in range(input_count))
-
-    # Add xstack filter
-    xstack = f"{input_refs}xstack=inputs={input_count}:layout={layout_str}[out]"
-    filters.append(xstack)
+        parts.extend(f"[{i}:v]" for i in range(input_count))
+
+    # hstack/vstack need equal heights/widths, which only scaling guarantees
+    if width and height and hwaccel not in HW_STACK_FILTERS and input_count > 1:
+        if layout.rows == 1:
+            parts.append(f"hstack=inputs={input_count}[out]")
+            return "".join(parts)
+        if layout.cols == 1:
+            parts.append(f"vstack=inputs={input_count}[out]")
+            return "".join(parts)
+
+    parts.append(f"{xstack_filter}=inputs={input_count}:layout=")
+    for i in range(input_count):
+        if i:
+            parts.append("|")
+        parts.append(f"{col_x[i % layout.cols]}_{row_y[i // layout.cols]}")
+    parts.append("[out]")
 
-    return ";".join(filters)
+    return "".join(parts)
 
 
 @dataclass
@@ -181,29 +432,85 @@ def sync_file_lists(
     if not camera_files:
         return SyncedFileSet(camera_files={}, gap_indices=set())
 
-    # Find max file count
-    max_files = max(len(files) for files in camera_files.values())
-
-    # Identify gap indices (where any camera is missing a file)
-    gap_indices = set()
-    for idx in range(max_files):
-        for files in camera_files.values():
-            if idx >= len(files):
-                gap_indices.add(idx)
-                break
+    # A camera with L files is missing indices L..max-1, so the union of
+    # all gaps is exactly the range between the shortest and longest list
+    lengths = [len(files) for files in camera_files.values()]
+    gap_indices = set(range(min(lengths), max(lengths)))
 
     return SyncedFileSet(camera_files=camera_files, gap_indices=gap_indices)
 
 
+def _write_concat_list(camera: str, files: list[Path]) -> tuple[str, int | None]:
+    """Write a concat demuxer list for one camera.
+
+    On Linux the list lives in an anonymous memfd that ffmpeg inherits and
+    opens through /dev/fd, so nothing touches the disk. Elsewhere it falls
+    back to a temp file.
+
+    Returns:
+        Tuple of (path for ffmpeg's -i, memfd to pass to ffmpeg or None
+        if the list was written to a temp file)
+    """
+    data = concat_list_bytes([os.fspath(file_path) for file_path in files])
+
+    if hasattr(os, "memfd_create"):
+        # Close-on-exec (the default) keeps the list out of every other
+        # child; pass_fds hands it to the one ffmpeg that reads it
+        fd = os.memfd_create(f"concat_{camera}")
+        with os.fdopen(os.dup(fd), "wb") as f:
+            f.write(data)
+        return f"/dev/fd/{fd}", fd
+
+    with tempfile.NamedTemporaryFile(mode="wb", suffix=f"_{camera}.txt", delete=False) as f:
+        f.write(data)
+    return f.name, None
+
+
+@dataclass
+class _CameraInput:
+    """ffmpeg input for one camera: a lone segment or a concat list."""
+
+    args: list[str]  # Input options, ending with "-i <path>"
+    fd: int | None = None  # memfd holding the concat list
+    temp_file: Path | None = None  # Temp file holding the concat list
+
+    def close(self) -> None:
+        """Release the concat list, if any."""
+        if self.fd is not None:
+            os.close(self.fd)
+        if self.temp_file is not None:
+            self.temp_file.unlink(missing_ok=True)
+
+
+def _open_camera_input(camera: str, files: list[Path]) -> _CameraInput:
+    """Build the ffmpeg input for one camera's files.
+
+    A single segment is read directly; the concat demuxer would only add
+    an extra parsing layer in front of it.
+    """
+    if len(files) == 1:
+        return _CameraInput(args=["-i", str(files[0])])
+
+    path, fd = _write_concat_list(camera, files)
+    return _CameraInput(
+        args=["-f", "concat", "-safe", "0", "-i", path],
+        fd=fd,
+        temp_file=Path(path) if fd is None else None,
+    )
+
+
 def create_grid_video(
     camera_files: dict[str, list[Path]],
     output_path: Path,
     cell_width: int | None = None,
     cell_height: int | None = None,
-    preset: str = "fast",
+    preset: str = "veryfast",
     progress_callback: Callable[[GridProgress], None] | None = None,
     estimated_duration: float | None = None,
     hwaccel: HWAccel | None = None,
+    crf: int = 23,
+    tune: str | None = "zerolatency",
+    filter_threads: int | None = None,
 ) -> bool:
     """Create a grid video from multiple camera inputs.
 
@@ -212,10 +519,17 @@ def create_grid_video(
         output_path: Output video path
         cell_width: Width of each cell in grid (auto-detected if None)
         cell_height: Height of each cell in grid (auto-detected if None)
-        preset: FFmpeg encoding preset
+        preset: FFmpeg encoding preset (software encoding only)
         progress_callback: Optional callback for progress updates
         estimated_duration: Estimated output duration (for progress %)
-        hwaccel: Hardware acceleration to use (auto-detected if None)
+        hwaccel: Hardware acceleration to use (auto-detected if None);
+            a failed hardware encode is retried once in software
+        crf: x264 constant rate factor (software encoding only)
+        tune: x264 tune, or None for no tuning (software encoding only).
+            The defaults favor encode speed; for archival grids pass
+            preset="slow", crf=20, tune=None.
+        filter_threads: Threads for the scale/xstack filter graph
+            (default: one per CPU)
 
     Returns:
         True if successful, False otherwise
@@ -253,36 +567,49 @@ def create_grid_video(
                 gap_count=len(synced.gap_indices),
             )
 
-        # For each camera, create a concat file
-        concat_files = []
-
         for camera in camera_names:
-            files = camera_files[camera]
-            if not files:
+            if not camera_files[camera]:
                 logger.error(f"No files for camera {camera}")
                 return False
 
-            # Create concat file
-            with tempfile.NamedTemporaryFile(
-                mode="w", suffix=f"_{camera}.txt", delete=False
-            ) as f:
-                concat_file = Path(f.name)
-                for file_path in files:
-                    escaped = str(file_path).replace("'", "'\\''")
-                    f.write(f"file '{escaped}'\n")
-                concat_files.append(concat_file)
+        # Scale and stack on the GPU when the encoder's device has the filters
+        hw_stack = hw_stack_supported(hwaccel)
+        input_options = HW_STACK_FILTERS[hwaccel][2] if hw_stack else []
+        if hw_stack:
+            logger.info("Using hardware grid stacking", hwaccel=hwaccel.value)
 
-        try:
-            # Build ffmpeg command
-            cmd = ["ffmpeg", "-y"]
+        camera_inputs: list[_CameraInput] = []
 
-            # Add input files (using concat demuxer for each camera)
-            for concat_file in concat_files:
-                cmd.extend(["-f", "concat", "-safe", "0", "-i", str(concat_file)])
+        try:
+            # For each camera, create an input (concat lists in memory where
+            # possible), inside the try so the lists are released on any error
+            for camera in camera_names:
+                camera_inputs.append(_open_camera_input(camera, camera_files[camera]))
+            pass_fds = [ci.fd for ci in camera_inputs if ci.fd is not None]
+
+            # Build ffmpeg command, letting scale+xstack use every core
+            if filter_threads is None:
+                filter_threads = os.cpu_count() or 4
+            cmd = [
+                "ffmpeg", "-nostdin", "-y",
+                "-filter_threads", str(filter_threads),
+                "-filter_complex_threads", str(filter_threads),
+            ]
+
+            # Add input files (using concat demuxer for multi-file cameras)
+            # A deeper per-input packet queue keeps one slow demuxer from
+            # stalling the others feeding xstack
+            for camera_input in camera_inputs:
+                cmd.extend([
+                    *input_options,
+                    "-thread_queue_size", "1024",
+                    *camera_input.args,
+                ])
 
             # Generate and add filter complex
             filter_complex = generate_xstack_filter(
-                camera_count, layout, cell_width, cell_height
+                camera_count, layout, cell_width, cell_height,
+                hwaccel=hwaccel if hw_stack else None,
             )
             cmd.extend(["-filter_complex", filter_complex])
 
@@ -300,14 +627,21 @@ def create_grid_video(
                     "-global_quality", "23",
                 ])
             elif hwaccel == HWAccel.VAAPI:
+                if not hw_stack:
+                    # Software-stacked frames must be uploaded (GPU-stacked ones already are)
+                    cmd.extend(["-vf", "format=nv12,hwupload"])
                 cmd.extend([
-                    "-vf", "format=nv12,hwupload", # Needed for VAAPI output
                     "-c:v", "h264_vaapi",
                     "-qp", "23",
                 ])
             else:
                 # Software encoding
-                cmd.extend(["-c:v", "libx264", "-preset", preset])
+                cmd.extend(["-c:v", "libx264", "-preset", preset, "-crf", str(crf)])
+                if tune:
+                    cmd.extend(["-tune", tune])
+
+            # Let ffmpeg pick the thread count for the output encoder
+            cmd.extend(["-threads", "0"])
 
             # Add progress output if callback provided
             if progress_callback:
@@ -317,33 +651,42 @@ def create_grid_video(
 
             logger.info("Starting grid encoding", cameras=camera_names)
 
+            # Progress is read from raw binary pipes; otherwise let
+            # communicate() decode the output for us
             process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
+                text=progress_callback is None,
+                bufsize=0 if progress_callback else -1,
+                pass_fds=pass_fds,
             )
 
             if progress_callback and process.stdout:
-                # Parse progress from stdout
-                for line in process.stdout:
-                    progress = parse_ffmpeg_progress(line.strip(), estimated_duration)
-                    if progress:
-                        progress_callback(progress)
-                # Read any remaining stderr and wait
-                stderr = process.stderr.read() if process.stderr else ""
+                # Parse progress from stdout while draining stderr
+                stderr = _pump_progress(process, estimated_duration, progress_callback)
                 process.wait()
             else:
                 _, stderr = process.communicate()
 
             if process.returncode != 0:
                 logger.error("Grid encoding failed", stderr=stderr)
+                # GPU decode, stacking or encoding may fail where the CPU
+                # path works, so retry a failed hardware run in software
+                if hwaccel != HWAccel.NONE:
+                    fall_back_to_software(hwaccel, stderr)
+                    return create_grid_video(
+                        camera_files, output_path, cell_width, cell_height,
+                        preset, progress_callback, estimated_duration,
+                        hwaccel=HWAccel.NONE, crf=crf, tune=tune,
+                        filter_threads=filter_threads,
+                    )
                 return False
 
             logger.info("Grid video created", output=str(output_path))
             return True
 
         finally:
-            # Cleanup concat files
-            for concat_file in concat_files:
-                concat_file.unlink(missing_ok=True)
+            # Cleanup concat lists
+            for camera_input in camera_inputs:
+                camera_input.close()
@@ -5,19 +5,17 @@ Configure via environment variables:
     OTEL_EXPORTER_OTLP_ENDPOINT: OTLP endpoint (default: http://localhost:4317)
     OTEL_SERVICE_NAME: Service name (default: frigate-tools)
     OTEL_ENABLED: Enable/disable OTel (default: true)
+    LOG_LEVEL: Minimum log level (default: info)
 """
 
 import functools
+import logging
 import os
 from contextlib import contextmanager
 from typing import Any, Callable, Generator, ParamSpec, TypeVar
 
 import structlog
 from opentelemetry import trace
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
 from opentelemetry.trace import Status, StatusCode, Tracer
 
 P = ParamSpec("P")
@@ -26,6 +24,10 @@ R = TypeVar("R")
 _initialized = False
 _tracer: Tracer | None = None
 _logger: structlog.stdlib.BoundLogger | None = None
+# Whether init_observability configured a tracer provider (set once at init)
+_otel_enabled = False
+
+_get_current_span = trace.get_current_span
 
 
 def _add_trace_context(
@@ -34,19 +36,35 @@ def _add_trace_context(
     event_dict: dict[str, Any],
 ) -> dict[str, Any]:
     """Structlog processor that adds trace context to log entries."""
-    span = trace.get_current_span()
-    if span.is_recording():
-        ctx = span.get_span_context()
-        event_dict["trace_id"] = format(ctx.trace_id, "032x")
-        event_dict["span_id"] = format(ctx.span_id, "016x")
+    if not _otel_enabled:
+        # No provider configured, so no span can be recording
+        return event_dict
+    span = _get_current_span()
+    if not span.is_recording():
+        return event_dict
+    ctx = span.get_span_context()
+    event_dict["trace_id"], event_dict["span_id"] = _format_ids(ctx.trace_id, ctx.span_id)
     return event_dict
 
 
+@functools.lru_cache(maxsize=256)
+def _format_ids(trace_id: int, span_id: int) -> tuple[str, str]:
+    """Hex-format trace/span ids (cached; a span logs many lines)."""
+    return trace_id.to_bytes(16, "big").hex(), span_id.to_bytes(8, "big").hex()
+
+
 def _is_otel_enabled() -> bool:
     """Check if OTel is enabled via environment variable."""
     return os.environ.get("OTEL_ENABLED", "true").lower() in ("true", "1", "yes")
 
 
+def _get_log_level() -> int:
+    """Get minimum log level from environment."""
+    name = os.environ.get("LOG_LEVEL", "info").upper()
+    level = logging.getLevelName(name)
+    return level if isinstance(level, int) else logging.INFO
+
+
 def _get_endpoint() -> str:
     """Get OTLP endpoint from environment."""
     return os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317")
@@ -69,7 +87,7 @@ def init_observability(
         endpoint: Override OTLP endpoint (default from OTEL_EXPORTER_OTLP_ENDPOINT env var)
         sync_export: Use synchronous span export (useful for testing)
     """
-    global _initialized, _tracer, _logger
+    global _initialized, _tracer, _logger, _otel_enabled
 
     if _initialized:
         return
@@ -78,7 +96,15 @@ def init_observability(
     endpoint = endpoint or _get_endpoint()
 
     # Configure OpenTelemetry tracer
-    if _is_otel_enabled():
+    _otel_enabled = _is_otel_enabled()
+    if _otel_enabled:
+        # The SDK and gRPC exporter are slow to import; only pay for them
+        # when exporting
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, SimpleSpanProcessor
+
         resource = Resource.create({"service.name": service_name})
         provider = TracerProvider(resource=resource)
 
@@ -92,7 +118,8 @@ def init_observability(
 
     _tracer = trace.get_tracer(service_name)
 
-    # Configure structlog with trace context injection
+    # Configure structlog with trace context injection; calls below the
+    # level are dropped before any processor runs
     structlog.configure(
         processors=[
             structlog.contextvars.merge_contextvars,
@@ -101,7 +128,7 @@ def init_observability(
             _add_trace_context,
             structlog.processors.JSONRenderer(),
         ],
-        wrapper_class=structlog.make_filtering_bound_logger(0),
+        wrapper_class=structlog.make_filtering_bound_logger(_get_log_level()),
         context_class=dict,
         logger_factory=structlog.PrintLoggerFactory(),
         cache_logger_on_first_use=True,
@@ -198,6 +225,8 @@ def traced(
 
 def shutdown_observability() -> None:
     """Shutdown the tracer provider, flushing any pending spans."""
+    # Only SDK providers can shut down; checking by attribute avoids
+    # importing the SDK when OTel was never enabled
     provider = trace.get_tracer_provider()
-    if isinstance(provider, TracerProvider):
+    if hasattr(provider, "shutdown"):
         provider.shutdown()
@@ -5,26 +5,36 @@ Frame-based extraction approach (no concat!):
 2. Extract keyframes from source files in parallel
 3. Encode extracted frames to output video
 
-For high speedups (300x+): Extract 1st keyframe from sampled files
+For high speedups (300x+): Pipe the 1st keyframe of sampled files into the encoder
 For medium speedups (30-300x): Extract all keyframes, sample for output
-For low speedups (<30x): Use concat + encode (needs more than keyframes)
+For low speedups (<30x): Encode sources in one pass via the concat demuxer
 
 Uses -skip_frame nokey for efficient keyframe-only decoding.
 Supports hardware acceleration (Intel QSV, VAAPI) when available.
 """
 
-import math
+import functools
+import json
 import os
+import platform
 import re
+import selectors
 import shutil
+import struct
 import subprocess
 import tempfile
-from collections.abc import Callable
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import threading
+import time
+import warnings
+from array import array
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 
+from frigate_tools.file_list import get_cache_dir
 from frigate_tools.observability import get_logger, traced_operation
 
 
@@ -58,12 +68,15 @@ def detect_hwaccel() -> HWAccel:
             timeout=5,
         )
         if "h264_qsv" in result.stdout:
-            # Verify QSV actually works with a quick test
+            # Verify QSV actually works with a quick test. One frame is
+            # enough: the failures this catches happen at device or encoder
+            # init, and the encoder check matters for decode-only GPUs
             test_result = subprocess.run(
                 [
                     "ffmpeg", "-hide_banner", "-v", "error",
                     "-init_hw_device", "qsv=qsv:hw",
-                    "-f", "lavfi", "-i", "nullsrc=s=64x64:d=0.1",
+                    "-f", "lavfi", "-i", "nullsrc=s=64x64",
+                    "-frames:v", "1",
                     "-c:v", "h264_qsv", "-f", "null", "-"
                 ],
                 capture_output=True,
@@ -80,7 +93,8 @@ def detect_hwaccel() -> HWAccel:
                 [
                     "ffmpeg", "-hide_banner", "-v", "error",
                     "-vaapi_device", "/dev/dri/renderD128",
-                    "-f", "lavfi", "-i", "nullsrc=s=64x64:d=0.1",
+                    "-f", "lavfi", "-i", "nullsrc=s=64x64",
+                    "-frames:v", "1",
                     "-vf", "format=nv12,hwupload",
                     "-c:v", "h264_vaapi", "-f", "null", "-"
                 ],
@@ -103,14 +117,94 @@ def detect_hwaccel() -> HWAccel:
 _hwaccel_cache: HWAccel | None = None
 
 
+# Persisted detection results expire after this long, so driver updates
+# (which change neither ffmpeg nor the device node) are picked up eventually
+HWACCEL_CACHE_TTL = 7 * 24 * 3600
+
+
+def _hwaccel_fingerprint() -> str:
+    """Fingerprint what detection depends on: host, ffmpeg binary and render device.
+
+    The host name is included because the cache directory may live in a home
+    directory shared between machines.
+    """
+    parts = [platform.node()]
+    for path in (shutil.which("ffmpeg"), "/dev/dri/renderD128"):
+        try:
+            st = os.stat(path) if path else None
+        except OSError:
+            st = None
+        parts.append(f"{path}:{st.st_size}:{st.st_mtime_ns}" if st else f"{path}:missing")
+    return "|".join(parts)
+
+
+def _load_hwaccel(fingerprint: str) -> HWAccel | None:
+    """Load a persisted detection result if it matches the fingerprint."""
+    try:
+        data = json.loads((get_cache_dir() / "hwaccel.json").read_text())
+        fresh = time.time() - data["detected_at"] < HWACCEL_CACHE_TTL
+        if data["fingerprint"] == fingerprint and fresh:
+            return HWAccel(data["hwaccel"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _save_hwaccel(fingerprint: str, hwaccel: HWAccel) -> None:
+    """Persist a detection result for later runs (written atomically)."""
+    path = get_cache_dir() / "hwaccel.json"
+    tmp_path = path.with_suffix(".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(json.dumps({
+            "fingerprint": fingerprint,
+            "hwaccel": hwaccel.value,
+            "detected_at": time.time(),
+        }))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        get_logger().debug("Could not save hwaccel cache", error=str(e))
+
+
 def get_hwaccel() -> HWAccel:
-    """Get cached hardware acceleration type."""
+    """Get cached hardware acceleration type.
+
+    Detection spawns several ffmpeg probes, so the result is also persisted
+    in the cache directory and reused by later runs until the ffmpeg binary
+    or render device changes, or HWACCEL_CACHE_TTL passes.
+    """
     global _hwaccel_cache
     if _hwaccel_cache is None:
-        _hwaccel_cache = detect_hwaccel()
+        fingerprint = _hwaccel_fingerprint()
+        _hwaccel_cache = _load_hwaccel(fingerprint)
+        if _hwaccel_cache is None:
+            _hwaccel_cache = detect_hwaccel()
+            _save_hwaccel(fingerprint, _hwaccel_cache)
     return _hwaccel_cache
 
 
+# ffmpeg errors meaning the hardware device or session could not be set up
+# at all; these fail identically on every retry, unlike mid-encode errors
+HW_INIT_FAILURE_PATTERN = re.compile(
+    r"Failed to initiali[sz]e|Error creating a MFX session|Device creation failed"
+)
+
+
+def fall_back_to_software(hwaccel: HWAccel, stderr: str) -> None:
+    """Log a failed hardware encode before its software retry.
+
+    If the device itself could not be initialised, later encodes in this
+    process skip hardware too instead of paying the failed init again.
+    """
+    global _hwaccel_cache
+    logger = get_logger()
+    if HW_INIT_FAILURE_PATTERN.search(stderr):
+        logger.warning("Hardware initialisation failed, disabling for this run", hwaccel=hwaccel.value)
+        _hwaccel_cache = HWAccel.NONE
+    else:
+        logger.info("Falling back to software encoding", hwaccel=hwaccel.value)
+
+
 @dataclass
 class ProgressInfo:
     """FFmpeg encoding progress information."""
@@ -123,6 +217,28 @@ class ProgressInfo:
     total: int | None = None  # Total frames/files for extraction progress
 
 
+# Classic progress line fields, compiled once
+FRAME_PATTERN = re.compile(r"frame=\s*(\d+)")
+FPS_PATTERN = re.compile(r"fps=\s*([\d.]+)")
+SPEED_PATTERN = re.compile(r"speed=\s*([\d.]+)x")
+
+
+def _parse_clock(value: str) -> float | None:
+    """Parse an ffmpeg HH:MM:SS.ss timestamp into seconds, without regex.
+
+    Returns None for "N/A", negative times (before the first frame) or
+    anything else that isn't a timestamp.
+    """
+    hours, _, rest = value.partition(":")
+    minutes, sep, seconds = rest.partition(":")
+    if not sep or not hours.isdigit():
+        return None
+    try:
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return None
+
+
 def parse_ffmpeg_progress(line: str, total_duration: float | None = None) -> ProgressInfo | None:
     """Parse FFmpeg progress line.
 
@@ -132,20 +248,12 @@ def parse_ffmpeg_progress(line: str, total_duration: float | None = None) -> Pro
     2. -progress pipe:1 format: out_time=00:00:04.100000 (key=value on separate lines)
        Only needs out_time line for progress calculation.
     """
-    # Try to match classic format (all on one line) or -progress format (separate lines)
-    frame_match = re.search(r"frame=\s*(\d+)", line)
-    fps_match = re.search(r"fps=\s*([\d.]+)", line)
-    speed_match = re.search(r"speed=\s*([\d.]+)x", line)
-
-    # Check for out_time (from -progress pipe:1) - this is on its own line
-    out_time_match = re.search(r"^out_time=(\d+):(\d+):([\d.]+)", line)
-    # Check for classic time= format (on same line as frame=)
-    classic_time_match = re.search(r"time=(\d+):(\d+):([\d.]+)", line)
-
-    # For -progress format: just need out_time line to report progress
-    if out_time_match:
-        hours, minutes, seconds = out_time_match.groups()
-        time_seconds = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    # For -progress format: just need out_time line to report progress.
+    # Split it by hand; it's the hot path and has a fixed layout
+    if line.startswith("out_time="):
+        time_seconds = _parse_clock(line[9:])
+        if time_seconds is None:
+            return None
 
         percent = None
         if total_duration and total_duration > 0:
@@ -159,14 +267,23 @@ def parse_ffmpeg_progress(line: str, total_duration: float | None = None) -> Pro
             percent=percent,
         )
 
-    # For classic format: need both frame and time on same line
-    if frame_match and classic_time_match:
+    # For classic format: need both frame and time on same line. Bail out
+    # on other -progress keys before running any regex
+    if "frame=" not in line or "time=" not in line:
+        return None
+
+    time_start = line.index("time=") + 5
+    time_end = line.find(" ", time_start)
+    time_seconds = _parse_clock(line[time_start:time_end if time_end >= 0 else None])
+
+    frame_match = FRAME_PATTERN.search(line)
+    if frame_match and time_seconds is not None:
+        fps_match = FPS_PATTERN.search(line)
+        speed_match = SPEED_PATTERN.search(line)
+
         frame = int(frame_match.group(1))
         fps = float(fps_match.group(1)) if fps_match else 0.0
 
-        hours, minutes, seconds = classic_time_match.groups()
-        time_seconds = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
-
         speed = float(speed_match.group(1)) if speed_match else 0.0
 
         percent = None
@@ -184,45 +301,281 @@ def parse_ffmpeg_progress(line: str, total_duration: float | None = None) -> Pro
     return None
 
 
-def get_video_info(file_path: Path) -> tuple[float, float]:
-    """Get duration and frame rate of a video file using ffprobe.
+def get_video_info(file_path: Path) -> tuple[float, float, str]:
+    """Get duration, frame rate and codec of a video file using ffprobe.
+
+    Results are cached per (path, mtime, size), so a file is probed once per
+    process unless it changes. Frigate segments are never rewritten.
 
     Returns:
-        Tuple of (duration_seconds, fps)
+        Tuple of (duration_seconds, fps, codec_name); codec_name is "" if unknown
     """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return _probe_video_info(file_path)
+    return _cached_video_info(str(file_path), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_video_info(path: str, mtime_ns: int, size: int) -> tuple[float, float, str]:
+    """Probe a file; mtime_ns and size are part of the cache key only."""
+    return _probe_video_info(Path(path))
+
+
+def _probe_video_info(file_path: Path) -> tuple[float, float, str]:
+    """Read duration, frame rate and codec (uncached).
+
+    MP4s are read straight from the container header; anything else, or
+    anything the header parser can't make sense of, goes to ffprobe.
+    """
+    info = _mp4_video_info(file_path)
+    if info is not None:
+        return info
+
     cmd = [
         "ffprobe",
         "-v", "error",
         "-select_streams", "v:0",
-        "-show_entries", "format=duration:stream=r_frame_rate",
-        "-of", "json",
+        "-show_entries", "format=duration:stream=r_frame_rate,codec_name",
+        # Flat key=value lines: a few dozen bytes, no JSON parse needed
+        "-of", "default=noprint_wrappers=1",
         str(file_path),
     ]
     result = subprocess.run(cmd, capture_output=True, text=True)
     if result.returncode != 0:
-        return 0.0, 0.0
+        return 0.0, 0.0, ""
 
-    import json
     try:
-        data = json.loads(result.stdout)
-        duration = float(data.get("format", {}).get("duration", 0))
+        fields = dict(line.partition("=")[::2] for line in result.stdout.splitlines())
+        duration = float(fields.get("duration", 0))
 
         # Parse frame rate (e.g., "30/1" or "30000/1001")
-        fps_str = data.get("streams", [{}])[0].get("r_frame_rate", "0/1")
-        num, den = map(int, fps_str.split("/"))
+        num, den = map(int, fields.get("r_frame_rate", "0/1").split("/"))
         fps = num / den if den else 0.0
 
-        return duration, fps
-    except (ValueError, KeyError, IndexError, json.JSONDecodeError):
-        return 0.0, 0.0
+        return duration, fps, fields.get("codec_name", "")
+    except ValueError:
+        return 0.0, 0.0, ""
+
+
+def _iter_mp4_boxes(f, pos: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    """Yield (type, body_start, box_end) for each MP4 box between pos and end.
+
+    Only box headers are read, seeking over bodies such as mdat.
+    """
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(16)
+        size, box_type = struct.unpack(">I4s", header[:8])
+        header_size = 8
+        if size == 1:  # 64-bit size follows the type
+            size = struct.unpack(">Q", header[8:16])[0]
+            header_size = 16
+        elif size == 0:  # Box runs to the end of its parent
+            size = end - pos
+        if size < header_size:
+            return
+        yield box_type, pos + header_size, pos + size
+        pos += size
+
+
+def _find_mp4_box(f, pos: int, end: int, *path: bytes) -> tuple[int, int] | None:
+    """Descend through nested box types, returning the last one's (body_start, end)."""
+    for box_type in path:
+        for found_type, body, box_end in _iter_mp4_boxes(f, pos, end):
+            if found_type == box_type:
+                pos, end = body, box_end
+                break
+        else:
+            return None
+    return pos, end
+
+
+def _mp4_header_duration(f, body: int) -> float | None:
+    """Duration in seconds from an mvhd box body."""
+    f.seek(body)
+    data = f.read(32)
+    if data[0] == 1:  # Version 1: 64-bit times and duration
+        timescale, duration = struct.unpack(">IQ", data[20:32])
+    else:
+        timescale, duration = struct.unpack(">II", data[12:20])
+    return duration / timescale if timescale and duration else None
+
+
+def _mp4_duration(file_path: Path) -> float | None:
+    """Read an MP4's duration from its moov/mvhd box, without ffprobe.
+
+    Only box headers are read, seeking over mdat, so this is a few small
+    reads wherever moov sits (Frigate segments have it at the end).
+
+    Returns:
+        Duration in seconds, or None if no usable mvhd box was found
+    """
+    try:
+        with open(file_path, "rb") as f:
+            mvhd = _find_mp4_box(f, 0, os.fstat(f.fileno()).st_size, b"moov", b"mvhd")
+            return _mp4_header_duration(f, mvhd[0]) if mvhd else None
+    except (OSError, struct.error, IndexError):
+        return None
+
+
+# MP4 sample entry types, by the codec names ffprobe reports for them
+MP4_CODECS = {b"avc1": "h264", b"avc3": "h264", b"hvc1": "hevc", b"hev1": "hevc"}
+
+
+def _mp4_video_info(file_path: Path) -> tuple[float, float, str] | None:
+    """Read duration, frame rate and codec from an MP4's moov box, without ffprobe.
+
+    The frame rate is the nominal one, like ffprobe's r_frame_rate: the
+    mdhd timescale over the first stts sample delta, not an average that
+    variable-rate recordings would skew. The codec comes from the sample
+    description.
+
+    Returns:
+        Tuple of (duration_seconds, fps, codec_name), or None if any of them
+        could not be read (including codecs missing from MP4_CODECS)
+    """
+    try:
+        with open(file_path, "rb") as f:
+            moov = _find_mp4_box(f, 0, os.fstat(f.fileno()).st_size, b"moov")
+            mvhd = _find_mp4_box(f, *moov, b"mvhd") if moov else None
+            duration = _mp4_header_duration(f, mvhd[0]) if mvhd else None
+            if not duration:
+                return None
+
+            for box_type, body, box_end in _iter_mp4_boxes(f, *moov):
+                if box_type != b"trak":
+                    continue
+                mdia = _find_mp4_box(f, body, box_end, b"mdia")
+                hdlr = _find_mp4_box(f, *mdia, b"hdlr") if mdia else None
+                if not hdlr:
+                    continue
+                f.seek(hdlr[0] + 8)  # Skip version/flags and pre_defined
+                if f.read(4) != b"vide":
+                    continue
+
+                mdhd = _find_mp4_box(f, *mdia, b"mdhd")
+                stbl = _find_mp4_box(f, *mdia, b"minf", b"stbl")
+                stsd = _find_mp4_box(f, *stbl, b"stsd") if stbl else None
+                stts = _find_mp4_box(f, *stbl, b"stts") if stbl else None
+                if not (mdhd and stsd and stts):
+                    return None
+
+                f.seek(mdhd[0])
+                data = f.read(24)
+                timescale = struct.unpack(">I", data[20:24] if data[0] == 1 else data[12:16])[0]
+
+                # First sample entry's type, after version/flags, count and size
+                f.seek(stsd[0] + 12)
+                codec = MP4_CODECS.get(f.read(4))
+
+                # stts is a run-length list of (sample count, sample duration);
+                # the first run's duration is the nominal frame interval
+                f.seek(stts[0] + 4)
+                entries, samples, delta = struct.unpack(">III", f.read(12))
+                if not (codec and entries and samples and delta):
+                    return None
+                return duration, timescale / delta, codec
+    except (OSError, struct.error, IndexError):
+        return None
+    return None
 
 
 def get_video_duration(file_path: Path) -> float:
-    """Get duration of a video file in seconds using ffprobe."""
-    duration, _ = get_video_info(file_path)
+    """Get duration of a video file in seconds.
+
+    MP4 durations are read straight from the container header; anything
+    else falls back to ffprobe.
+    """
+    duration = _mp4_duration(file_path)
+    if duration is not None:
+        return duration
+    duration, _, _ = get_video_info(file_path)
     return duration
 
 
+def get_video_durations_parallel(files: list[Path], max_workers: int = 16) -> list[float]:
+    """Get durations of several video files, probing them concurrently.
+
+    Each probe is a separate ffprobe process that mostly waits on process
+    startup and I/O, so threads overlap them well.
+
+    Args:
+        files: Video files to probe
+        max_workers: Maximum concurrent ffprobe processes
+
+    Returns:
+        Durations in seconds, in the same order as files (0.0 if unknown)
+    """
+    if len(files) <= 1:
+        return [get_video_duration(f) for f in files]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(files))) as executor:
+        return list(executor.map(get_video_duration, files))
+
+
+# Commands that report through -progress pipe:1 don't need ffmpeg's banner
+# or once-a-second stats on stderr, which on long encodes add up to megabytes
+# of captured output; errors are still captured for the failure log
+PROGRESS_LOG_OPTS = ["-hide_banner", "-nostats", "-loglevel", "error"]
+
+# Only the end of stderr is kept for the failure log; the final error is last
+STDERR_TAIL_BYTES = 64 * 1024
+STDERR_TAIL_LINES = 1000
+
+
+def _read_progress(
+    process: subprocess.Popen,
+    total_duration: float | None,
+    progress_callback: Callable[[ProgressInfo], None] | None,
+) -> str:
+    """Read ffmpeg's binary stdout/stderr pipes to EOF, reporting progress.
+
+    Both pipes are polled with a selector and drained with os.read, so
+    ffmpeg never blocks on a full pipe while we parse its -progress lines.
+
+    Returns:
+        Decoded stderr output (its last STDERR_TAIL_BYTES)
+    """
+    stderr_tail = bytearray()
+    pending = bytearray()
+
+    def parse_line(line: bytes) -> None:
+        # Only out_time= and classic frame= stats lines carry progress; skip
+        # the other -progress keys while still bytes, without decoding them
+        if progress_callback and line.startswith((b"out_time=", b"frame=")):
+            progress = parse_ffmpeg_progress(line.decode("ascii", "ignore").strip(), total_duration)
+            if progress:
+                progress_callback(progress)
+
+    with selectors.DefaultSelector() as selector:
+        selector.register(process.stdout, selectors.EVENT_READ)
+        if process.stderr:
+            selector.register(process.stderr, selectors.EVENT_READ)
+
+        while selector.get_map():
+            for key, _ in selector.select():
+                chunk = os.read(key.fd, 65536)
+                if not chunk:
+                    selector.unregister(key.fileobj)
+                    if key.fileobj is process.stdout and pending:
+                        parse_line(bytes(pending))
+                elif key.fileobj is process.stderr:
+                    # A corrupt input can log an error per packet; trim in
+                    # amortized steps so memory stays bounded
+                    stderr_tail += chunk
+                    if len(stderr_tail) > 2 * STDERR_TAIL_BYTES:
+                        del stderr_tail[:-STDERR_TAIL_BYTES]
+                else:
+                    pending += chunk
+                    *lines, rest = pending.split(b"\n")
+                    pending = bytearray(rest)
+                    for line in lines:
+                        parse_line(line)
+
+    return stderr_tail[-STDERR_TAIL_BYTES:].decode(errors="replace")
+
+
 @dataclass
 class ConcatProgress:
     """Concatenation progress information."""
@@ -234,128 +587,201 @@ class ConcatProgress:
     percent: float | None = None
 
 
+MPEGTS_SUFFIXES = {".ts", ".mts", ".m2ts"}
+
+
 def concat_files(
     input_files: list[Path],
     output_path: Path,
     progress_callback: Callable[[ConcatProgress], None] | None = None,
-    batch_size: int = 100,
+    batch_size: int | None = None,
 ) -> bool:
     """Concatenate video files using ffmpeg concat demuxer.
 
-    Uses -c copy for fast concatenation without re-encoding.
-    Processes files in batches to avoid issues with a very large number of files.
+    Uses -c copy for fast concatenation without re-encoding. All files go
+    through a single demuxer pass: the file list is a manifest on disk, not
+    argv, so there is no need to batch through intermediate files.
+
+    On Linux, MPEG-TS inputs written to an MPEG-TS output need no muxing at
+    all and are joined byte for byte in the kernel instead (see _concat_mpegts).
 
     Args:
         input_files: List of video files to concatenate
         output_path: Output file path
         progress_callback: Optional callback for progress updates (receives ConcatProgress)
-        batch_size: Number of files to concatenate in each batch.
+        batch_size: Deprecated and ignored; files are no longer batched
 
     Returns:
         True if successful, False otherwise
     """
-    import time
-    import tempfile
-
     logger = get_logger()
 
+    if batch_size is not None:
+        warnings.warn(
+            "concat_files() no longer batches files; batch_size is ignored",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+
     if not input_files:
         logger.error("No input files provided")
         return False
 
-    with traced_operation("concat_files", {"file_count": len(input_files), "batch_size": batch_size}):
-        total_files = len(input_files)
-        total_batches = (total_files + batch_size - 1) // batch_size
-        intermediate_files = []
-        temp_dir = Path(tempfile.mkdtemp(prefix="frigate_concat_"))
-        
-        try:
-            files_processed_count = 0
-            for i in range(total_batches):
-                batch_start_index = i * batch_size
-                batch_end_index = min((i + 1) * batch_size, total_files)
-                batch = input_files[batch_start_index:batch_end_index]
-                batch_output_path = temp_dir / f"intermediate_{i}.mp4"
-                
-                logger.info("Processing batch", batch_num=i+1, of=total_batches, file_count=len(batch))
-                
-                if not _concat_batch(batch, batch_output_path):
-                    logger.error(f"Failed to concatenate batch {i+1}")
-                    return False
-                
-                intermediate_files.append(batch_output_path)
-                
-                files_processed_count += len(batch)
+    with traced_operation("concat_files", {"file_count": len(input_files)}):
+        # sendfile() can only target a regular file on Linux
+        if platform.system() == "Linux" and all(
+            p.suffix.lower() in MPEGTS_SUFFIXES for p in (*input_files, output_path)
+        ):
+            return _concat_mpegts(input_files, output_path, progress_callback)
+        return _concat_batch(input_files, output_path, progress_callback)
+
+
+def _concat_mpegts(
+    input_files: list[Path],
+    output_path: Path,
+    progress_callback: Callable[[ConcatProgress], None] | None = None,
+) -> bool:
+    """Join MPEG-TS files by copying their bytes with os.sendfile.
+
+    A transport stream is a plain sequence of self-contained packets, so the
+    concatenated bytes are a valid stream and no process needs spawning.
+    """
+    logger = get_logger()
+    start_time = time.monotonic()
+    bytes_written = 0
+
+    try:
+        with open(output_path, "wb") as out:
+            for index, input_file in enumerate(input_files):
+                with open(input_file, "rb") as src:
+                    size = os.fstat(src.fileno()).st_size
+                    offset = 0
+                    while offset < size:
+                        sent = os.sendfile(out.fileno(), src.fileno(), offset, size - offset)
+                        if sent == 0:
+                            break
+                        offset += sent
+                bytes_written += offset
                 if progress_callback:
-                    percent = min(100.0, (files_processed_count / total_files) * 100)
                     progress_callback(ConcatProgress(
-                        files_total=total_files,
-                        files_processed=files_processed_count,
-                        bytes_written=0, # Not easily available for file-based progress
-                        elapsed_seconds=0, # Not easily available for file-based progress
-                        percent=percent,
+                        files_total=len(input_files),
+                        files_processed=index + 1,
+                        bytes_written=bytes_written,
+                        elapsed_seconds=time.monotonic() - start_time,
+                        percent=(index + 1) / len(input_files) * 100,
                     ))
+    except OSError as e:
+        logger.error("MPEG-TS concat failed", error=str(e))
+        return False
 
-            # Finally, concatenate the intermediate files.
-            # This step also needs to report progress if there's more than one intermediate file.
-            final_concat_successful = _concat_batch(intermediate_files, output_path)
-            
-            if final_concat_successful and progress_callback:
-                progress_callback(ConcatProgress(
-                    files_total=total_files,
-                    files_processed=total_files,
-                    bytes_written=0,
-                    elapsed_seconds=0,
-                    percent=100.0,
-                ))
-            return final_concat_successful
+    logger.info("Concat complete", output=str(output_path), bytes=bytes_written)
+    return True
 
-        finally:
-            # Clean up the temporary directory.
-            import shutil
-            shutil.rmtree(temp_dir, ignore_errors=True)
+
+def _file_size(path: Path) -> int:
+    """Return a file's size in bytes with a single stat (0 if missing)."""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+# Minimum free space for /dev/shm to be used for temp files
+SHM_MIN_FREE = 256 * 1024 * 1024
+
+
+def _tmpdir() -> str | None:
+    """Return /dev/shm if it has room for temp files, else None (system default).
+
+    Keeps short-lived temp files off /tmp, which on many Frigate hosts shares
+    a disk with the recordings being read.
+    """
+    try:
+        if shutil.disk_usage("/dev/shm").free > SHM_MIN_FREE:
+            return "/dev/shm"
+    except OSError:
+        pass
+    return None
+
+
+def concat_list_bytes(paths: list[str], outpoint: float | None = None) -> bytes:
+    """Build ffmpeg concat demuxer list contents for already-resolved paths."""
+    if not paths:
+        return b""
+
+    # Quote and join all entries with whole-string operations rather than
+    # formatting line by line; NUL cannot occur in a path, so it can stand in
+    # for the entry separator while quotes are escaped
+    entry_end = "'\n" if outpoint is None else f"'\noutpoint {outpoint}\n"
+    joined = "\0".join(paths)
+    if "'" in joined:
+        joined = joined.replace("'", "'\\''")
+    return ("file '" + joined.replace("\0", entry_end + "file '") + entry_end).encode()
+
+
+def _write_concat_list(input_files: list[Path], outpoint: float | None = None) -> Path:
+    """Write an ffmpeg concat demuxer list to a temp file (caller deletes it).
+
+    Args:
+        input_files: Files to list, in order
+        outpoint: If set, read only this many seconds from the start of each file
+    """
+    # Paths in the list are relative to the list file, so make them absolute.
+    # Joining onto the cwd, unlike resolve(), never touches the filesystem,
+    # and absolute paths (the Frigate norm) skip even that
+    cwd = os.getcwd()
+    paths = [os.fspath(file_path) for file_path in input_files]
+    paths = [p if os.path.isabs(p) else os.path.join(cwd, p) for p in paths]
+
+    data = concat_list_bytes(paths, outpoint)
+    with tempfile.NamedTemporaryFile(mode="wb", suffix=".txt", delete=False, dir=_tmpdir()) as f:
+        f.write(data)
+    return Path(f.name)
+
+
+# Move the MP4 index to the front of finished timelapses so browsers can
+# start playing them before the whole file has downloaded
+FASTSTART_OPTS = ["-movflags", "+faststart"]
 
 
 def _concat_batch(
     input_files: list[Path],
     output_path: Path,
     progress_callback: Callable[[ConcatProgress], None] | None = None,
+    faststart: bool = False,
 ) -> bool:
-    """Helper function to concatenate a single batch of files."""
-    import time
-
+    """Run one ffmpeg concat demuxer pass over input_files."""
     logger = get_logger()
-    
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".txt", delete=False) as f:
-        concat_file_list_path = Path(f.name)
-        for file_path in input_files:
-            # Resolve to absolute path to ensure ffmpeg can find the files
-            abs_path = file_path.resolve()
-            escaped = str(abs_path).replace("'", "'\\''")
-            f.write(f"file '{escaped}'\n")
+
+    concat_file_list_path = _write_concat_list(input_files)
 
     try:
         cmd = [
             "ffmpeg",
             "-nostdin",  # Prevent ffmpeg from reading stdin (messes up terminal)
             "-y",
+            *PROGRESS_LOG_OPTS,
             "-f", "concat",
             "-safe", "0",
             "-i", str(concat_file_list_path),
             "-c", "copy",
+            *(FASTSTART_OPTS if faststart else []),
         ]
 
-        # Add progress output if callback provided (only if re-encoding, copy doesn't give good progress)
-        # For concat -c copy, ffmpeg doesn't output reliable progress updates via pipe:1
-        # if progress_callback:
-        #     cmd.extend(["-progress", "pipe:1"])
+        # With -c copy, output size tracks input size closely, so total_size
+        # from -progress is a good progress measure
+        if progress_callback:
+            cmd.extend(["-progress", "pipe:1"])
 
         cmd.append(str(output_path))
-        
-        # Calculate total input size for logging and potential future progress estimation
-        total_size = sum(f.stat().st_size for f in input_files if f.exists())
-        logger.info("Starting batch concat", file_count=len(input_files), total_size=total_size)
-        
+
+        # The input total only matters as the denominator for progress, so
+        # skip a stat per input when nobody is listening
+        total_size = sum(_file_size(f) for f in input_files) if progress_callback else 0
+        logger.info("Starting concat", file_count=len(input_files))
+
+        start_time = time.monotonic()
+        bytes_written = 0
         process = subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
@@ -363,45 +789,105 @@ def _concat_batch(
             text=True,
         )
 
-        # For -c copy, ffmpeg typically doesn't send progress to stdout via -progress pipe:1
-        # Just consume stdout/stderr after process finishes
-        stdout, stderr = process.communicate()
-
+        if progress_callback and process.stdout:
+            # Drain stderr on a thread so it can't fill up and stall ffmpeg
+            # while we read progress from stdout; only the tail is kept for
+            # error context
+            stderr_lines: deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+            stderr_reader = threading.Thread(
+                target=stderr_lines.extend, args=(process.stderr,), daemon=True
+            )
+            stderr_reader.start()
+            for line in process.stdout:
+                if not line.startswith("total_size="):
+                    continue
+                try:
+                    bytes_written = int(line.strip().split("=", 1)[1])
+                except ValueError:
+                    continue
+                percent = None
+                if total_size > 0:
+                    # Hold at 99% until ffmpeg has actually finished
+                    percent = min(99.0, bytes_written / total_size * 100)
+                progress_callback(ConcatProgress(
+                    files_total=len(input_files),
+                    files_processed=0,
+                    bytes_written=bytes_written,
+                    elapsed_seconds=time.monotonic() - start_time,
+                    percent=percent,
+                ))
+            process.wait()
+            stderr_reader.join()
+            stderr = "".join(stderr_lines)
+        else:
+            _, stderr = process.communicate()
 
         if process.returncode != 0:
-            logger.error("Batch concat failed", stderr=stderr)
+            logger.error("Concat failed", stderr=stderr)
             return False
-            
-        logger.info("Batch concat complete", output=str(output_path))
+
+        if progress_callback:
+            progress_callback(ConcatProgress(
+                files_total=len(input_files),
+                files_processed=len(input_files),
+                bytes_written=bytes_written,
+                elapsed_seconds=time.monotonic() - start_time,
+                percent=100.0,
+            ))
+
+        logger.info("Concat complete", output=str(output_path))
         return True
 
     finally:
         concat_file_list_path.unlink(missing_ok=True)
 
 
+# Smallest frame count worth giving its own parallel software encode segment
+SEGMENT_MIN_FRAMES = 300
+
+# Source codecs with a QSV hardware decoder
+QSV_DECODERS = {"h264": "h264_qsv", "hevc": "hevc_qsv"}
+
+# Input options that decode straight to GPU surfaces, so filters and the
+# encoder work on frames that never leave GPU memory
+HW_DECODE_OPTS: dict[HWAccel, list[str]] = {
+    HWAccel.QSV: ["-hwaccel", "qsv", "-hwaccel_output_format", "qsv"],
+    HWAccel.VAAPI: [
+        "-hwaccel", "vaapi",
+        "-hwaccel_output_format", "vaapi",
+        "-hwaccel_device", "/dev/dri/renderD128",
+    ],
+}
+
 
 def encode_timelapse(
-    input_path: Path,
+    input_path: Path | list[Path],
     output_path: Path,
     target_duration: float,
     output_fps: float = 30.0,
     preset: str = "fast",
     progress_callback: Callable[[ProgressInfo], None] | None = None,
     hwaccel: HWAccel | None = None,
+    threads: int | None = None,
 ) -> bool:
-    """Encode video with timelapse effect using setpts filter.
+    """Encode video with timelapse effect.
 
-    Uses setpts filter to speed up video by adjusting presentation timestamps.
+    Speeds up video by selecting every Nth frame (or, at high speedups in
+    software, decoding keyframes only) and rewriting presentation timestamps.
     Supports hardware acceleration (Intel QSV, VAAPI) for faster encoding.
 
+    Given a list of files, reads them through the concat demuxer as a single
+    input, so no concatenated intermediate is ever written to disk.
+
     Args:
-        input_path: Input video file
+        input_path: Input video file, or files to encode back to back
         output_path: Output file path
         target_duration: Desired output duration in seconds
         output_fps: Output frame rate (default 30)
         preset: FFmpeg preset (ultrafast, superfast, veryfast, faster, fast, medium, slow, slower, veryslow)
         progress_callback: Optional callback(ProgressInfo) for progress updates
         hwaccel: Hardware acceleration to use (auto-detected if None)
+        threads: Software encoder threads (default: CPU count)
 
     Returns:
         True if successful, False otherwise
@@ -417,7 +903,14 @@ def encode_timelapse(
         {"target_duration": target_duration, "preset": preset, "hwaccel": hwaccel.value},
     ):
         # Get source duration
-        source_duration, source_fps = get_video_info(input_path)
+        if isinstance(input_path, list):
+            source_duration = sum(get_video_durations_parallel(input_path))
+            # Segments from one camera share stream settings, so probe the first
+            _, source_fps, source_codec = (
+                get_video_info(input_path[0]) if input_path else (0.0, 0.0, "")
+            )
+        else:
+            source_duration, source_fps, source_codec = get_video_info(input_path)
         if source_duration <= 0:
             logger.error("Could not determine source duration")
             return False
@@ -438,111 +931,93 @@ def encode_timelapse(
             hwaccel=hwaccel.value,
         )
 
-        # Build command based on hardware acceleration type
-        cmd = ["ffmpeg", "-nostdin", "-y"]
+        concat_list = None
+        if isinstance(input_path, list):
+            concat_list = _write_concat_list(input_path)
+            input_args = ["-f", "concat", "-safe", "0", "-i", str(concat_list)]
+        else:
+            input_args = ["-i", str(input_path)]
+
+        # For speed=N, select every Nth frame ('not(mod(n,N))') so fewer
+        # frames go through the rest of the pipeline; at low speedups plain
+        # setpts is smoother. The select step is rounded down, so timestamps
+        # are still scaled by the exact speed and -r evens out the frame
+        # spacing; this keeps the output at target_duration
+        if speed >= 2:
+            video_filter = f"select='not(mod(n,{int(speed)}))',setpts=PTS/{speed}"
+        else:
+            video_filter = f"setpts=PTS/{speed}"
 
+        # Decoder/device options, filter tail and encoder per acceleration type
         if hwaccel == HWAccel.QSV:
-            # Intel QSV: Full hardware pipeline with frame selection
-            # select filter picks frames on GPU, avoiding CPU transfer for setpts
-            # For speed=N, select every Nth frame: 'not(mod(n,N))'
-            select_expr = f"not(mod(n,{int(speed)}))" if speed >= 2 else None
-            if select_expr:
-                # High speedup: use select filter (processes fewer frames)
-                cmd.extend([
-                    "-hwaccel", "qsv",
-                    "-hwaccel_output_format", "qsv",
-                    "-i", str(input_path),
-                    "-vf", f"select='{select_expr}',setpts=N/FRAME_RATE/TB",
-                    "-r", str(output_fps),
-                    "-c:v", "h264_qsv",
-                    "-preset", _qsv_preset(preset),
-                    "-global_quality", "23",
-                ])
-            else:
-                # Low speedup: use setpts (smoother)
-                cmd.extend([
-                    "-hwaccel", "qsv",
-                    "-hwaccel_output_format", "qsv",
-                    "-i", str(input_path),
-                    "-vf", f"setpts=PTS/{speed}",
-                    "-r", str(output_fps),
-                    "-c:v", "h264_qsv",
-                    "-preset", _qsv_preset(preset),
-                    "-global_quality", "23",
-                ])
+            # Intel QSV: full hardware pipeline. Pick the QSV decoder explicitly
+            # and bind filters to the same device so decoded frames never
+            # leave GPU memory
+            input_opts = [
+                "-init_hw_device", "qsv=hw",
+                "-filter_hw_device", "hw",
+                *HW_DECODE_OPTS[HWAccel.QSV],
+            ]
+            if source_codec in QSV_DECODERS:
+                input_opts.extend(["-c:v", QSV_DECODERS[source_codec]])
+            encode_opts = _qsv_encode_opts(preset, 23)
         elif hwaccel == HWAccel.VAAPI:
-            # VAAPI: Full hardware pipeline with frame selection
-            # select filter picks frames on GPU, scale_vaapi processes on GPU
-            select_expr = f"not(mod(n,{int(speed)}))" if speed >= 2 else None
-            if select_expr:
-                # High speedup: use select filter (processes fewer frames)
-                cmd.extend([
-                    "-hwaccel", "vaapi",
-                    "-hwaccel_output_format", "vaapi",
-                    "-hwaccel_device", "/dev/dri/renderD128",
-                    "-i", str(input_path),
-                    "-vf", f"select='{select_expr}',setpts=N/FRAME_RATE/TB,scale_vaapi=format=nv12",
-                    "-r", str(output_fps),
-                    "-c:v", "h264_vaapi",
-                    "-qp", "23",
-                ])
-            else:
-                # Low speedup: use setpts (smoother)
-                cmd.extend([
-                    "-hwaccel", "vaapi",
-                    "-hwaccel_output_format", "vaapi",
-                    "-hwaccel_device", "/dev/dri/renderD128",
-                    "-i", str(input_path),
-                    "-vf", f"setpts=PTS/{speed},scale_vaapi=format=nv12",
-                    "-r", str(output_fps),
-                    "-c:v", "h264_vaapi",
-                    "-qp", "23",
-                ])
-
+            # VAAPI: full hardware pipeline, scale_vaapi converts on the GPU
+            input_opts = HW_DECODE_OPTS[HWAccel.VAAPI]
+            video_filter += ",scale_vaapi=format=nv12"
+            encode_opts = ["-c:v", "h264_vaapi", "-qp", "23"]
         else:
             # Software encoding (default)
-            cmd.extend([
-                "-i", str(input_path),
-                "-vf", f"setpts=PTS/{speed}",
-                "-r", str(output_fps),
+            input_opts = []
+            source_file = input_path[0] if isinstance(input_path, list) else input_path
+            if speed / output_fps >= 1 / get_keyframe_rate(source_file):
+                # Once each output frame spans at least one GOP of source
+                # (measured from the first file), keyframes alone are enough.
+                # Decode only those; -r drops any surplus. select can't be
+                # used here: n would count keyframes, not source frames
+                input_opts = ["-skip_frame", "nokey"]
+                video_filter = f"setpts=PTS/{speed}"
+            # Size libx264's thread pool to the host instead of its own
+            # heuristic, which oversubscribes on high core counts
+            encode_opts = [
                 "-preset", preset,
-            ])
+                "-threads", str(threads or os.cpu_count() or 4),
+            ]
 
-        # Common options
-        cmd.extend([
+        cmd = [
+            "ffmpeg", "-nostdin", "-y",
+            *PROGRESS_LOG_OPTS,
+            *input_opts,
+            *input_args,
+            "-vf", video_filter,
+            "-r", str(output_fps),
+            *encode_opts,
             "-an",  # Remove audio (doesn't make sense for timelapse)
+            *FASTSTART_OPTS,
             "-progress", "pipe:1",
             str(output_path),
-        ])
-
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
+        ]
 
-        # Parse progress from stdout
-        # We read stdout completely before waiting for the process.
-        # This is safe because we consume the entire stream, then wait().
-        stderr_output = ""
-        if process.stdout:
-            for line in process.stdout:
-                if progress_callback:
-                    progress = parse_ffmpeg_progress(line.strip(), target_duration)
-                    if progress:
-                        progress_callback(progress)
+        try:
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                bufsize=0,
+            )
 
-        # Read any remaining stderr and wait for process
-        if process.stderr:
-            stderr_output = process.stderr.read()
-        process.wait()
+            # Drain both pipes to EOF before waiting for the process
+            stderr_output = _read_progress(process, target_duration, progress_callback)
+            process.wait()
+        finally:
+            if concat_list:
+                concat_list.unlink(missing_ok=True)
 
         if process.returncode != 0:
             logger.error("Encoding failed", stderr=stderr_output, hwaccel=hwaccel.value)
             # Fall back to software encoding if hardware failed
             if hwaccel != HWAccel.NONE:
-                logger.info("Falling back to software encoding")
+                fall_back_to_software(hwaccel, stderr_output)
                 return encode_timelapse(
                     input_path,
                     output_path,
@@ -551,6 +1026,7 @@ def encode_timelapse(
                     preset,
                     progress_callback,
                     hwaccel=HWAccel.NONE,
+                    threads=threads,
                 )
             return False
 
@@ -558,24 +1034,63 @@ def encode_timelapse(
         return True
 
 
+# QSV has fewer presets than x264, so map the extra fast ones down
+QSV_PRESETS = {
+    "ultrafast": "veryfast",
+    "superfast": "veryfast",
+    "veryfast": "veryfast",
+    "faster": "faster",
+    "fast": "fast",
+    "medium": "medium",
+    "slow": "slow",
+    "slower": "slower",
+    "veryslow": "veryslow",
+}
+
+
 def _qsv_preset(preset: str) -> str:
     """Map software preset to QSV preset.
 
     QSV presets: veryfast, faster, fast, medium, slow, slower, veryslow
     """
-    # QSV has fewer presets, map appropriately
-    mapping = {
-        "ultrafast": "veryfast",
-        "superfast": "veryfast",
-        "veryfast": "veryfast",
-        "faster": "faster",
-        "fast": "fast",
-        "medium": "medium",
-        "slow": "slow",
-        "slower": "slower",
-        "veryslow": "veryslow",
-    }
-    return mapping.get(preset, "fast")
+    return QSV_PRESETS.get(preset, "fast")
+
+
+@functools.cache
+def qsv_low_power_supported() -> bool:
+    """Check if h264_qsv can use the fixed-function (VDENC) low-power encoder.
+
+    Probed once per process with a tiny test encode. Needs a Gen9+ iGPU and
+    a driver exposing VDENC; elsewhere the shader-based encoder is used.
+    """
+    try:
+        result = subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-v", "error",
+                "-init_hw_device", "qsv=qsv:hw",
+                "-f", "lavfi", "-i", "nullsrc=s=64x64:d=0.1",
+                "-c:v", "h264_qsv", "-low_power", "1", "-global_quality", "23",
+                "-f", "null", "-",
+            ],
+            capture_output=True,
+            timeout=10,
+        )
+        return result.returncode == 0
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return False
+
+
+def _qsv_encode_opts(preset: str, quality: int) -> list[str]:
+    """Build h264_qsv encoder options, on the low-power encoder when it works."""
+    opts = [
+        "-c:v", "h264_qsv",
+        "-preset", _qsv_preset(preset),
+        "-global_quality", str(quality),
+        "-async_depth", "4",  # Keep several frames in flight on the GPU
+    ]
+    if qsv_low_power_supported():
+        opts.extend(["-low_power", "1"])
+    return opts
 
 
 def create_timelapse(
@@ -591,7 +1106,7 @@ def create_timelapse(
     """Create a timelapse video from input files.
 
     Uses adaptive strategy based on speedup ratio:
-    - Low speedup (<30x): Concat + encode with select filter (more frames needed)
+    - Low speedup (<30x): Encode all files in one pass through the concat demuxer
     - High speedup (>=30x): Frame-based extraction (parallel, no concat!)
 
     Frame-based approach extracts keyframes directly from source files in parallel,
@@ -622,7 +1137,7 @@ def create_timelapse(
     ):
         # Get actual source duration by sampling files
         sample_count = min(5, len(input_files))
-        sample_durations = [get_video_duration(f) for f in input_files[:sample_count]]
+        sample_durations = get_video_durations_parallel(input_files[:sample_count])
         avg_file_duration = sum(sample_durations) / len(sample_durations) if sample_durations else 10.0
         source_duration = len(input_files) * avg_file_duration
 
@@ -652,7 +1167,6 @@ def create_timelapse(
                 target_duration=target_duration,
                 preset=preset,
                 progress_callback=progress_callback,
-                keep_temp=keep_temp,
                 hwaccel=hwaccel,
             )
 
@@ -663,15 +1177,13 @@ def _create_timelapse_concat(
     target_duration: float,
     preset: str = "fast",
     progress_callback: Callable[[ProgressInfo], None] | None = None,
-    keep_temp: bool = False,
     hwaccel: HWAccel | None = None,
 ) -> bool:
-    """Create timelapse using concat + encode approach.
+    """Create timelapse by encoding all input files in one pass.
 
     For lower speedups where we need more frames than keyframes available.
-    Two-step process:
-    1. Concatenate all input files (fast, -c copy)
-    2. Encode with select filter to target duration
+    The files are fed to the encoder through the concat demuxer, so there is
+    no concatenated intermediate to write and read back.
     """
     logger = get_logger()
 
@@ -682,35 +1194,22 @@ def _create_timelapse_concat(
         hwaccel=hwaccel.value if hwaccel else "none",
     )
 
-    # Create temp file for concatenated video
-    temp_file = output_path.parent / f".{output_path.stem}_concat.mp4"
-
-    try:
-        # Step 1: Concatenate
-        if not concat_files(input_files, temp_file):
-            return False
-
-        # Step 2: Encode with timelapse effect
-        if not encode_timelapse(
-            temp_file,
-            output_path,
-            target_duration,
-            preset=preset,
-            progress_callback=progress_callback,
-            hwaccel=hwaccel,
-        ):
-            return False
-
-        logger.info(
-            "Timelapse created",
-            output=str(output_path),
-            file_count=len(input_files),
-        )
-        return True
+    if not encode_timelapse(
+        input_files,
+        output_path,
+        target_duration,
+        preset=preset,
+        progress_callback=progress_callback,
+        hwaccel=hwaccel,
+    ):
+        return False
 
-    finally:
-        if not keep_temp:
-            temp_file.unlink(missing_ok=True)
+    logger.info(
+        "Timelapse created",
+        output=str(output_path),
+        file_count=len(input_files),
+    )
+    return True
 
 
 def check_ffmpeg_bsf_support() -> bool:
@@ -731,37 +1230,156 @@ def check_ffmpeg_bsf_support() -> bool:
         return False
 
 
-def estimate_keyframes(file_count: int, avg_duration: float = 10.0) -> int:
+@functools.cache
+def _ffmpeg_codecs(kind: str) -> frozenset[str]:
+    """Names listed by `ffmpeg -decoders` or `-encoders` (probed once per process)."""
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", f"-{kind}"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return frozenset()
+    return frozenset(
+        parts[1] for line in result.stdout.splitlines() if len(parts := line.split()) > 1
+    )
+
+
+def has_ffmpeg_decoder(name: str) -> bool:
+    """Check if FFmpeg was built with the given decoder."""
+    return name in _ffmpeg_codecs("decoders")
+
+
+def has_ffmpeg_encoder(name: str) -> bool:
+    """Check if FFmpeg was built with the given encoder."""
+    return name in _ffmpeg_codecs("encoders")
+
+
+HW_ENCODERS = {HWAccel.QSV: "h264_qsv", HWAccel.VAAPI: "h264_vaapi"}
+
+
+@functools.cache
+def _hw_encoder_usable(hwaccel: HWAccel) -> bool:
+    """Check that a hardware encode could start at all (logged once per process).
+
+    Catches a missing render device or an ffmpeg built without the encoder
+    before spawning an encode that is bound to fail and fall back.
+    """
+    encoder = HW_ENCODERS[hwaccel]
+    if not os.path.exists("/dev/dri/renderD128"):
+        get_logger().warning("No render device, using software encoding", hwaccel=hwaccel.value)
+        return False
+    if not has_ffmpeg_encoder(encoder):
+        get_logger().warning("FFmpeg lacks hardware encoder, using software encoding", encoder=encoder)
+        return False
+    return True
+
+
+def get_keyframe_rate(file_path: Path) -> float:
+    """Measure the keyframes per second of a recording.
+
+    Counts keyframe flags in the packet list, so nothing is decoded.
+
+    Returns:
+        Keyframes per second, or 1.0 (the Frigate default) if unknown
+    """
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe", "-v", "error",
+                "-select_streams", "v:0",
+                "-show_entries", "packet=flags",
+                "-of", "csv=p=0",
+                str(file_path),
+            ],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return 1.0
+
+    keyframes = sum(1 for flags in result.stdout.splitlines() if flags.startswith("K"))
+    duration = get_video_duration(file_path)
+    if result.returncode != 0 or keyframes == 0 or duration <= 0:
+        return 1.0
+    return keyframes / duration
+
+
+def estimate_keyframes(
+    file_count: int,
+    avg_duration: float = 10.0,
+    keyframe_rate: float = 1.0,
+) -> int:
     """Estimate keyframe count from file count.
 
-    Frigate recordings have ~1 keyframe per second (GOP=30 at 30fps).
-    Each 10-second segment has ~10 keyframes.
+    Frigate recordings default to ~1 keyframe per second (GOP=30 at 30fps),
+    so a 10-second segment has ~10 keyframes; cameras with other GOP sizes
+    should pass a measured keyframe_rate (see get_keyframe_rate).
 
     Args:
         file_count: Number of input files
         avg_duration: Average file duration in seconds (Frigate default: 10s)
+        keyframe_rate: Keyframes per second of source
 
     Returns:
         Estimated number of keyframes
     """
-    return int(file_count * avg_duration)
+    return int(file_count * avg_duration * keyframe_rate)
+
+
+@dataclass(frozen=True, eq=False)
+class FrameList(Sequence[Path]):
+    """Extracted frames in one directory, stored as packed frame numbers.
+
+    Frame i is named "{files[i]:06d}_{numbers[i]:04d}.jpg" for per-file
+    extraction, or "{numbers[i]:06d}.jpg" when files is None (a single concat
+    run). Paths are only built when a frame is accessed, so even 100k frames
+    take a few hundred KB; slicing returns another FrameList.
+    """
 
+    directory: str
+    numbers: array
+    files: array | None = None
 
-# Worker function for parallel frame extraction (must be at module level for ProcessPoolExecutor)
-def _extract_frames_worker(args: tuple) -> tuple[str, list[str], str | None]:
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            files = self.files[index] if self.files is not None else None
+            return FrameList(self.directory, self.numbers[index], files)
+        if self.files is None:
+            return Path(f"{self.directory}/{self.numbers[index]:06d}.jpg")
+        return Path(f"{self.directory}/{self.files[index]:06d}_{self.numbers[index]:04d}.jpg")
+
+    def sequence_start(self) -> int | None:
+        """First frame number if the frames are one unbroken %06d.jpg run."""
+        if self.files is not None or not self.numbers:
+            return None
+        if self.numbers[-1] - self.numbers[0] != len(self.numbers) - 1:
+            return None
+        return self.numbers[0]
+
+
+# Worker function for parallel frame extraction
+def _extract_frames_worker(args: tuple) -> tuple[str, int, str | None]:
     """Extract keyframes from a single video file.
 
     Args:
-        args: Tuple of (file_path, output_dir, file_index, extract_all)
+        args: Tuple of (file_path, output_dir, file_index, extract_all, frame_interval)
             - file_path: Source video file
             - output_dir: Directory to write frames
             - file_index: Index for output filename ordering
             - extract_all: If True, extract all keyframes; if False, just first frame
+            - frame_interval: With extract_all, keep every Nth keyframe
 
     Returns:
-        Tuple of (file_path, list of output frame paths, error message or None)
+        Tuple of (file_path, number of frames written, error message or None)
     """
-    file_path, output_dir, file_index, extract_all = args
+    file_path, output_dir, file_index, extract_all, frame_interval = args
 
     try:
         if extract_all:
@@ -771,17 +1389,21 @@ def _extract_frames_worker(args: tuple) -> tuple[str, list[str], str | None]:
                 "ffmpeg", "-nostdin", "-y",
                 "-skip_frame", "nokey",
                 "-i", file_path,
+                *_keyframe_select_opts(frame_interval),
                 "-vsync", "vfr",
                 "-q:v", "2",
                 output_pattern,
             ]
         else:
-            # Extract just first frame (always a keyframe)
+            # Extract just first frame (always a keyframe). Skipping non-key
+            # frames keeps frame-threaded decoders from decoding ahead past it
             output_file = f"{output_dir}/{file_index:06d}_0001.jpg"
             cmd = [
                 "ffmpeg", "-nostdin", "-y",
+                "-skip_frame", "nokey",
                 "-i", file_path,
-                "-vframes", "1",
+                "-an",
+                "-frames:v", "1",
                 "-update", "1",
                 "-q:v", "2",
                 output_file,
@@ -795,19 +1417,138 @@ def _extract_frames_worker(args: tuple) -> tuple[str, list[str], str | None]:
         )
 
         if result.returncode != 0:
-            return (file_path, [], f"ffmpeg failed: {result.stderr[:200]}")
+            return (file_path, 0, f"ffmpeg failed: {result.stderr[:200]}")
+
+        # ffmpeg numbers frames consecutively from 1, so probe the predicted
+        # names until the first gap instead of scanning the whole directory
+        count = 0
+        while os.path.exists(f"{output_dir}/{file_index:06d}_{count + 1:04d}.jpg"):
+            count += 1
+
+        return (file_path, count, None)
+
+    except subprocess.TimeoutExpired:
+        return (file_path, 0, "Timeout extracting frames")
+    except Exception as e:
+        return (file_path, 0, str(e))
+
+
+def _keyframe_select_opts(frame_interval: int) -> list[str]:
+    """Filter options keeping every Nth decoded keyframe (none for N=1)."""
+    if frame_interval <= 1:
+        return []
+    return ["-vf", f"select='not(mod(n,{frame_interval}))'"]
+
+
+def extract_keyframes_concat(
+    input_files: list[Path],
+    output_dir: Path,
+    frame_interval: int = 1,
+) -> FrameList:
+    """Extract all keyframes from several files with a single ffmpeg run.
+
+    Reads the files through the concat demuxer, so it only works when they
+    share codec parameters (e.g. consecutive segments from one camera).
+
+    Args:
+        input_files: List of video files to extract from
+        output_dir: Directory to write extracted frames
+        frame_interval: Keep every Nth keyframe
+
+    Returns:
+        Extracted frames in order, empty on failure
+    """
+    logger = get_logger()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    concat_file = _write_concat_list(input_files)
+
+    try:
+        result = subprocess.run(
+            [
+                "ffmpeg", "-nostdin", "-y",
+                "-skip_frame", "nokey",
+                "-f", "concat",
+                "-safe", "0",
+                "-i", str(concat_file),
+                *_keyframe_select_opts(frame_interval),
+                "-vsync", "vfr",
+                "-q:v", "2",
+                f"{output_dir}/%06d.jpg",
+            ],
+            capture_output=True,
+            text=True,
+        )
+    finally:
+        concat_file.unlink(missing_ok=True)
+
+    if result.returncode != 0:
+        logger.warning("Concat frame extraction failed", stderr=result.stderr[:200])
+        return FrameList(str(output_dir), array("I"))
+
+    # ffmpeg numbered the frames 1..N, so counting them is enough
+    with os.scandir(output_dir) as entries:
+        count = sum(1 for entry in entries if entry.name.endswith(".jpg"))
+    return FrameList(str(output_dir), array("I", range(1, count + 1)))
+
+
+@dataclass(frozen=True)
+class SourceKeyframe:
+    """First keyframe of a recording, extracted on demand as JPEG bytes.
+
+    Stands in for an extracted frame file in encode_frames_to_video, so the
+    frame goes straight from the extracting ffmpeg into the encoder's stdin
+    without being written to disk.
+    """
+
+    path: Path
+
+    def read_bytes(self) -> bytes:
+        """Extract the keyframe, or return b"" (frame skipped) on failure."""
+        try:
+            result = subprocess.run(
+                [
+                    "ffmpeg", "-nostdin",
+                    "-skip_frame", "nokey",
+                    "-i", str(self.path),
+                    "-an",
+                    "-frames:v", "1",
+                    "-q:v", "2",
+                    "-f", "mjpeg",
+                    "pipe:1",
+                ],
+                capture_output=True,
+                timeout=60,
+            )
+        except subprocess.TimeoutExpired:
+            get_logger().warning("Frame extraction failed", file=str(self.path), error="Timeout")
+            return b""
+
+        if result.returncode != 0:
+            get_logger().warning(
+                "Frame extraction failed",
+                file=str(self.path),
+                error=result.stderr[:200].decode(errors="replace"),
+            )
+            return b""
+        return result.stdout
 
-        # Find output files
-        import glob
-        pattern = f"{output_dir}/{file_index:06d}_*.jpg"
-        output_files = sorted(glob.glob(pattern))
 
-        return (file_path, output_files, None)
+def _read_frames_ahead(frame_files: Sequence[Path | SourceKeyframe], workers: int) -> Iterator[bytes]:
+    """Yield each frame's bytes in order, reading up to 2x workers ahead."""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for frame in frame_files:
+            pending.append(executor.submit(frame.read_bytes))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
 
-    except subprocess.TimeoutExpired:
-        return (file_path, [], "Timeout extracting frames")
-    except Exception as e:
-        return (file_path, [], str(e))
+
+def _inputs_share_codec(input_files: list[Path]) -> bool:
+    """Check whether the first and last inputs use the same codec."""
+    first = get_video_info(input_files[0])[2]
+    return bool(first) and first == get_video_info(input_files[-1])[2]
 
 
 def extract_keyframes_parallel(
@@ -816,48 +1557,73 @@ def extract_keyframes_parallel(
     extract_all: bool = False,
     max_workers: int | None = None,
     progress_callback: Callable[[int, int], None] | None = None,
-) -> list[Path]:
+    frame_interval: int = 1,
+) -> FrameList:
     """Extract keyframes from multiple files in parallel.
 
+    When extracting all keyframes from files that share a codec, a single
+    ffmpeg run over a concat list is used instead (see
+    extract_keyframes_concat), falling back to per-file runs if it fails.
+
     Args:
         input_files: List of video files to extract from
         output_dir: Directory to write extracted frames
         extract_all: If True, extract all keyframes; if False, just first frame per file
-        max_workers: Number of parallel workers (default: CPU count)
+        max_workers: Number of parallel workers (default: 2x CPU count, max 32)
         progress_callback: Optional callback(completed, total) for progress updates
+        frame_interval: With extract_all, keep only every Nth keyframe so
+            frames that would be sampled away are never written (counted
+            across all files in a concat run, per file otherwise)
 
     Returns:
-        List of extracted frame paths in sorted order
+        Extracted frames in input (temporal) order
     """
     logger = get_logger()
 
+    # Extracting every keyframe from same-codec segments needs only one
+    # ffmpeg over a concat list instead of one process per file
+    if extract_all and len(input_files) > 1 and _inputs_share_codec(input_files):
+        frames = extract_keyframes_concat(input_files, output_dir, frame_interval)
+        if frames:
+            if progress_callback:
+                progress_callback(len(input_files), len(input_files))
+            return frames
+        logger.info("Falling back to per-file frame extraction")
+        for frame in output_dir.glob("*.jpg"):
+            frame.unlink()
+
     if max_workers is None:
-        max_workers = min(os.cpu_count() or 4, 12)  # Cap at 12 to avoid too many ffmpeg processes
+        # Workers only wait on ffmpeg children, so the bound is how many
+        # ffmpeg processes to run, not Python threads
+        max_workers = min(2 * (os.cpu_count() or 4), 32)
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
     # Prepare work items
     work_items = [
-        (str(f), str(output_dir), i, extract_all)
+        (str(f), str(output_dir), i, extract_all, frame_interval)
         for i, f in enumerate(input_files)
     ]
 
-    all_frames: list[Path] = []
+    frame_files = array("I")
+    frame_numbers = array("I")
     completed = 0
     errors = 0
 
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(_extract_frames_worker, item): item for item in work_items}
-
-        for future in as_completed(futures):
-            file_path, frame_paths, error = future.result()
+    # Threads, not processes: the work happens in ffmpeg, and threads avoid
+    # a fork and argument pickling per file. map yields results in input
+    # order, so the frames come out already in temporal order
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(_extract_frames_worker, work_items)
+        for file_index, (file_path, count, error) in enumerate(results):
             completed += 1
 
             if error:
                 errors += 1
                 logger.warning("Frame extraction failed", file=file_path, error=error)
             else:
-                all_frames.extend(Path(p) for p in frame_paths)
+                frame_files.extend([file_index] * count)
+                frame_numbers.extend(range(1, count + 1))
 
             if progress_callback:
                 progress_callback(completed, len(input_files))
@@ -865,30 +1631,42 @@ def extract_keyframes_parallel(
     if errors > 0:
         logger.warning("Some frame extractions failed", errors=errors, total=len(input_files))
 
-    # Sort by filename to maintain temporal order
-    all_frames.sort()
-    return all_frames
+    return FrameList(str(output_dir), frame_numbers, frame_files)
 
 
 def encode_frames_to_video(
-    frame_files: list[Path],
+    frame_files: Sequence[Path | SourceKeyframe],
     output_path: Path,
     fps: float = 30.0,
     preset: str = "fast",
     crf: int = 30,
     progress_callback: Callable[[ProgressInfo], None] | None = None,
     hwaccel: "HWAccel | None" = None,
+    segments: int | None = None,
+    threads: int | None = None,
+    faststart: bool = True,
 ) -> bool:
     """Encode a list of image files to a video.
 
+    Frames may also be SourceKeyframe entries, which are extracted from their
+    recordings while encoding instead of being read from disk.
+
+    In software, long frame lists are split into contiguous segments that are
+    encoded by separate ffmpeg processes and then joined with a stream copy;
+    libx264 scales much better across processes than across threads.
+
     Args:
-        frame_files: List of image files (JPEGs) in order
+        frame_files: Image files (JPEGs) or source keyframes, in order
         output_path: Output video path
         fps: Output frame rate
         preset: Encoding preset
         crf: Quality (lower = better, 23-30 typical for timelapse)
         progress_callback: Optional callback for progress updates
         hwaccel: Hardware acceleration to use
+        segments: Parallel software segments (default: one per CPU, with at
+            least SEGMENT_MIN_FRAMES frames each)
+        threads: Software encoder threads per process (default: CPUs per segment)
+        faststart: Put the MP4 index at the front (off for intermediate segments)
 
     Returns:
         True if successful
@@ -899,97 +1677,217 @@ def encode_frames_to_video(
         logger.error("No frames to encode")
         return False
 
-    # Create concat file listing all frames
-    concat_file = output_path.parent / f".{output_path.stem}_frames.txt"
+    if hwaccel in HW_ENCODERS and not _hw_encoder_usable(hwaccel):
+        hwaccel = HWAccel.NONE
 
-    try:
-        with open(concat_file, "w") as f:
-            for frame in frame_files:
-                escaped = str(frame.resolve()).replace("'", "'\\''")
-                f.write(f"file '{escaped}'\n")
+    software = hwaccel in (None, HWAccel.NONE)
+    cpus = os.cpu_count() or 4
+    if segments is None:
+        segments = min(cpus, len(frame_files) // SEGMENT_MIN_FRAMES)
+    if software and segments > 1:
+        return _encode_frames_segmented(
+            frame_files, output_path, fps, preset, crf, progress_callback, segments
+        )
 
-        # Calculate expected output duration for progress
-        expected_duration = len(frame_files) / fps
+    # Calculate expected output duration for progress
+    expected_duration = len(frame_files) / fps
 
-        # Build ffmpeg command
-        cmd = ["ffmpeg", "-nostdin", "-y"]
+    decode_opts = ["-c:v", "mjpeg"]
+    if hwaccel == HWAccel.QSV and has_ffmpeg_decoder("mjpeg_qsv"):
+        # Decode the JPEGs on the iGPU too, so frames never need uploading
+        decode_opts = [
+            "-hwaccel", "qsv",
+            "-hwaccel_output_format", "qsv",
+            "-c:v", "mjpeg_qsv",
+        ]
+    start = frame_files.sequence_start() if isinstance(frame_files, FrameList) else None
+    if start is not None:
+        # An unbroken numbered run is read by ffmpeg's image2 demuxer itself,
+        # with no frames passing through this process
+        frame_input = [
+            "-framerate", str(fps),
+            "-start_number", str(start),
+            *decode_opts,
+            "-i", f"{frame_files.directory}/%06d.jpg",
+        ]
+    else:
+        # Other frames are streamed into ffmpeg's stdin as one MJPEG
+        # image2pipe input, read ahead on a few threads
+        frame_input = [
+            "-f", "image2pipe",
+            "-framerate", str(fps),
+            *decode_opts,
+            "-i", "pipe:0",
+        ]
 
-        # Add hardware acceleration if available
-        if hwaccel == HWAccel.QSV:
-            cmd.extend([
-                "-f", "concat",
-                "-safe", "0",
-                "-r", str(fps),
-                "-i", str(concat_file),
-                "-c:v", "h264_qsv",
-                "-preset", _qsv_preset(preset),
-                "-global_quality", str(crf),
-            ])
-        elif hwaccel == HWAccel.VAAPI:
-            cmd.extend([
-                "-vaapi_device", "/dev/dri/renderD128",
-                "-f", "concat",
-                "-safe", "0",
-                "-r", str(fps),
-                "-i", str(concat_file),
-                "-vf", "format=nv12,hwupload",
-                "-c:v", "h264_vaapi",
-                "-qp", str(crf),
-            ])
-        else:
-            cmd.extend([
-                "-f", "concat",
-                "-safe", "0",
-                "-r", str(fps),
-                "-i", str(concat_file),
-                "-c:v", "libx264",
-                "-preset", preset,
-                "-crf", str(crf),
-            ])
+    # Build ffmpeg command
+    cmd = ["ffmpeg", "-nostdin", "-y", *PROGRESS_LOG_OPTS]
 
+    # Add hardware acceleration if available
+    if hwaccel == HWAccel.QSV:
+        cmd.extend([
+            *frame_input,
+            *_qsv_encode_opts(preset, crf),
+        ])
+    elif hwaccel == HWAccel.VAAPI:
+        cmd.extend([
+            "-vaapi_device", "/dev/dri/renderD128",
+            *frame_input,
+            "-vf", "format=nv12,hwupload",
+            "-c:v", "h264_vaapi",
+            "-qp", str(crf),
+        ])
+    else:
         cmd.extend([
+            *frame_input,
+            "-c:v", "libx264",
+            "-preset", preset,
+            "-crf", str(crf),
+            "-threads", str(threads or cpus),
+            # Hardware encoders take GPU surfaces, so only software needs
+            # the JPEGs' full-range yuvj420p converted
             "-pix_fmt", "yuv420p",
-            "-progress", "pipe:1",
-            str(output_path),
         ])
 
-        logger.debug("Encode command", cmd=" ".join(cmd))
+    cmd.extend([
+        "-frames:v", str(len(frame_files)),
+        *(FASTSTART_OPTS if faststart else []),
+        "-progress", "pipe:1",
+        str(output_path),
+    ])
 
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
+    logger.debug("Encode command", cmd=cmd)
 
-        stderr_output = ""
-        if process.stdout:
-            for line in process.stdout:
-                if progress_callback:
-                    progress = parse_ffmpeg_progress(line.strip(), expected_duration)
-                    if progress:
-                        progress_callback(progress)
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE if start is None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        bufsize=0,
+    )
 
-        if process.stderr:
-            stderr_output = process.stderr.read()
-        process.wait()
+    feed_errors: list[OSError] = []
+    # Read (or extract) frames on a few threads ahead of the encoder
+    readers = min(threads or cpus, 32)
 
-        if process.returncode != 0:
-            logger.error("Frame encoding failed", stderr=stderr_output)
-            # Try software fallback if hardware failed
-            if hwaccel and hwaccel != HWAccel.NONE:
-                logger.info("Falling back to software encoding")
-                return encode_frames_to_video(
-                    frame_files, output_path, fps, preset, crf,
-                    progress_callback, hwaccel=HWAccel.NONE
-                )
+    def feed_frames() -> None:
+        try:
+            for data in _read_frames_ahead(frame_files, readers):
+                process.stdin.write(data)
+        except BrokenPipeError:
+            pass  # ffmpeg exited early; its return code says why
+        except OSError as e:
+            feed_errors.append(e)
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    feeder = None
+    if start is None:
+        feeder = threading.Thread(target=feed_frames, daemon=True)
+        feeder.start()
+    stderr_output = _read_progress(process, expected_duration, progress_callback)
+    process.wait()
+    if feeder:
+        feeder.join()
+
+    if feed_errors:
+        logger.error("Could not read frame", error=str(feed_errors[0]))
+        return False
+
+    if process.returncode != 0:
+        logger.error("Frame encoding failed", stderr=stderr_output)
+        # Try software fallback if hardware failed
+        if hwaccel and hwaccel != HWAccel.NONE:
+            fall_back_to_software(hwaccel, stderr_output)
+            return encode_frames_to_video(
+                frame_files, output_path, fps, preset, crf,
+                progress_callback, hwaccel=HWAccel.NONE, segments=segments, faststart=faststart,
+            )
+        return False
+
+    logger.info("Frame encoding complete", frames=len(frame_files), output=str(output_path))
+    return True
+
+
+def _encode_frames_segmented(
+    frame_files: Sequence[Path | SourceKeyframe],
+    output_path: Path,
+    fps: float,
+    preset: str,
+    crf: int,
+    progress_callback: Callable[[ProgressInfo], None] | None,
+    segments: int,
+) -> bool:
+    """Encode frames as parallel libx264 segments, then stream-copy concat them.
+
+    Every x264 stream starts with an IDR frame, so the segments join
+    cleanly with the concat demuxer and -c copy.
+    """
+    logger = get_logger()
+
+    chunk_size = -(-len(frame_files) // segments)
+    chunks = [frame_files[i:i + chunk_size] for i in range(0, len(frame_files), chunk_size)]
+    threads = max(1, (os.cpu_count() or 4) // len(chunks))
+    expected_duration = len(frame_files) / fps
+
+    # Segments live beside the output so the final copy stays on one filesystem
+    temp_dir = Path(tempfile.mkdtemp(prefix=f".{output_path.stem}_segments_", dir=output_path.parent))
+    segment_paths = [temp_dir / f"seg_{i:04d}.mp4" for i in range(len(chunks))]
+
+    logger.info("Encoding frames in parallel segments", frames=len(frame_files), segments=len(chunks))
+
+    # Latest encoded time per segment, summed into one overall progress
+    segment_times = [0.0] * len(chunks)
+    progress_lock = threading.Lock()
+
+    def segment_progress(index: int) -> Callable[[ProgressInfo], None] | None:
+        if not progress_callback:
+            return None
+
+        def report(info: ProgressInfo) -> None:
+            with progress_lock:
+                segment_times[index] = info.time_seconds
+                done = sum(segment_times)
+                progress_callback(ProgressInfo(
+                    frame=int(done * fps),
+                    fps=0.0,
+                    time_seconds=done,
+                    speed=0.0,
+                    percent=min(100.0, done / expected_duration * 100),
+                ))
+
+        return report
+
+    def encode_segment(index: int) -> bool:
+        return encode_frames_to_video(
+            chunks[index], segment_paths[index], fps, preset, crf,
+            segment_progress(index), hwaccel=HWAccel.NONE, segments=1, threads=threads,
+            faststart=False,
+        )
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            results = list(executor.map(encode_segment, range(len(chunks))))
+        if not all(results):
+            logger.error("Segment encoding failed", failed=results.count(False))
+            return False
+
+        if not _concat_batch(segment_paths, output_path, faststart=True):
             return False
 
         logger.info("Frame encoding complete", frames=len(frame_files), output=str(output_path))
         return True
-
     finally:
-        concat_file.unlink(missing_ok=True)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+# Above this many inputs, pass 1 concatenates groups of BSF_GROUP_SIZE in
+# parallel and then joins the groups, instead of one serial demuxer pass
+BSF_GROUP_THRESHOLD = 10000
+BSF_GROUP_SIZE = 1000
 
 
 def _bsf_pass1_concat(
@@ -999,6 +1897,8 @@ def _bsf_pass1_concat(
 ) -> bool:
     """Pass 1: Fast concatenation with stream copy (no decode/encode).
 
+    Very long file lists are handled by _bsf_pass1_grouped.
+
     Args:
         input_files: List of video files to concatenate
         output_path: Output file path
@@ -1007,76 +1907,55 @@ def _bsf_pass1_concat(
     Returns:
         True if successful
     """
-    import time
-
     logger = get_logger()
 
-    # Estimate expected output size for progress reporting
-    # Sample first few files to get average size
-    sample_sizes = [f.stat().st_size for f in input_files[:min(5, len(input_files))]]
-    avg_file_size = sum(sample_sizes) / len(sample_sizes) if sample_sizes else 10 * 1024 * 1024
-    expected_size = len(input_files) * avg_file_size
+    if len(input_files) > BSF_GROUP_THRESHOLD:
+        return _bsf_pass1_grouped(input_files, output_path, progress_callback)
+
+    # Estimate total duration for progress from a few sample files
+    sample_durations = get_video_durations_parallel(input_files[:5])
+    avg_file_duration = sum(sample_durations) / len(sample_durations) if sample_durations else 10.0
+    expected_duration = len(input_files) * avg_file_duration
 
     # Create concat list file
-    concat_list = output_path.parent / f".{output_path.stem}_list.txt"
-    with open(concat_list, "w") as f:
-        for file_path in input_files:
-            escaped = str(file_path.resolve()).replace("'", "'\\''")
-            f.write(f"file '{escaped}'\n")
+    concat_list = _write_concat_list(input_files)
 
     try:
         cmd = [
             "ffmpeg", "-nostdin", "-y",
+            *PROGRESS_LOG_OPTS,
             "-f", "concat",
             "-safe", "0",
             "-i", str(concat_list),
             "-c", "copy",
             "-an",
+            "-progress", "pipe:1",
             str(output_path),
         ]
 
-        logger.debug("BSF Pass 1 command", cmd=" ".join(cmd))
+        logger.debug("BSF Pass 1 command", cmd=cmd)
 
-        # Run concat with progress monitoring via output file size
-        stderr_file = output_path.parent / f".{output_path.stem}_p1_stderr.log"
-        try:
-            with open(stderr_file, "w") as stderr_fh:
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=stderr_fh,
-                    text=True,
-                )
+        def scaled_progress(info: ProgressInfo) -> None:
+            # Progress range: 5% to 85% (leave room for Pass 2)
+            if progress_callback and info.percent is not None:
+                progress_callback(ProgressInfo(
+                    frame=int(info.percent / 100 * len(input_files)),  # Estimated files processed
+                    fps=0,
+                    time_seconds=info.time_seconds,
+                    speed=info.speed,
+                    percent=5 + info.percent * 0.8,
+                ))
 
-                # Monitor progress by checking output file size
-                # Progress range: 5% to 85% (leave room for Pass 2)
-                last_report_time = time.time()
-                while process.poll() is None:
-                    time.sleep(2)  # Check every 2 seconds
-
-                    if progress_callback and output_path.exists():
-                        current_size = output_path.stat().st_size
-                        # Scale progress: 5% to 85%
-                        size_ratio = min(1.0, current_size / expected_size)
-                        percent = 5 + (size_ratio * 80)
-
-                        # Calculate estimated files processed
-                        files_processed = int(size_ratio * len(input_files))
-
-                        progress_callback(ProgressInfo(
-                            frame=files_processed,
-                            fps=0,
-                            time_seconds=0,
-                            speed=0,
-                            percent=percent,
-                        ))
-                        last_report_time = time.time()
-
-            stderr_output = ""
-            if process.returncode != 0:
-                stderr_output = stderr_file.read_text()
-        finally:
-            stderr_file.unlink(missing_ok=True)
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+        )
+        stderr_output = _read_progress(
+            process, expected_duration, scaled_progress if progress_callback else None
+        )
+        process.wait()
 
         if process.returncode != 0:
             logger.error("BSF Pass 1 (concat) failed", stderr=stderr_output)
@@ -1096,6 +1975,71 @@ def _bsf_pass1_concat(
         concat_list.unlink(missing_ok=True)
 
 
+def _bsf_pass1_grouped(
+    input_files: list[Path],
+    output_path: Path,
+    progress_callback: Callable[[ProgressInfo], None] | None,
+    max_workers: int = 4,
+) -> bool:
+    """Pass 1 for very long lists: concat groups in parallel, then join them.
+
+    One demuxer pass opens tens of thousands of files strictly one after
+    another; a few concurrent group passes keep more reads in flight.
+    """
+    logger = get_logger()
+
+    groups = [
+        input_files[i:i + BSF_GROUP_SIZE] for i in range(0, len(input_files), BSF_GROUP_SIZE)
+    ]
+    # Intermediates live beside the output so the final copy stays on one filesystem
+    temp_dir = Path(tempfile.mkdtemp(prefix=f".{output_path.stem}_groups_", dir=output_path.parent))
+    group_paths = [temp_dir / f"group_{i:04d}.mp4" for i in range(len(groups))]
+
+    logger.info("BSF Pass 1 in parallel groups", file_count=len(input_files), groups=len(groups))
+
+    completed = 0
+    progress_lock = threading.Lock()
+
+    def concat_group(index: int) -> bool:
+        nonlocal completed
+        success = _concat_batch(groups[index], group_paths[index])
+        with progress_lock:
+            completed += 1
+            if progress_callback:
+                # Groups cover 5-75%, the final join takes it to 85%
+                progress_callback(ProgressInfo(
+                    frame=completed * BSF_GROUP_SIZE,
+                    fps=0,
+                    time_seconds=0,
+                    speed=0,
+                    percent=5 + 70 * completed / len(groups),
+                ))
+        return success
+
+    try:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as executor:
+            results = list(executor.map(concat_group, range(len(groups))))
+        if not all(results):
+            logger.error("BSF Pass 1 (concat) failed", failed_groups=results.count(False))
+            return False
+
+        if not _concat_batch(group_paths, output_path):
+            return False
+
+        if progress_callback:
+            progress_callback(ProgressInfo(
+                frame=len(input_files), fps=0, time_seconds=0, speed=0, percent=85.0,
+            ))
+
+        logger.info(
+            "BSF Pass 1 complete",
+            output_size_mb=output_path.stat().st_size / (1024 * 1024),
+        )
+        return True
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
 def _bsf_pass2_timelapse(
     input_path: Path,
     output_path: Path,
@@ -1130,10 +2074,11 @@ def _bsf_pass2_timelapse(
         "-c", "copy",
         "-an",
         "-bsf:v", f"noise=drop='{drop_expr}',setts=ts='{setts_expr}'",
+        *FASTSTART_OPTS,
         str(output_path),
     ]
 
-    logger.debug("BSF Pass 2 command", cmd=" ".join(cmd))
+    logger.debug("BSF Pass 2 command", cmd=cmd)
 
     result = subprocess.run(cmd, capture_output=True, text=True)
 
@@ -1160,14 +2105,24 @@ def _create_timelapse_bsf(
     output_fps: float = 30.0,
     progress_callback: Callable[[ProgressInfo], None] | None = None,
     keep_temp: bool = False,
+    preset: str = "fast",
+    crf: int = 30,
+    two_pass: bool = False,
+    hwaccel: HWAccel | None = None,
 ) -> bool:
-    """Create timelapse using two-pass bitstream filter approach.
+    """Create timelapse by keeping every Nth keyframe of the sources.
 
-    This approach operates at the packet level without decoding:
+    By default this is a single ffmpeg run: the files are read through the
+    concat demuxer, only keyframes are decoded, every Nth one is selected
+    and the result is encoded directly, with no concatenated intermediate.
+
+    With two_pass=True, uses the original packet-level approach instead:
     - Pass 1: Concatenate all files with stream copy
     - Pass 2: Apply BSF to select keyframes and retime
 
-    Much faster than decode+encode for high speedups (5-10x improvement).
+    Note: create_timelapse does not route here. Keeping only keyframes
+    cannot reach the target duration at low speedups, so runs with fewer
+    keyframes (or, single pass, files) than output frames are rejected.
 
     Args:
         input_files: List of video files
@@ -1176,15 +2131,23 @@ def _create_timelapse_bsf(
         source_duration: Total source duration in seconds
         output_fps: Output frame rate
         progress_callback: Optional callback for progress updates
-        keep_temp: Keep intermediate files for debugging
+        keep_temp: Keep intermediate files for debugging (two_pass only)
+        preset: Encoding preset (single pass only)
+        crf: Quality (single pass only)
+        two_pass: Use the stream-copy concat + BSF approach
+        hwaccel: Hardware acceleration for the single pass (auto-detected if None)
 
     Returns:
         True if successful
     """
     logger = get_logger()
 
-    # Calculate BSF parameters
-    estimated_keyframes = estimate_keyframes(len(input_files))
+    # Calculate BSF parameters from the measured GOP of the first recording
+    estimated_keyframes = estimate_keyframes(
+        len(input_files),
+        source_duration / len(input_files),
+        get_keyframe_rate(input_files[0]),
+    )
     frames_needed = int(target_duration * output_fps)
     packet_interval = max(1, estimated_keyframes // frames_needed)
     speedup = source_duration / target_duration
@@ -1198,8 +2161,32 @@ def _create_timelapse_bsf(
         estimated_keyframes=estimated_keyframes,
         frames_needed=frames_needed,
         packet_interval=packet_interval,
+        two_pass=two_pass,
     )
 
+    # Each output frame is one source keyframe (or one file's opening
+    # keyframe), so too few of them would give a short output
+    if estimated_keyframes < frames_needed and (two_pass or len(input_files) < frames_needed):
+        logger.error(
+            "Too few keyframes for BSF timelapse",
+            estimated_keyframes=estimated_keyframes,
+            frames_needed=frames_needed,
+        )
+        return False
+
+    if not two_pass:
+        if len(input_files) >= frames_needed:
+            # One frame per file is enough: copy each sampled file's opening
+            # keyframe straight into the output, no decode at all
+            return _sample_files_stream_copy(
+                input_files, output_path, frames_needed, output_fps, progress_callback
+            )
+        return _keyframe_select_single_pass(
+            input_files, output_path, packet_interval, target_duration,
+            output_fps, preset, crf, progress_callback,
+            hwaccel=get_hwaccel() if hwaccel is None else hwaccel,
+        )
+
     # Temp file for concatenated video
     concat_output = output_path.parent / f".{output_path.stem}_concat.mp4"
 
@@ -1240,6 +2227,151 @@ def _create_timelapse_bsf(
             concat_output.unlink(missing_ok=True)
 
 
+def _sample_files_stream_copy(
+    input_files: list[Path],
+    output_path: Path,
+    frames_needed: int,
+    output_fps: float,
+    progress_callback: Callable[[ProgressInfo], None] | None = None,
+) -> bool:
+    """Build a timelapse from the first frame of evenly sampled files, stream-copied.
+
+    Each Frigate segment opens on a keyframe. Listing the sampled files in a
+    concat list with an outpoint of one output frame interval keeps just
+    that keyframe, and the demuxer lays the files out 1/output_fps apart,
+    so the result is already timed for output_fps.
+    """
+    logger = get_logger()
+
+    # Sample evenly across the entire time range, first file to last
+    n_files = len(input_files)
+    indices = [
+        int(i * (n_files - 1) / max(1, frames_needed - 1)) for i in range(frames_needed)
+    ]
+    sampled = [input_files[i] for i in indices]
+
+    concat_list = _write_concat_list(sampled, outpoint=1 / output_fps)
+    try:
+        cmd = [
+            "ffmpeg", "-nostdin", "-y",
+            *PROGRESS_LOG_OPTS,
+            "-f", "concat",
+            "-safe", "0",
+            "-i", str(concat_list),
+            "-c", "copy",
+            "-an",
+            *FASTSTART_OPTS,
+            "-progress", "pipe:1",
+            str(output_path),
+        ]
+
+        logger.debug("Sampled stream copy command", cmd=cmd)
+
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+        )
+        stderr_output = _read_progress(process, len(sampled) / output_fps, progress_callback)
+        process.wait()
+    finally:
+        concat_list.unlink(missing_ok=True)
+
+    if process.returncode != 0:
+        logger.error("Sampled stream copy failed", stderr=stderr_output)
+        return False
+
+    logger.info("Sampled stream copy timelapse created", output=str(output_path), frames=len(sampled))
+    return True
+
+
+def _keyframe_select_single_pass(
+    input_files: list[Path],
+    output_path: Path,
+    keyframe_interval: int,
+    target_duration: float,
+    output_fps: float,
+    preset: str,
+    crf: int,
+    progress_callback: Callable[[ProgressInfo], None] | None = None,
+    hwaccel: HWAccel = HWAccel.NONE,
+) -> bool:
+    """Encode every Nth keyframe of input_files in one ffmpeg run.
+
+    With -skip_frame nokey the decoder only emits keyframes, so n in the
+    select expression counts keyframes, matching the BSF packet interval.
+    With hardware acceleration, decoded surfaces stay on the GPU through
+    select and the encoder (-hwaccel_output_format), with no per-frame
+    download and re-upload.
+    """
+    logger = get_logger()
+
+    video_filter = f"select='not(mod(n,{keyframe_interval}))',setpts=N/{output_fps}/TB"
+    if hwaccel == HWAccel.QSV:
+        # Native decoder with QSV hwaccel (not h264_qsv), which honours -skip_frame
+        input_opts = HW_DECODE_OPTS[HWAccel.QSV]
+        encode_opts = _qsv_encode_opts(preset, crf)
+    elif hwaccel == HWAccel.VAAPI:
+        input_opts = HW_DECODE_OPTS[HWAccel.VAAPI]
+        video_filter += ",scale_vaapi=format=nv12"
+        encode_opts = ["-c:v", "h264_vaapi", "-qp", str(crf)]
+    else:
+        input_opts = []
+        encode_opts = [
+            "-c:v", "libx264",
+            "-preset", preset,
+            "-crf", str(crf),
+            "-pix_fmt", "yuv420p",
+        ]
+
+    concat_list = _write_concat_list(input_files)
+    try:
+        cmd = [
+            "ffmpeg", "-nostdin", "-y",
+            *PROGRESS_LOG_OPTS,
+            *input_opts,
+            "-skip_frame", "nokey",
+            "-f", "concat",
+            "-safe", "0",
+            "-i", str(concat_list),
+            "-vf", video_filter,
+            "-r", str(output_fps),
+            *encode_opts,
+            "-an",
+            *FASTSTART_OPTS,
+            "-progress", "pipe:1",
+            str(output_path),
+        ]
+
+        logger.debug("Keyframe select command", cmd=cmd)
+
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0,
+        )
+        stderr_output = _read_progress(process, target_duration, progress_callback)
+        process.wait()
+    finally:
+        concat_list.unlink(missing_ok=True)
+
+    if process.returncode != 0:
+        logger.error("Keyframe select encode failed", stderr=stderr_output, hwaccel=hwaccel.value)
+        # Fall back to software encoding if hardware failed
+        if hwaccel != HWAccel.NONE:
+            fall_back_to_software(hwaccel, stderr_output)
+            return _keyframe_select_single_pass(
+                input_files, output_path, keyframe_interval, target_duration,
+                output_fps, preset, crf, progress_callback, hwaccel=HWAccel.NONE,
+            )
+        return False
+
+    logger.info("Keyframe select timelapse created", output=str(output_path), hwaccel=hwaccel.value)
+    return True
+
+
 def _create_timelapse_frames(
     input_files: list[Path],
     output_path: Path,
@@ -1258,7 +2390,7 @@ def _create_timelapse_frames(
 
     Strategy based on speedup:
     - High speedup (300x+): Extract 1 frame per sampled file
-    - Medium speedup (30-300x): Extract all keyframes, then sample
+    - Medium speedup (30-300x): Extract every Nth keyframe, then trim
 
     Args:
         input_files: List of video files
@@ -1278,7 +2410,6 @@ def _create_timelapse_frames(
 
     speedup = source_duration / target_duration
     frames_needed = int(target_duration * output_fps)
-    estimated_keyframes = estimate_keyframes(len(input_files))
 
     # Determine extraction strategy
     # High speedup: we have more files than frames needed, sample files
@@ -1303,6 +2434,18 @@ def _create_timelapse_frames(
     else:
         files_to_process = input_files
 
+    # Sample keyframes during extraction rather than after, so the ones that
+    # would be dropped are never written. Rounding down errs towards extra
+    # frames, which are trimmed below
+    frame_interval = 1
+    if extract_all:
+        estimated_keyframes = estimate_keyframes(
+            len(input_files),
+            source_duration / len(input_files),
+            get_keyframe_rate(input_files[0]),
+        )
+        frame_interval = max(1, estimated_keyframes // frames_needed)
+
     logger.info(
         "Creating timelapse with frame extraction",
         file_count=len(input_files),
@@ -1312,8 +2455,16 @@ def _create_timelapse_frames(
         speedup=f"{speedup:.0f}x",
         frames_needed=frames_needed,
         extract_all=extract_all,
+        frame_interval=frame_interval,
     )
 
+    # One frame per file needs no sampling afterwards, so the keyframes can
+    # be piped from the extractors straight into the encoder
+    if not extract_all and not keep_temp:
+        return _encode_source_keyframes(
+            files_to_process, output_path, output_fps, preset, progress_callback, hwaccel
+        )
+
     # Create temp directory for frames
     temp_dir = Path(tempfile.mkdtemp(prefix="frigate_frames_"))
 
@@ -1339,6 +2490,7 @@ def _create_timelapse_frames(
             temp_dir,
             extract_all=extract_all,
             progress_callback=extraction_callback,
+            frame_interval=frame_interval,
         )
 
         if not frame_files:
@@ -1349,9 +2501,9 @@ def _create_timelapse_frames(
 
         # Step 2: Sample frames if we have too many
         if len(frame_files) > frames_needed:
-            frame_interval = max(1, len(frame_files) // frames_needed)
-            frame_files = frame_files[::frame_interval][:frames_needed]
-            logger.info("Sampled frames", final_count=len(frame_files), interval=frame_interval)
+            sample_interval = max(1, len(frame_files) // frames_needed)
+            frame_files = frame_files[::sample_interval][:frames_needed]
+            logger.info("Sampled frames", final_count=len(frame_files), interval=sample_interval)
 
         # Step 3: Encode frames to video
         def encode_callback(info: ProgressInfo) -> None:
@@ -1398,3 +2550,37 @@ def _create_timelapse_frames(
             shutil.rmtree(temp_dir, ignore_errors=True)
         else:
             logger.info("Keeping temp frames", dir=str(temp_dir))
+
+
+def _encode_source_keyframes(
+    files: list[Path],
+    output_path: Path,
+    output_fps: float,
+    preset: str,
+    progress_callback: Callable[[ProgressInfo], None] | None,
+    hwaccel: HWAccel | None,
+) -> bool:
+    """Encode the first keyframe of each file without writing frames to disk."""
+    logger = get_logger()
+
+    if not encode_frames_to_video(
+        [SourceKeyframe(f) for f in files],
+        output_path,
+        fps=output_fps,
+        preset=preset,
+        progress_callback=progress_callback,
+        hwaccel=hwaccel,
+    ):
+        return False
+
+    if progress_callback:
+        progress_callback(ProgressInfo(
+            frame=len(files),
+            fps=output_fps,
+            time_seconds=len(files) / output_fps,
+            speed=0,
+            percent=100.0,
+        ))
+
+    logger.info("Frame-based timelapse created", output=str(output_path), frames=len(files))
+    return True
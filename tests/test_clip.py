@@ -14,6 +14,7 @@ from frigate_tools.clip import (
     find_overlapping_segments,
     parse_ffmpeg_progress,
 )
+from frigate_tools.timelapse import HWAccel
 
 
 class TestFindOverlappingSegments:
@@ -129,6 +130,43 @@ class TestConcatClip:
         # Should not have -c copy
         assert "-c" not in call_args or "copy" not in call_args
 
+    @patch("frigate_tools.clip.get_hwaccel", return_value=HWAccel.VAAPI)
+    @patch("subprocess.Popen")
+    def test_vaapi_reencode_decodes_on_gpu(self, mock_popen, mock_hwaccel, tmp_path):
+        """VAAPI re-encode decodes to VAAPI surfaces instead of uploading frames."""
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.communicate.return_value = ("", "")
+        mock_popen.return_value = mock_process
+
+        concat_clip([tmp_path / "a.mp4"], tmp_path / "output.mp4", reencode=True)
+
+        call_args = mock_popen.call_args[0][0]
+        assert call_args.index("-hwaccel_output_format") < call_args.index("-i")
+        assert call_args[call_args.index("-vf") + 1] == "scale_vaapi=format=nv12"
+        assert "hwupload" not in " ".join(call_args)
+
+    @patch("subprocess.Popen")
+    def test_hw_reencode_failure_retries_in_software(self, mock_popen, tmp_path, monkeypatch):
+        """A failed hardware re-encode is retried once with libx264."""
+        import frigate_tools.timelapse as timelapse_module
+
+        monkeypatch.setattr(timelapse_module, "_hwaccel_cache", HWAccel.QSV)
+        failed, succeeded = MagicMock(returncode=1), MagicMock(returncode=0)
+        failed.communicate.return_value = ("", "Error creating a MFX session: -9.")
+        succeeded.communicate.return_value = ("", "")
+        mock_popen.side_effect = [failed, succeeded]
+
+        result = concat_clip(
+            [tmp_path / "a.mp4"], tmp_path / "output.mp4", reencode=True, hwaccel=HWAccel.QSV
+        )
+
+        assert result is True
+        assert "h264_qsv" in mock_popen.call_args_list[0][0][0]
+        software_args = mock_popen.call_args_list[1][0][0]
+        assert "libx264" in software_args
+        assert "-hwaccel" not in software_args
+
     @patch("subprocess.Popen")
     def test_failure_returns_false(self, mock_popen, tmp_path):
         """Returns False on ffmpeg failure."""
@@ -277,6 +315,51 @@ class TestCreateMultiCameraClip:
 
         assert result is None
 
+    @patch("frigate_tools.clip.create_clip")
+    def test_separate_stops_at_first_failure(
+        self, mock_create_clip, mock_multi_camera_dir, tmp_path
+    ):
+        """Cameras after a failed one are not processed."""
+        mock_create_clip.return_value = False
+        output_dir = tmp_path / "output"
+        output_dir.mkdir()
+
+        result = create_multi_camera_clip(
+            instance_path=mock_multi_camera_dir,
+            cameras=["front", "back"],
+            start=datetime(2025, 12, 5, 12, 0, 0),
+            end=datetime(2025, 12, 5, 13, 0, 0),
+            output_dir=output_dir,
+            separate=True,
+        )
+
+        assert result is None
+        assert mock_create_clip.call_count == 1
+
+    @patch("frigate_tools.clip.create_clip")
+    def test_separate_progress_callback_errors_propagate(
+        self, mock_create_clip, mock_multi_camera_dir, tmp_path
+    ):
+        """An exception from the progress callback reaches the caller."""
+        mock_create_clip.return_value = True
+        output_dir = tmp_path / "output"
+        output_dir.mkdir()
+
+        def callback(progress: ClipProgress) -> None:
+            raise RuntimeError("display closed")
+
+        with pytest.raises(RuntimeError, match="display closed"):
+            create_multi_camera_clip(
+                instance_path=mock_multi_camera_dir,
+                cameras=["front"],
+                start=datetime(2025, 12, 5, 12, 0, 0),
+                end=datetime(2025, 12, 5, 13, 0, 0),
+                output_dir=output_dir,
+                separate=True,
+                progress_callback=callback,
+            )
+        mock_create_clip.assert_not_called()
+
     @patch("frigate_tools.grid.create_grid_video")
     def test_grid_mode_uses_grid_module(
         self, mock_grid, mock_multi_camera_dir, tmp_path
@@ -1,5 +1,7 @@
 """Tests for file list generation with calendar filtering."""
 
+import os
+import shutil
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from unittest.mock import patch
@@ -7,14 +9,20 @@ from unittest.mock import patch
 import pytest
 
 from frigate_tools.file_list import (
+    ALL_HOURS_MASK,
     HourRange,
+    RecordingIndex,
+    build_hour_mask,
+    epoch_seconds,
     find_recording_files,
     generate_file_lists,
+    hour_skip_decision,
     parse_file_timestamp,
     parse_skip_days,
     parse_skip_hours,
     should_skip_timestamp,
     utc_to_local,
+    weekdays_in_range,
 )
 
 
@@ -119,6 +127,43 @@ class TestParseSkipHours:
         assert result == []
 
 
+class TestBuildHourMask:
+    """Tests for build_hour_mask function."""
+
+    def test_empty_list(self):
+        """No ranges means no hours skipped."""
+        assert build_hour_mask([]) == 0
+
+    def test_normal_range(self):
+        """Sets bits for each hour in an inclusive range."""
+        mask = build_hour_mask([HourRange(9, 11)])
+        assert mask == (1 << 9) | (1 << 10) | (1 << 11)
+
+    def test_full_day(self):
+        """0-23 covers every hour."""
+        assert build_hour_mask([HourRange(0, 23)]) == ALL_HOURS_MASK
+
+    def test_combined_ranges_cover_day(self):
+        """Wrapping and normal ranges combine to cover the full day."""
+        assert build_hour_mask([HourRange(16, 8), HourRange(9, 15)]) == ALL_HOURS_MASK
+
+
+class TestWeekdaysInRange:
+    """Tests for weekdays_in_range function."""
+
+    @patch("frigate_tools.file_list.utc_to_local", side_effect=lambda x: x)
+    def test_single_day(self, mock_utc):
+        """Range within one day touches one weekday."""
+        result = weekdays_in_range(datetime(2025, 12, 5, 8), datetime(2025, 12, 5, 12))
+        assert result == {4}
+
+    @patch("frigate_tools.file_list.utc_to_local", side_effect=lambda x: x)
+    def test_long_range_covers_week(self, mock_utc):
+        """Range longer than a week touches every weekday."""
+        result = weekdays_in_range(datetime(2025, 12, 1), datetime(2025, 12, 31))
+        assert result == set(range(7))
+
+
 class TestParseFileTimestamp:
     """Tests for parse_file_timestamp function."""
 
@@ -142,6 +187,9 @@ class TestParseFileTimestamp:
         assert parse_file_timestamp("2025-12-01", "14", "invalid.mp4") is None
         assert parse_file_timestamp("2025-12-01", "14", "30-45.mp4") is None
         assert parse_file_timestamp("2025-12-01", "14", "30.45.txt") is None
+        assert parse_file_timestamp("2025-12-01", "14", "3_.45.mp4") is None
+        assert parse_file_timestamp("2025-12-01", "14", "130.45.mp4") is None
+        assert parse_file_timestamp("2025-12-01", "14", "1\u00b2.45.mp4") is None
 
     def test_invalid_date_format(self):
         """Returns None for invalid date format."""
@@ -149,6 +197,18 @@ class TestParseFileTimestamp:
         assert parse_file_timestamp("2025/12/01", "14", "30.45.mp4") is None
 
 
+class TestEpochSeconds:
+    """Tests for epoch_seconds function."""
+
+    def test_whole_seconds(self):
+        """Whole-second datetimes convert exactly."""
+        assert epoch_seconds(datetime(1970, 1, 1, 0, 1, 5)) == 65
+
+    def test_rounds_up_fractional_seconds(self):
+        """Fractional seconds round up so range checks stay exact."""
+        assert epoch_seconds(datetime(1970, 1, 1, 0, 0, 1, 500000)) == 2
+
+
 class TestUtcToLocal:
     """Tests for utc_to_local timezone conversion."""
 
@@ -282,6 +342,28 @@ class TestShouldSkipTimestamp:
         assert result is True, f"UTC {utc_hour}:00 should convert to ~12:00 local and be skipped"
 
 
+class TestHourSkipDecision:
+    """Tests for hour_skip_decision function."""
+
+    @patch("frigate_tools.file_list.utc_to_local", side_effect=lambda x: x)
+    def test_whole_hour_skipped(self, mock_utc):
+        """Hour inside a skip range is skipped as a whole."""
+        assert hour_skip_decision(datetime(2025, 12, 5, 20), set(), [HourRange(16, 8)]) is True
+
+    @patch("frigate_tools.file_list.utc_to_local", side_effect=lambda x: x)
+    def test_whole_hour_kept(self, mock_utc):
+        """Hour outside all skip rules is kept as a whole."""
+        assert hour_skip_decision(datetime(2025, 12, 5, 12), {5, 6}, [HourRange(16, 8)]) is False
+
+    @patch(
+        "frigate_tools.file_list.utc_to_local",
+        side_effect=lambda x: x + timedelta(hours=5, minutes=30),
+    )
+    def test_half_hour_offset_is_undecided(self, mock_utc):
+        """Local hour changing mid-hour defers to per-file checks."""
+        assert hour_skip_decision(datetime(2025, 12, 5, 12), set(), [HourRange(18, 18)]) is None
+
+
 class TestFindRecordingFiles:
     """Tests for find_recording_files function."""
 
@@ -363,6 +445,30 @@ class TestFindRecordingFiles:
         # Dec 5 20:00 is skipped (8pm)
         assert len(files) == 4
 
+    def test_subsecond_start_excludes_earlier_file(self, mock_frigate_dir):
+        """A start just after a segment timestamp excludes that segment."""
+        files = find_recording_files(
+            instance_path=mock_frigate_dir,
+            camera="front",
+            start=datetime(2025, 12, 5, 12, 0, 0, 1),
+            end=datetime(2025, 12, 5, 13, 0, 0),
+        )
+        assert [f.name for f in files] == ["30.00.mp4"]
+
+    def test_skips_non_ascii_digit_names(self, mock_frigate_dir):
+        """Stray names with digit-like characters are skipped, not parsed."""
+        dec5 = mock_frigate_dir / "recordings" / "2025-12-05"
+        (dec5 / "1\u00b2" / "front").mkdir(parents=True)
+        (dec5 / "12" / "front" / "4\u00b2.00.mp4").touch()
+
+        files = find_recording_files(
+            instance_path=mock_frigate_dir,
+            camera="front",
+            start=datetime(2025, 12, 5, 12, 0, 0),
+            end=datetime(2025, 12, 5, 13, 0, 0),
+        )
+        assert [f.name for f in files] == ["00.00.mp4", "30.00.mp4"]
+
     def test_nonexistent_camera(self, mock_frigate_dir):
         """Returns empty list for nonexistent camera."""
         files = find_recording_files(
@@ -385,6 +491,106 @@ class TestFindRecordingFiles:
         assert file_strs == sorted(file_strs)
 
 
+class TestRecordingIndex:
+    """Tests for the persisted recordings directory index."""
+
+    @pytest.fixture
+    def cache_home(self, tmp_path, monkeypatch):
+        """Point the cache directory at a temp dir."""
+        cache = tmp_path / "cache"
+        monkeypatch.setenv("XDG_CACHE_HOME", str(cache))
+        return cache
+
+    @pytest.fixture
+    def old_camera_dir(self, tmp_path):
+        """Camera directory with an mtime old enough to be cached."""
+        camera_path = tmp_path / "instance" / "recordings" / "2025-12-05" / "12" / "front"
+        camera_path.mkdir(parents=True)
+        (camera_path / "00.00.mp4").touch()
+        (camera_path / "30.00.mp4").touch()
+        os.utime(camera_path, (1_700_000_000, 1_700_000_000))
+        return camera_path
+
+    def test_list_missing_dir(self, cache_home, tmp_path):
+        """Missing directories list as None."""
+        index = RecordingIndex.load(tmp_path)
+        assert index.list_dir(tmp_path / "missing") is None
+
+    def test_round_trip(self, cache_home, old_camera_dir):
+        """Saved listings are reused by a freshly loaded index."""
+        instance = old_camera_dir.parents[3]
+        index = RecordingIndex.load(instance)
+        assert index.list_dir(old_camera_dir) == ["00.00.mp4", "30.00.mp4"]
+        index.save()
+        assert index.path is not None and index.path.exists()
+
+        reloaded = RecordingIndex.load(instance)
+        with patch("frigate_tools.file_list.os.listdir") as mock_listdir:
+            assert reloaded.list_dir(old_camera_dir) == ["00.00.mp4", "30.00.mp4"]
+            mock_listdir.assert_not_called()
+
+    def test_changed_dir_is_relisted(self, cache_home, old_camera_dir):
+        """A directory whose mtime changed is listed again."""
+        instance = old_camera_dir.parents[3]
+        index = RecordingIndex.load(instance)
+        index.list_dir(old_camera_dir)
+        index.save()
+
+        (old_camera_dir / "45.00.mp4").touch()
+        os.utime(old_camera_dir, (1_700_000_100, 1_700_000_100))
+
+        reloaded = RecordingIndex.load(instance)
+        assert reloaded.list_dir(old_camera_dir) == ["00.00.mp4", "30.00.mp4", "45.00.mp4"]
+
+    def test_deleted_dirs_pruned_on_save(self, cache_home, old_camera_dir):
+        """Listings of directories removed by retention are dropped on save."""
+        instance = old_camera_dir.parents[3]
+        date_dir = old_camera_dir.parents[1]
+        os.utime(date_dir, (1_700_000_000, 1_700_000_000))
+        index = RecordingIndex.load(instance)
+        index.list_dir(date_dir)
+        index.list_dir(old_camera_dir)
+        index.save()
+
+        # Retention removes the hour: the date dir is relisted without it
+        shutil.rmtree(old_camera_dir.parent)
+        os.utime(date_dir, (1_700_000_100, 1_700_000_100))
+        reloaded = RecordingIndex.load(instance)
+        assert reloaded.list_dir(date_dir) == []
+        reloaded.save()
+        assert set(RecordingIndex.load(instance)._listings) == {str(date_dir)}
+
+        # Then the whole day, without the date dir being listed again
+        shutil.rmtree(date_dir)
+        reloaded = RecordingIndex.load(instance)
+        reloaded._dirty = True
+        reloaded.save()
+        assert RecordingIndex.load(instance)._listings == {}
+
+    def test_corrupt_cache_is_a_miss(self, cache_home, old_camera_dir):
+        """An unreadable index file is ignored instead of raising."""
+        instance = old_camera_dir.parents[3]
+        index = RecordingIndex.load(instance)
+        assert index.path is not None
+        index.path.parent.mkdir(parents=True)
+        # An unsupported pickle protocol raises ValueError
+        index.path.write_bytes(b"\x80\x7f")
+
+        reloaded = RecordingIndex.load(instance)
+        assert reloaded.list_dir(old_camera_dir) == ["00.00.mp4", "30.00.mp4"]
+
+    def test_generate_with_index_matches_scan(self, cache_home, old_camera_dir):
+        """generate_file_lists returns the same files with the index enabled."""
+        instance = old_camera_dir.parents[3]
+        kwargs = dict(
+            cameras=["front"],
+            start=datetime(2025, 12, 5, 0, 0, 0),
+            end=datetime(2025, 12, 6, 0, 0, 0),
+            instance_path=instance,
+        )
+        assert generate_file_lists(**kwargs, use_index=True) == generate_file_lists(**kwargs)
+
+
 class TestGenerateFileLists:
     """Tests for generate_file_lists function."""
 
@@ -563,3 +769,32 @@ class TestGenerateFileListsCombinedFilters:
 
         files = result["front"]
         assert len(files) == 0
+
+    @patch("frigate_tools.file_list.find_recording_files")
+    def test_full_day_skip_hours_short_circuits(self, mock_find, mock_week_dir):
+        """Skip hours covering the whole day returns empty lists without scanning."""
+        result = generate_file_lists(
+            cameras=["front", "back"],
+            start=datetime(2025, 12, 1, 0, 0, 0),
+            end=datetime(2025, 12, 8, 0, 0, 0),
+            instance_path=mock_week_dir,
+            skip_hours=["0-23"],
+        )
+
+        assert result == {"front": [], "back": []}
+        mock_find.assert_not_called()
+
+    @patch("frigate_tools.file_list.utc_to_local", side_effect=lambda x: x)
+    @patch("frigate_tools.file_list.find_recording_files")
+    def test_skip_days_covering_range_short_circuits(self, mock_find, mock_utc, mock_week_dir):
+        """Skip days covering every weekday in the range skips the scan."""
+        result = generate_file_lists(
+            cameras=["front"],
+            start=datetime(2025, 12, 6, 0, 0, 0),  # Saturday
+            end=datetime(2025, 12, 7, 12, 0, 0),  # Sunday
+            instance_path=mock_week_dir,
+            skip_days=["sat", "sun"],
+        )
+
+        assert result == {"front": []}
+        mock_find.assert_not_called()
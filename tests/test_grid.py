@@ -1,5 +1,7 @@
 """Tests for multi-camera grid layout module."""
 
+import os
+import threading
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -11,10 +13,22 @@ from frigate_tools.grid import (
     SyncedFileSet,
     calculate_grid_layout,
     create_grid_video,
+    detect_hw_filters,
     generate_xstack_filter,
+    hw_stack_supported,
     parse_ffmpeg_progress,
+    parse_ffmpeg_progress_kv,
     sync_file_lists,
 )
+from frigate_tools.timelapse import HWAccel
+
+
+def _pipe(data: bytes):
+    """Return the read end of a pipe pre-filled with data (then closed)."""
+    read_fd, write_fd = os.pipe()
+    writer = threading.Thread(target=lambda: (os.write(write_fd, data), os.close(write_fd)))
+    writer.start()
+    return os.fdopen(read_fd, "rb", buffering=0)
 
 
 class TestGridLayout:
@@ -87,6 +101,20 @@ class TestCalculateGridLayout:
         assert layout.rows == 3
         assert layout.cols == 3
 
+    def test_layout_is_cached(self):
+        """Repeated calls return the same (immutable) layout object."""
+        assert calculate_grid_layout(7) is calculate_grid_layout(7)
+
+    def test_large_count_outside_table(self):
+        """Counts beyond the precomputed table are still computed."""
+        assert calculate_grid_layout(100) == GridLayout(rows=10, cols=10)
+
+    def test_layout_is_immutable(self):
+        """Cached layouts cannot be modified by callers."""
+        layout = calculate_grid_layout(4)
+        with pytest.raises(AttributeError):
+            layout.rows = 3
+
     def test_layout_has_enough_cells(self):
         """Layout always has enough cells for all cameras."""
         for count in range(1, 20):
@@ -122,11 +150,75 @@ class TestGenerateXstackFilter:
         assert "xstack" in result
         assert "inputs=4" in result
 
+    def test_three_by_three_positions(self):
+        """Offsets accumulate previous column widths and row heights."""
+        result = generate_xstack_filter(9, GridLayout(3, 3))
+        assert result.endswith(
+            "layout=0_0|w0_0|w0+w1_0|0_h0|w0_h0|w0+w1_h0|0_h0+h3|w0_h0+h3|w0+w1_h0+h3[out]"
+        )
+
     def test_with_dimensions(self):
         """Includes scale filters when dimensions specified."""
         result = generate_xstack_filter(2, GridLayout(1, 2), width=640, height=480)
         assert "scale=640:480" in result
 
+    def test_scaled_single_row_uses_hstack(self):
+        """A scaled single row is stacked with hstack."""
+        result = generate_xstack_filter(2, GridLayout(1, 2), width=640, height=480)
+        assert result.endswith("[v0][v1]hstack=inputs=2[out]")
+        assert "xstack" not in result
+
+    def test_scaled_single_column_uses_vstack(self):
+        """A scaled single column is stacked with vstack."""
+        result = generate_xstack_filter(3, GridLayout(3, 1), width=640, height=480)
+        assert result.endswith("[v0][v1][v2]vstack=inputs=3[out]")
+
+    def test_unscaled_single_row_keeps_xstack(self):
+        """Unscaled inputs may differ in size, so xstack is kept."""
+        result = generate_xstack_filter(2, GridLayout(1, 2))
+        assert "hstack" not in result
+
+    def test_vaapi_filters(self):
+        """Uses VAAPI scale/xstack variants when requested."""
+        result = generate_xstack_filter(
+            2, GridLayout(1, 2), width=640, height=480, hwaccel=HWAccel.VAAPI
+        )
+        assert "scale_vaapi=640:480" in result
+        assert "xstack_vaapi=inputs=2" in result
+
+    def test_software_hwaccel_uses_cpu_filters(self):
+        """HWAccel.NONE keeps the CPU filters."""
+        result = generate_xstack_filter(2, GridLayout(1, 2), hwaccel=HWAccel.NONE)
+        assert "xstack=inputs=2" in result
+
+
+class TestHwStackSupport:
+    """Tests for hardware stacking filter detection."""
+
+    @patch("frigate_tools.grid.subprocess.run")
+    def test_detect_parses_filter_list(self, mock_run):
+        """Finds hardware filters in ffmpeg -filters output."""
+        mock_run.return_value = MagicMock(
+            stdout=(
+                " ... xstack            VVV->V     Stack video inputs into custom layout.\n"
+                " ... xstack_vaapi      N->V       \"VA-API\" xstack\n"
+                " ... scale_vaapi       V->V       Scale to/from VAAPI surfaces.\n"
+            )
+        )
+        assert detect_hw_filters() == frozenset({"xstack_vaapi", "scale_vaapi"})
+
+    @patch("frigate_tools.grid.subprocess.run", side_effect=FileNotFoundError)
+    def test_detect_without_ffmpeg(self, mock_run):
+        """No filters when ffmpeg is missing."""
+        assert detect_hw_filters() == frozenset()
+
+    @patch("frigate_tools.grid.get_hw_filters", return_value=frozenset({"scale_qsv", "xstack_qsv"}))
+    def test_supported_only_for_matching_hwaccel(self, mock_filters):
+        """Support requires both filters for the acceleration type."""
+        assert hw_stack_supported(HWAccel.QSV) is True
+        assert hw_stack_supported(HWAccel.VAAPI) is False
+        assert hw_stack_supported(HWAccel.NONE) is False
+
 
 class TestSyncFileLists:
     """Tests for file list synchronization."""
@@ -156,6 +248,16 @@ class TestSyncFileLists:
         assert 1 in result.gap_indices
         assert 2 in result.gap_indices
 
+    def test_gaps_span_shortest_to_longest(self):
+        """Gaps cover every index some camera is missing, and no others."""
+        files = {
+            "cam1": [Path(f"a{i}.mp4") for i in range(5)],
+            "cam2": [Path(f"b{i}.mp4") for i in range(3)],
+            "cam3": [Path(f"c{i}.mp4") for i in range(1)],
+        }
+        result = sync_file_lists(files)
+        assert result.gap_indices == {1, 2, 3, 4}
+
     def test_preserves_original_files(self):
         """Original file lists are preserved."""
         files = {
@@ -203,6 +305,69 @@ class TestCreateGridVideo:
         assert "ffmpeg" in call_args[0]
         assert "-filter_complex" in call_args
 
+    @patch("subprocess.Popen")
+    def test_inputs_use_thread_queue(self, mock_popen, tmp_path):
+        """Each input gets a thread queue and the output uses auto threads."""
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.communicate.return_value = ("", "")
+        mock_popen.return_value = mock_process
+
+        files = {
+            "cam1": [tmp_path / "a.mp4"],
+            "cam2": [tmp_path / "b.mp4"],
+        }
+
+        create_grid_video(files, tmp_path / "output.mp4")
+
+        call_args = mock_popen.call_args[0][0]
+        assert call_args.count("-thread_queue_size") == call_args.count("-i")
+        threads_idx = call_args.index("-threads")
+        assert call_args[threads_idx + 1] == "0"
+
+    @patch("subprocess.Popen")
+    def test_filter_threads(self, mock_popen, tmp_path):
+        """Filter graph threads default to the CPU count and can be overridden."""
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.communicate.return_value = ("", "")
+        mock_popen.return_value = mock_process
+        files = {"cam1": [tmp_path / "a.mp4"]}
+
+        with patch("os.cpu_count", return_value=12):
+            create_grid_video(files, tmp_path / "output.mp4")
+        call_args = mock_popen.call_args[0][0]
+        assert call_args[call_args.index("-filter_threads") + 1] == "12"
+        assert call_args[call_args.index("-filter_complex_threads") + 1] == "12"
+
+        create_grid_video(files, tmp_path / "output.mp4", filter_threads=2)
+        call_args = mock_popen.call_args[0][0]
+        assert call_args[call_args.index("-filter_complex_threads") + 1] == "2"
+
+    @patch("subprocess.Popen")
+    def test_software_encode_options(self, mock_popen, tmp_path):
+        """Software encoding applies preset, crf and tune, and tune can be dropped."""
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.communicate.return_value = ("", "")
+        mock_popen.return_value = mock_process
+        files = {"cam1": [tmp_path / "a.mp4"]}
+
+        create_grid_video(files, tmp_path / "output.mp4", hwaccel=HWAccel.NONE)
+        call_args = mock_popen.call_args[0][0]
+        assert call_args[call_args.index("-preset") + 1] == "veryfast"
+        assert call_args[call_args.index("-crf") + 1] == "23"
+        assert call_args[call_args.index("-tune") + 1] == "zerolatency"
+
+        create_grid_video(
+            files, tmp_path / "output.mp4",
+            hwaccel=HWAccel.NONE, preset="slow", crf=20, tune=None,
+        )
+        call_args = mock_popen.call_args[0][0]
+        assert call_args[call_args.index("-preset") + 1] == "slow"
+        assert call_args[call_args.index("-crf") + 1] == "20"
+        assert "-tune" not in call_args
+
     @patch("subprocess.Popen")
     def test_handles_ffmpeg_failure(self, mock_popen, tmp_path):
         """Returns False when ffmpeg fails."""
@@ -217,6 +382,29 @@ class TestCreateGridVideo:
         result = create_grid_video(files, tmp_path / "output.mp4")
         assert result is False
 
+    @patch("frigate_tools.grid.hw_stack_supported", side_effect=lambda hw: hw == HWAccel.QSV)
+    @patch("subprocess.Popen")
+    def test_hardware_failure_retries_in_software(self, mock_popen, mock_hw, tmp_path):
+        """A failed GPU decode/stack run is retried once on the CPU."""
+        failed = MagicMock()
+        failed.returncode = 1
+        failed.communicate.return_value = ("", "xstack_qsv: error")
+        succeeded = MagicMock()
+        succeeded.returncode = 0
+        succeeded.communicate.return_value = ("", "")
+        mock_popen.side_effect = [failed, succeeded]
+
+        files = {"cam1": [tmp_path / "a.mp4"], "cam2": [tmp_path / "b.mp4"]}
+        result = create_grid_video(files, tmp_path / "output.mp4", hwaccel=HWAccel.QSV)
+
+        assert result is True
+        hw_cmd = mock_popen.call_args_list[0][0][0]
+        sw_cmd = mock_popen.call_args_list[1][0][0]
+        assert "xstack_qsv" in hw_cmd[hw_cmd.index("-filter_complex") + 1]
+        assert "-hwaccel" not in sw_cmd
+        assert "xstack_qsv" not in sw_cmd[sw_cmd.index("-filter_complex") + 1]
+        assert sw_cmd[sw_cmd.index("-c:v") + 1] == "libx264"
+
     def test_rejects_camera_with_no_files(self, tmp_path):
         """Returns False when a camera has no files."""
         files = {
@@ -245,21 +433,92 @@ class TestCreateGridVideo:
         # We can't easily verify this without inspecting internals,
         # but we verify the function completes successfully
 
+    @patch("subprocess.Popen")
+    def test_single_file_camera_skips_concat(self, mock_popen, tmp_path):
+        """A camera with one segment is passed to ffmpeg directly."""
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.communicate.return_value = ("", "")
+        mock_popen.return_value = mock_process
+
+        files = {
+            "cam1": [tmp_path / "a.mp4"],
+            "cam2": [tmp_path / "b.mp4", tmp_path / "c.mp4"],
+        }
+
+        create_grid_video(files, tmp_path / "output.mp4")
+
+        call_args = mock_popen.call_args[0][0]
+        inputs = [call_args[i + 1] for i, arg in enumerate(call_args) if arg == "-i"]
+        assert inputs[0] == str(tmp_path / "a.mp4")
+        assert call_args.count("concat") == 1
+
+    @pytest.mark.skipif(not hasattr(os, "memfd_create"), reason="requires memfd_create")
+    @patch("subprocess.Popen")
+    def test_concat_lists_passed_in_memory(self, mock_popen, tmp_path):
+        """Concat lists are handed to ffmpeg as inherited memfds, then closed."""
+        lists = []
+
+        def read_lists(cmd, **kwargs):
+            for i, arg in enumerate(cmd):
+                if arg == "-i":
+                    lists.append(Path(cmd[i + 1]).read_text())
+            process = MagicMock()
+            process.returncode = 0
+            process.communicate.return_value = ("", "")
+            return process
+
+        mock_popen.side_effect = read_lists
+        files = {"cam1": [tmp_path / "a.mp4", tmp_path / "it's.mp4"]}
+
+        assert create_grid_video(files, tmp_path / "output.mp4") is True
+
+        assert lists == [f"file '{tmp_path}/a.mp4'\nfile '{tmp_path}/it'\\''s.mp4'\n"]
+        pass_fds = mock_popen.call_args.kwargs["pass_fds"]
+        assert len(pass_fds) == 1
+        with pytest.raises(OSError):
+            os.fstat(pass_fds[0])
+
+    @pytest.mark.skipif(not hasattr(os, "memfd_create"), reason="requires memfd_create")
+    def test_concat_lists_closed_on_error(self, tmp_path):
+        """Concat list memfds are close-on-exec and released if setup fails."""
+        from frigate_tools import grid
+
+        opened = []
+        write_concat_list = grid._write_concat_list
+
+        def record(camera, files):
+            if opened:
+                raise OSError("out of memory")
+            path, fd = write_concat_list(camera, files)
+            assert not os.get_inheritable(fd)
+            opened.append(fd)
+            return path, fd
+
+        files = {
+            "cam1": [tmp_path / "a.mp4", tmp_path / "b.mp4"],
+            "cam2": [tmp_path / "c.mp4", tmp_path / "d.mp4"],
+        }
+        with patch("frigate_tools.grid._write_concat_list", side_effect=record):
+            with pytest.raises(OSError):
+                create_grid_video(files, tmp_path / "output.mp4")
+
+        assert len(opened) == 1
+        with pytest.raises(OSError):
+            os.fstat(opened[0])
+
     @patch("subprocess.Popen")
     def test_progress_callback_called(self, mock_popen, tmp_path):
         """Progress callback is called during encoding."""
         mock_process = MagicMock()
         mock_process.returncode = 0
-        mock_process.stderr = MagicMock()
-        mock_process.stderr.read.return_value = ""
-
-        # Simulate progress output
-        mock_stdout = MagicMock()
-        mock_stdout.__iter__ = lambda self: iter([
-            "frame=  100 fps= 30 time=00:00:10.00 speed=1.2x",
-            "frame=  200 fps= 30 time=00:00:20.00 speed=1.2x",
-        ])
-        mock_process.stdout = mock_stdout
+
+        # Simulate progress output on real pipes
+        mock_process.stdout = _pipe(
+            b"fps=30.00\nout_time_us=10000000\nspeed=1.2x\nprogress=continue\n"
+            b"fps=30.00\nout_time_us=20000000\nspeed=1.2x\nprogress=end\n"
+        )
+        mock_process.stderr = _pipe(b"")
         mock_popen.return_value = mock_process
 
         files = {"cam1": [tmp_path / "a.mp4"]}
@@ -282,6 +541,59 @@ class TestCreateGridVideo:
         for call in progress_calls:
             assert call.percent is not None
 
+    @patch("frigate_tools.grid.PROGRESS_INTERVAL", 3600)
+    @patch("subprocess.Popen")
+    def test_progress_throttled_to_latest(self, mock_popen, tmp_path):
+        """Progress bursts are coalesced, always ending with the latest update."""
+        mock_process = MagicMock()
+        mock_process.returncode = 1
+        mock_process.stdout = _pipe(b"".join(
+            f"out_time_us={s * 1_000_000}\nprogress=continue\n".encode() for s in range(1, 60)
+        ))
+        mock_process.stderr = _pipe(b"x" * 70_000)  # more than a pipe buffer
+        mock_popen.return_value = mock_process
+
+        files = {"cam1": [tmp_path / "a.mp4"]}
+        progress_calls = []
+
+        result = create_grid_video(
+            files,
+            tmp_path / "output.mp4",
+            progress_callback=progress_calls.append,
+        )
+
+        assert result is False
+        assert 1 <= len(progress_calls) <= 2
+        assert progress_calls[-1].time_seconds == 59.0
+
+
+    @patch("subprocess.Popen")
+    def test_progress_falls_back_to_stderr_stats(self, mock_popen, tmp_path):
+        """Without -progress output, stats lines on stderr drive progress."""
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(
+            b"Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'a.mp4':\n"
+            b"frame=  150 fps= 30 q=28.0 size=  1024kB time=00:00:05.00 speed=1.5x\r"
+            b"frame=  300 fps= 30 q=28.0 size=  2048kB time=00:00:10.00 speed=1.5x\r"
+        )
+        mock_popen.return_value = mock_process
+
+        files = {"cam1": [tmp_path / "a.mp4"]}
+        progress_calls = []
+
+        create_grid_video(
+            files,
+            tmp_path / "output.mp4",
+            progress_callback=progress_calls.append,
+            estimated_duration=20.0,
+        )
+
+        assert progress_calls[-1].time_seconds == 10.0
+        assert progress_calls[-1].percent == pytest.approx(50.0)
+        assert progress_calls[-1].speed == 1.5
+
 
 class TestParseFFmpegProgress:
     """Tests for ffmpeg progress parsing."""
@@ -304,6 +616,33 @@ class TestParseFFmpegProgress:
         assert result is not None
         assert result.percent == 50.0
 
+    def test_parse_full_stats_line(self):
+        """Parses fps and speed around the other stats fields."""
+        line = "frame= 1500 fps=120 q=28.0 size=   10240kB time=00:01:02.50 bitrate=1342.2kbits/s speed=4.01x"
+        result = parse_ffmpeg_progress(line)
+
+        assert result is not None
+        assert result.time_seconds == 62.5
+        assert result.fps == 120.0
+        assert result.speed == 4.01
+
+    def test_parse_time_only(self):
+        """Missing fps/speed default to zero."""
+        result = parse_ffmpeg_progress("out_time=00:00:05.00")
+
+        assert result is not None
+        assert result.time_seconds == 5.0
+        assert result.fps == 0.0
+        assert result.speed == 0.0
+
+    def test_parse_with_percent_scale(self):
+        """Precomputed percent scale gives the same percent as the duration."""
+        line = "frame=  100 fps= 30 time=00:00:30.00 speed=1.2x"
+        result = parse_ffmpeg_progress(line, percent_scale=100.0 / 60.0)
+
+        assert result is not None
+        assert result.percent == 50.0
+
     def test_parse_invalid_line(self):
         """Returns None for non-progress lines."""
         result = parse_ffmpeg_progress("Starting encoding...")
@@ -316,3 +655,35 @@ class TestParseFFmpegProgress:
 
         assert result is not None
         assert result.percent == 100.0
+
+
+class TestParseFFmpegProgressKv:
+    """Tests for -progress key=value parsing."""
+
+    def test_emits_on_progress_sentinel(self):
+        """A block is reported when its progress= line arrives."""
+        fields: dict[str, str] = {}
+        lines = ["frame=300", "fps=29.97", "out_time_us=30000000", "speed=2.5x"]
+        for line in lines:
+            assert parse_ffmpeg_progress_kv(line, fields, percent_scale=100.0 / 60.0) is None
+
+        result = parse_ffmpeg_progress_kv("progress=continue", fields, percent_scale=100.0 / 60.0)
+
+        assert result == GridProgress(percent=50.0, fps=29.97, speed=2.5, time_seconds=30.0)
+        assert fields == {}
+
+    def test_not_available_values(self):
+        """N/A time skips the block; N/A fps/speed default to zero."""
+        fields: dict[str, str] = {}
+        parse_ffmpeg_progress_kv("out_time_us=N/A", fields)
+        assert parse_ffmpeg_progress_kv("progress=continue", fields) is None
+
+        parse_ffmpeg_progress_kv("out_time_us=1500000", fields)
+        parse_ffmpeg_progress_kv("speed=N/A", fields)
+        result = parse_ffmpeg_progress_kv("progress=end", fields)
+
+        assert result is not None
+        assert result.time_seconds == 1.5
+        assert result.fps == 0.0
+        assert result.speed == 0.0
+        assert result.percent is None
@@ -1,5 +1,6 @@
 """Tests for observability module."""
 
+import logging
 import os
 from unittest.mock import patch
 
@@ -23,6 +24,7 @@ def reset_observability():
     observability._initialized = False
     observability._tracer = None
     observability._logger = None
+    observability._otel_enabled = False
     yield
     shutdown_observability()
 
@@ -168,6 +170,22 @@ def test_service_name_default():
         assert observability._get_service_name() == "frigate-tools"
 
 
+def test_log_level_from_env():
+    """LOG_LEVEL env var sets the minimum log level."""
+    with patch.dict(os.environ, {"LOG_LEVEL": "debug"}):
+        assert observability._get_log_level() == logging.DEBUG
+    with patch.dict(os.environ, {"LOG_LEVEL": "warning"}):
+        assert observability._get_log_level() == logging.WARNING
+
+
+def test_log_level_default():
+    """Default log level is info, also for unknown values."""
+    with patch.dict(os.environ, {}, clear=True):
+        assert observability._get_log_level() == logging.INFO
+    with patch.dict(os.environ, {"LOG_LEVEL": "chatty"}):
+        assert observability._get_log_level() == logging.INFO
+
+
 def test_endpoint_from_env():
     """Endpoint comes from OTEL_EXPORTER_OTLP_ENDPOINT env var."""
     with patch.dict(os.environ, {"OTEL_EXPORTER_OTLP_ENDPOINT": "http://custom:4317"}):
@@ -191,3 +209,20 @@ def test_init_with_custom_endpoint(disabled_otel):
     """init_observability accepts custom endpoint."""
     init_observability(endpoint="http://custom:4317")
     assert observability._initialized is True
+
+
+def test_trace_context_skipped_when_disabled(disabled_otel):
+    """Log entries skip the span lookup entirely when OTel is disabled."""
+    init_observability()
+    with patch.object(observability, "_get_current_span") as mock_span:
+        event = observability._add_trace_context(None, "info", {"event": "x"})
+
+    mock_span.assert_not_called()
+    assert event == {"event": "x"}
+
+
+def test_format_ids_zero_padded_hex():
+    """Trace and span ids are fixed-width lowercase hex."""
+    trace_id, span_id = observability._format_ids(0xABC, 0x1F)
+    assert trace_id == "00000000000000000000000000000abc"
+    assert span_id == "000000000000001f"
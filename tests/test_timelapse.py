@@ -1,6 +1,9 @@
 """Tests for timelapse encoding module."""
 
+import os
 import subprocess
+import threading
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -10,16 +13,28 @@ from frigate_tools.timelapse import (
     ConcatProgress,
     HWAccel,
     ProgressInfo,
+    _tmpdir,
     concat_files,
     create_timelapse,
     encode_frames_to_video,
     encode_timelapse,
     extract_keyframes_parallel,
+    get_hwaccel,
     get_video_duration,
+    get_video_durations_parallel,
+    get_video_info,
     parse_ffmpeg_progress,
 )
 
 
+def _pipe(data: bytes):
+    """Return the read end of a pipe pre-filled with data (then closed)."""
+    read_fd, write_fd = os.pipe()
+    writer = threading.Thread(target=lambda: (os.write(write_fd, data), os.close(write_fd)))
+    writer.start()
+    return os.fdopen(read_fd, "rb", buffering=0)
+
+
 def ffmpeg_available() -> bool:
     """Check if ffmpeg is available on the system."""
     try:
@@ -104,6 +119,28 @@ class TestParseFFmpegProgress:
         assert progress.time_seconds == 5400.0  # 1.5 hours
         assert progress.percent == 75.0
 
+    def test_parse_progress_pipe_not_available(self):
+        """out_time before the first frame (N/A or negative) is ignored."""
+        assert parse_ffmpeg_progress("out_time=N/A") is None
+        assert parse_ffmpeg_progress("out_time=-00:00:00.040000") is None
+
+    def test_parse_classic_time_not_available(self):
+        """Classic lines without a usable time= value are ignored."""
+        assert parse_ffmpeg_progress("frame=    0 fps=0.0 q=0.0 size=N/A time=N/A bitrate=N/A") is None
+        assert parse_ffmpeg_progress("frame=    1 fps=0.0 time=-00:00:00.03 speed=N/A") is None
+
+    def test_parse_classic_time_at_end_of_line(self):
+        """time= may be the last field on the line."""
+        result = parse_ffmpeg_progress("frame=   30 fps= 30 time=00:01:02.50")
+        assert result is not None
+        assert result.time_seconds == pytest.approx(62.5)
+
+    def test_parse_other_progress_keys(self):
+        """Other -progress keys are not progress lines on their own."""
+        assert parse_ffmpeg_progress("out_time_us=30000000") is None
+        assert parse_ffmpeg_progress("frame=100") is None
+        assert parse_ffmpeg_progress("progress=continue") is None
+
     def test_parse_progress_pipe_no_percent_without_duration(self):
         """out_time format returns None percent when no duration provided."""
         line = "out_time=00:00:30.000000"
@@ -122,12 +159,98 @@ class TestGetVideoDuration:
         """Returns duration from ffprobe output."""
         mock_run.return_value = MagicMock(
             returncode=0,
-            stdout='{"format": {"duration": "123.456"}, "streams": [{"r_frame_rate": "30/1"}]}',
+            stdout="codec_name=h264\nr_frame_rate=30/1\nduration=123.456\n",
         )
 
         duration = get_video_duration(Path("/test/video.mp4"))
         assert abs(duration - 123.456) < 0.001
 
+    @patch("subprocess.run")
+    def test_get_duration_reads_mp4_header(self, mock_run, tmp_path):
+        """MP4 duration comes from moov/mvhd after mdat, without ffprobe."""
+        import struct
+
+        def box(box_type: bytes, body: bytes) -> bytes:
+            return struct.pack(">I4s", 8 + len(body), box_type) + body
+
+        # mvhd v0: version/flags, creation, modification, timescale, duration
+        mvhd = box(b"mvhd", struct.pack(">IIIII", 0, 0, 0, 90000, 900900) + bytes(80))
+        video = tmp_path / "segment.mp4"
+        video.write_bytes(
+            box(b"ftyp", b"isom" + bytes(4)) + box(b"mdat", bytes(1000)) + box(b"moov", mvhd)
+        )
+
+        assert get_video_duration(video) == pytest.approx(10.01)
+        mock_run.assert_not_called()
+
+    @patch("subprocess.run")
+    def test_get_info_reads_mp4_video_track(self, mock_run, tmp_path):
+        """MP4 frame rate and codec come from the video trak, without ffprobe."""
+        import struct
+
+        def box(box_type: bytes, body: bytes) -> bytes:
+            return struct.pack(">I4s", 8 + len(body), box_type) + body
+
+        mvhd = box(b"mvhd", struct.pack(">IIIII", 0, 0, 0, 1000, 10010) + bytes(80))
+        mdhd = box(b"mdhd", struct.pack(">IIIII", 0, 0, 0, 30000, 300300) + bytes(4))
+        hdlr = box(b"hdlr", bytes(8) + b"vide" + bytes(13))
+        stsd = box(b"stsd", struct.pack(">II", 0, 1) + box(b"hvc1", bytes(78)))
+        stts = box(b"stts", struct.pack(">IIII", 0, 1, 300, 1001))
+        stbl = box(b"stbl", stsd + stts)
+        trak = box(b"trak", box(b"mdia", mdhd + hdlr + box(b"minf", stbl)))
+        video = tmp_path / "segment.mp4"
+        video.write_bytes(box(b"ftyp", b"isom" + bytes(4)) + box(b"moov", mvhd + trak))
+
+        duration, fps, codec = get_video_info(video)
+        assert duration == pytest.approx(10.01)
+        assert fps == pytest.approx(29.97, abs=0.01)
+        assert codec == "hevc"
+        mock_run.assert_not_called()
+
+    @patch("subprocess.run")
+    def test_get_info_mp4_uses_nominal_frame_rate(self, mock_run, tmp_path):
+        """Variable-rate MP4s report the first stts rate, not the average."""
+        import struct
+
+        def box(box_type: bytes, body: bytes) -> bytes:
+            return struct.pack(">I4s", 8 + len(body), box_type) + body
+
+        mvhd = box(b"mvhd", struct.pack(">IIIII", 0, 0, 0, 1000, 10000) + bytes(80))
+        mdhd = box(b"mdhd", struct.pack(">IIIII", 0, 0, 0, 30000, 300000) + bytes(4))
+        hdlr = box(b"hdlr", bytes(8) + b"vide" + bytes(13))
+        stsd = box(b"stsd", struct.pack(">II", 0, 1) + box(b"avc1", bytes(78)))
+        # 200 frames at 30fps, then 50 frames at 15fps: 22.5fps on average
+        stts = box(b"stts", struct.pack(">IIIIII", 0, 2, 200, 1000, 50, 2000))
+        stbl = box(b"stbl", stsd + stts)
+        trak = box(b"trak", box(b"mdia", mdhd + hdlr + box(b"minf", stbl)))
+        video = tmp_path / "segment.mp4"
+        video.write_bytes(box(b"ftyp", b"isom" + bytes(4)) + box(b"moov", mvhd + trak))
+
+        _, fps, codec = get_video_info(video)
+        assert fps == pytest.approx(30.0)
+        assert codec == "h264"
+        mock_run.assert_not_called()
+
+    @patch("subprocess.run")
+    def test_get_info_parses_key_value_output(self, mock_run):
+        """Reads duration, frame rate and codec from flat ffprobe output."""
+        mock_run.return_value = MagicMock(
+            returncode=0,
+            stdout="codec_name=hevc\nr_frame_rate=30000/1001\nduration=9.98\n",
+        )
+
+        duration, fps, codec = get_video_info(Path("/test/video.mp4"))
+        assert duration == pytest.approx(9.98)
+        assert fps == pytest.approx(29.97, abs=0.01)
+        assert codec == "hevc"
+
+    @patch("subprocess.run")
+    def test_get_duration_not_available(self, mock_run):
+        """Returns 0 when ffprobe reports no duration."""
+        mock_run.return_value = MagicMock(returncode=0, stdout="r_frame_rate=30/1\nduration=N/A\n")
+
+        assert get_video_duration(Path("/test/video.mp4")) == 0.0
+
     @patch("subprocess.run")
     def test_get_duration_failure(self, mock_run):
         """Returns 0 on ffprobe failure."""
@@ -150,6 +273,44 @@ class TestGetVideoDuration:
         duration = get_video_duration(Path("/test/video.mp4"))
         assert duration == 0.0
 
+    @patch("subprocess.run")
+    def test_probe_cached_until_file_changes(self, mock_run, tmp_path):
+        """A file is probed once until its size or mtime changes."""
+        mock_run.return_value = MagicMock(
+            returncode=0,
+            stdout="codec_name=h264\nr_frame_rate=30/1\nduration=10.0\n",
+        )
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"x")
+
+        get_video_duration(video)
+        get_video_duration(video)
+        assert mock_run.call_count == 1
+
+        video.write_bytes(b"xx")
+        get_video_duration(video)
+        assert mock_run.call_count == 2
+
+    @patch("frigate_tools.timelapse.get_video_duration")
+    def test_parallel_durations_keep_order(self, mock_duration):
+        """Parallel probing returns durations in input order."""
+        mock_duration.side_effect = lambda path: float(path.stem)
+        files = [Path(f"/test/{n}.mp4") for n in (3, 1, 2, 10)]
+
+        assert get_video_durations_parallel(files) == [3.0, 1.0, 2.0, 10.0]
+
+    @patch("frigate_tools.timelapse.get_video_duration", return_value=10.0)
+    @patch("subprocess.run")
+    def test_keyframe_rate_from_packet_flags(self, mock_run, mock_duration):
+        """Keyframe rate counts K-flagged packets over the file duration."""
+        from frigate_tools.timelapse import get_keyframe_rate
+
+        mock_run.return_value = MagicMock(returncode=0, stdout="K__\n" * 5 + "___\n" * 145)
+        assert get_keyframe_rate(Path("/test/video.mp4")) == pytest.approx(0.5)
+
+        mock_run.return_value = MagicMock(returncode=1, stdout="")
+        assert get_keyframe_rate(Path("/test/video.mp4")) == 1.0
+
 
 class TestConcatFiles:
     """Tests for file concatenation."""
@@ -227,7 +388,7 @@ class TestConcatFiles:
         result = concat_files(input_files, tmp_path / "output.mp4", progress_callback=on_progress)
 
         assert result is True
-        assert len(progress_updates) == 3
+        assert len(progress_updates) == 4
 
         # Check progress values are reasonable
         assert progress_updates[0].bytes_written == 50000
@@ -237,8 +398,24 @@ class TestConcatFiles:
         # Verify percent calculation (based on bytes written / total size)
         assert progress_updates[0].percent == pytest.approx(50.0)
         assert progress_updates[1].percent == pytest.approx(75.0)
-        # Final progress capped at 99%
+        # Capped at 99% while ffmpeg runs, then completed once it exits
         assert progress_updates[2].percent == pytest.approx(99.0)
+        assert progress_updates[3].percent == 100.0
+        assert progress_updates[3].files_processed == 2
+        assert progress_updates[3].bytes_written == 100000
+
+    @patch("subprocess.Popen")
+    def test_concat_batch_size_is_deprecated(self, mock_popen, tmp_path):
+        """batch_size is still accepted, with a DeprecationWarning."""
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.communicate.return_value = ("", "")
+        mock_popen.return_value = mock_process
+
+        with pytest.warns(DeprecationWarning, match="batch_size"):
+            result = concat_files([tmp_path / "a.mp4"], tmp_path / "output.mp4", batch_size=50)
+
+        assert result is True
 
     @patch("subprocess.Popen")
     def test_concat_progress_includes_file_count(self, mock_popen, tmp_path):
@@ -264,6 +441,24 @@ class TestConcatFiles:
         assert len(captured_progress) > 0
         assert captured_progress[0].files_total == 5
 
+    @patch("subprocess.Popen")
+    def test_concat_with_callback_collects_stderr_on_failure(self, mock_popen, tmp_path):
+        """stderr drained alongside progress is reported when ffmpeg fails."""
+        mock_process = MagicMock()
+        mock_process.returncode = 1
+        mock_process.stdout = iter(["total_size=10\n"])
+        mock_process.stderr = iter(["Invalid data found"])
+        mock_popen.return_value = mock_process
+
+        input_files = [tmp_path / "a.mp4"]
+        input_files[0].touch()
+
+        with patch("frigate_tools.timelapse.get_logger") as mock_logger:
+            result = concat_files(input_files, tmp_path / "output.mp4", progress_callback=lambda x: None)
+
+        assert result is False
+        mock_logger.return_value.error.assert_called_with("Concat failed", stderr="Invalid data found")
+
     @patch("subprocess.Popen")
     def test_concat_adds_progress_flag_when_callback(self, mock_popen, tmp_path):
         """Adds -progress pipe:1 when progress callback is provided."""
@@ -299,6 +494,107 @@ class TestConcatFiles:
         call_args = mock_popen.call_args[0][0]
         assert "-progress" not in call_args
 
+    @patch("frigate_tools.timelapse._file_size")
+    @patch("subprocess.Popen")
+    def test_concat_without_callback_skips_size_total(self, mock_popen, mock_size, tmp_path):
+        """Input sizes are only stat'ed when they feed progress."""
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.communicate.return_value = ("", "")
+        mock_popen.return_value = mock_process
+
+        assert concat_files([tmp_path / "a.mp4", tmp_path / "b.mp4"], tmp_path / "out.mp4")
+        mock_size.assert_not_called()
+
+    @patch("subprocess.Popen")
+    def test_concat_mpegts_joins_bytes_without_ffmpeg(self, mock_popen, tmp_path):
+        """MPEG-TS inputs to a .ts output are joined byte for byte."""
+        inputs = [tmp_path / "a.ts", tmp_path / "b.ts"]
+        inputs[0].write_bytes(b"G" * 188)
+        inputs[1].write_bytes(b"H" * 376)
+        updates = []
+
+        assert concat_files(inputs, tmp_path / "out.ts", progress_callback=updates.append)
+
+        assert (tmp_path / "out.ts").read_bytes() == b"G" * 188 + b"H" * 376
+        mock_popen.assert_not_called()
+        assert [u.files_processed for u in updates] == [1, 2]
+        assert updates[-1].percent == 100.0
+
+    def test_concat_list_quotes_and_absolutizes_paths(self, tmp_path, monkeypatch):
+        """List entries are absolute, with single quotes escaped for ffmpeg."""
+        from frigate_tools.timelapse import _write_concat_list
+
+        monkeypatch.chdir(tmp_path)
+        concat_list = _write_concat_list([Path("/rec/it's.mp4"), Path("b.mp4")], outpoint=0.5)
+
+        try:
+            assert concat_list.read_text().splitlines() == [
+                "file '/rec/it'\\''s.mp4'",
+                "outpoint 0.5",
+                f"file '{tmp_path}/b.mp4'",
+                "outpoint 0.5",
+            ]
+        finally:
+            concat_list.unlink()
+
+
+class TestHasFfmpegDecoder:
+    """Tests for FFmpeg decoder probing."""
+
+    @patch("subprocess.run")
+    def test_parses_decoder_list(self, mock_run):
+        """Matches decoder names exactly in ffmpeg -decoders output."""
+        from frigate_tools.timelapse import _ffmpeg_codecs, has_ffmpeg_decoder
+
+        _ffmpeg_codecs.cache_clear()
+        mock_run.return_value = MagicMock(stdout=(
+            " V....D mjpeg                Motion JPEG\n"
+            " V..... mjpeg_qsv            MJPEG video (Intel Quick Sync Video acceleration)\n"
+        ))
+
+        assert has_ffmpeg_decoder("mjpeg_qsv") is True
+        assert has_ffmpeg_decoder("mjpeg_cuvid") is False
+        _ffmpeg_codecs.cache_clear()
+
+
+class TestReadProgress:
+    """Tests for draining ffmpeg's progress and stderr pipes."""
+
+    @patch("frigate_tools.timelapse.STDERR_TAIL_BYTES", 8)
+    def test_keeps_only_stderr_tail(self):
+        """Long stderr output is trimmed to its final bytes."""
+        from frigate_tools.timelapse import _read_progress
+
+        process = MagicMock()
+        process.stdout = _pipe(b"out_time=00:00:01.000000\n")
+        process.stderr = _pipe(b"x" * 100 + b"final error")
+        updates = []
+
+        stderr = _read_progress(process, 2.0, updates.append)
+
+        assert stderr == "al error"
+        assert [u.percent for u in updates] == [50.0]
+
+
+class TestTmpdir:
+    """Tests for temp file placement."""
+
+    @patch("shutil.disk_usage")
+    def test_uses_shm_with_enough_space(self, mock_usage):
+        """Prefers /dev/shm when it has room."""
+        mock_usage.return_value = MagicMock(free=1 << 30)
+        assert _tmpdir() == "/dev/shm"
+
+    @patch("shutil.disk_usage")
+    def test_falls_back_when_shm_small_or_missing(self, mock_usage):
+        """Uses the system default when /dev/shm is short on space or absent."""
+        mock_usage.return_value = MagicMock(free=1 << 20)
+        assert _tmpdir() is None
+
+        mock_usage.side_effect = FileNotFoundError
+        assert _tmpdir() is None
+
 
 class TestHardwareAcceleration:
     """Tests for hardware acceleration detection."""
@@ -374,19 +670,71 @@ class TestHardwareAcceleration:
         assert result == HWAccel.NONE
 
 
+class TestHwaccelDiskCache:
+    """Tests for persisting hardware detection across runs."""
+
+    @pytest.fixture(autouse=True)
+    def clear_process_cache(self, monkeypatch):
+        """Clear the in-process cache (the cache dir is isolated by conftest)."""
+        import frigate_tools.timelapse as timelapse_module
+
+        monkeypatch.setattr(timelapse_module, "_hwaccel_cache", None)
+
+    @patch("frigate_tools.timelapse._hwaccel_fingerprint", return_value="ffmpeg:1:2")
+    @patch("frigate_tools.timelapse.detect_hwaccel", return_value=HWAccel.VAAPI)
+    def test_reuses_persisted_result(self, mock_detect, mock_fingerprint):
+        """A later process reuses the stored result without probing."""
+        import frigate_tools.timelapse as timelapse_module
+
+        assert get_hwaccel() == HWAccel.VAAPI
+        timelapse_module._hwaccel_cache = None  # simulate a new process
+        assert get_hwaccel() == HWAccel.VAAPI
+        mock_detect.assert_called_once()
+
+    @patch("frigate_tools.timelapse._hwaccel_fingerprint")
+    @patch("frigate_tools.timelapse.detect_hwaccel", return_value=HWAccel.NONE)
+    def test_redetects_when_fingerprint_changes(self, mock_detect, mock_fingerprint):
+        """An updated ffmpeg binary or device triggers detection again."""
+        import frigate_tools.timelapse as timelapse_module
+
+        mock_fingerprint.return_value = "ffmpeg:1:2"
+        get_hwaccel()
+        timelapse_module._hwaccel_cache = None
+        mock_fingerprint.return_value = "ffmpeg:1:3"
+        get_hwaccel()
+        assert mock_detect.call_count == 2
+
+    @patch("frigate_tools.timelapse._hwaccel_fingerprint", return_value="ffmpeg:1:2")
+    @patch("frigate_tools.timelapse.detect_hwaccel", return_value=HWAccel.NONE)
+    def test_redetects_after_ttl(self, mock_detect, mock_fingerprint):
+        """A stored result older than the TTL is detected again."""
+        import frigate_tools.timelapse as timelapse_module
+
+        get_hwaccel()
+        timelapse_module._hwaccel_cache = None
+        with patch("time.time", return_value=time.time() + timelapse_module.HWACCEL_CACHE_TTL + 1):
+            get_hwaccel()
+        assert mock_detect.call_count == 2
+
+
 class TestEncodeTimelapse:
     """Tests for timelapse encoding."""
 
+    @pytest.fixture(autouse=True)
+    def keyframe_rate(self):
+        """Measure Frigate's default one keyframe per second without ffprobe."""
+        with patch("frigate_tools.timelapse.get_keyframe_rate", return_value=1.0) as mock_rate:
+            yield mock_rate
+
     @patch("frigate_tools.timelapse.get_video_info")
     @patch("subprocess.Popen")
-    def test_encode_uses_setpts_filter(self, mock_popen, mock_info, tmp_path):
-        """Uses setpts filter for timelapse speedup."""
-        mock_info.return_value = (600.0, 30.0)  # 10 minutes at 30fps
+    def test_encode_uses_select_filter(self, mock_popen, mock_info, tmp_path):
+        """Selects every Nth frame for timelapse speedup."""
+        mock_info.return_value = (600.0, 30.0, "h264")  # 10 minutes at 30fps
         mock_process = MagicMock()
         mock_process.returncode = 0
-        mock_process.stdout = iter([])
-        mock_process.stderr = MagicMock()
-        mock_process.stderr.read.return_value = ""
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
         mock_popen.return_value = mock_process
 
         input_path = tmp_path / "input.mp4"
@@ -401,17 +749,212 @@ class TestEncodeTimelapse:
 
         assert result is True
 
-        # Check setpts filter was applied with correct speed factor
+        # Speed should be 600/60 = 10, so every 10th frame is kept
         call_args = mock_popen.call_args[0][0]
         filter_idx = call_args.index("-vf") + 1
-        assert "setpts=PTS/" in call_args[filter_idx]
-        # Speed should be 600/60 = 10
-        assert "10" in call_args[filter_idx]
+        assert "select='not(mod(n,10))'" in call_args[filter_idx]
+        assert "-skip_frame" not in call_args
+
+    @patch("frigate_tools.timelapse.get_video_info")
+    @patch("subprocess.Popen")
+    def test_hw_init_failure_disables_hwaccel(self, mock_popen, mock_info, tmp_path, monkeypatch):
+        """A device init failure falls back to software and stops later HW attempts."""
+        import frigate_tools.timelapse as timelapse_module
+
+        monkeypatch.setattr(timelapse_module, "_hwaccel_cache", HWAccel.VAAPI)
+        mock_info.return_value = (600.0, 30.0, "h264")
+        failed, succeeded = MagicMock(returncode=1), MagicMock(returncode=0)
+        failed.stdout = _pipe(b"")
+        failed.stderr = _pipe(b"Device creation failed: -5.\n")
+        succeeded.stdout = _pipe(b"")
+        succeeded.stderr = _pipe(b"")
+        mock_popen.side_effect = [failed, succeeded]
+
+        result = encode_timelapse(tmp_path / "input.mp4", tmp_path / "output.mp4", target_duration=60.0)
+
+        assert result is True
+        assert "h264_vaapi" in mock_popen.call_args_list[0][0][0]
+        assert "h264_vaapi" not in mock_popen.call_args_list[1][0][0]
+        assert get_hwaccel() == HWAccel.NONE
+
+    @patch("frigate_tools.timelapse.get_video_info")
+    @patch("subprocess.Popen")
+    def test_fractional_speed_keeps_target_duration(self, mock_popen, mock_info, tmp_path):
+        """A non-integer speedup still rescales timestamps to target_duration."""
+        mock_info.return_value = (290.0, 30.0, "h264")  # 2.9x speedup
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
+        mock_popen.return_value = mock_process
+
+        encode_timelapse(
+            tmp_path / "input.mp4", tmp_path / "output.mp4",
+            target_duration=100.0, hwaccel=HWAccel.NONE,
+        )
+
+        call_args = mock_popen.call_args[0][0]
+        select, _, setpts = call_args[call_args.index("-vf") + 1].rpartition(",")
+        assert select == "select='not(mod(n,2))'"
+        # Selected frames keep their source timestamps, so dividing by the
+        # exact speed maps the 290s source onto 100s of output
+        assert 290.0 / float(setpts.removeprefix("setpts=PTS/")) == pytest.approx(100.0)
+
+    @patch("frigate_tools.timelapse.get_video_info")
+    @patch("subprocess.Popen")
+    def test_software_encode_sets_threads(self, mock_popen, mock_info, tmp_path):
+        """Software encoding passes an explicit -threads count."""
+        mock_info.return_value = (600.0, 30.0, "h264")
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
+        mock_popen.return_value = mock_process
+
+        with patch("os.cpu_count", return_value=12):
+            encode_timelapse(
+                tmp_path / "input.mp4", tmp_path / "output.mp4",
+                target_duration=60.0, hwaccel=HWAccel.NONE,
+            )
+        call_args = mock_popen.call_args[0][0]
+        assert call_args[call_args.index("-threads") + 1] == "12"
+
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
+        encode_timelapse(
+            tmp_path / "input.mp4", tmp_path / "output.mp4",
+            target_duration=60.0, hwaccel=HWAccel.NONE, threads=3,
+        )
+        call_args = mock_popen.call_args[0][0]
+        assert call_args[call_args.index("-threads") + 1] == "3"
+
+    @patch("frigate_tools.timelapse.get_video_info")
+    @patch("subprocess.Popen")
+    def test_encode_high_speedup_decodes_keyframes_only(self, mock_popen, mock_info, tmp_path):
+        """Skips non-keyframes when each output frame spans a GOP or more."""
+        mock_info.return_value = (3600.0, 30.0, "h264")
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
+        mock_popen.return_value = mock_process
+
+        encode_timelapse(
+            tmp_path / "input.mp4", tmp_path / "output.mp4",
+            target_duration=12.0, hwaccel=HWAccel.NONE,
+        )
+
+        call_args = mock_popen.call_args[0][0]
+        input_idx = call_args.index("-i")
+        assert call_args[input_idx - 2:input_idx] == ["-skip_frame", "nokey"]
+        assert call_args[call_args.index("-vf") + 1] == "setpts=PTS/300.0"
+
+    @patch("frigate_tools.timelapse.get_video_info")
+    @patch("subprocess.Popen")
+    def test_long_gop_keeps_decoding_all_frames(
+        self, mock_popen, mock_info, keyframe_rate, tmp_path
+    ):
+        """Keyframes-only decode waits until each output frame spans a whole GOP."""
+        mock_info.return_value = (3600.0, 30.0, "h264")
+        keyframe_rate.return_value = 0.25  # one keyframe every 4 seconds
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
+        mock_popen.return_value = mock_process
+
+        # 60x at 30fps: each output frame spans 2s, shorter than the GOP
+        encode_timelapse(
+            tmp_path / "input.mp4", tmp_path / "output.mp4",
+            target_duration=60.0, hwaccel=HWAccel.NONE,
+        )
+        call_args = mock_popen.call_args[0][0]
+        assert "-skip_frame" not in call_args
+        assert call_args[call_args.index("-vf") + 1].startswith("select=")
+
+        # 150x: each output frame spans 5s, so keyframes alone suffice
+        encode_timelapse(
+            tmp_path / "input.mp4", tmp_path / "output.mp4",
+            target_duration=24.0, hwaccel=HWAccel.NONE,
+        )
+        call_args = mock_popen.call_args[0][0]
+        assert "-skip_frame" in call_args
+
+    @patch("frigate_tools.timelapse.get_video_info")
+    @patch("frigate_tools.timelapse.qsv_low_power_supported", return_value=True)
+    @patch("subprocess.Popen")
+    def test_qsv_decodes_on_gpu(self, mock_popen, mock_low_power, mock_info, tmp_path):
+        """QSV path selects the QSV decoder and binds filters to the device."""
+        mock_info.return_value = (600.0, 30.0, "hevc")
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
+        mock_popen.return_value = mock_process
+
+        encode_timelapse(
+            tmp_path / "input.mp4", tmp_path / "output.mp4",
+            target_duration=60.0, hwaccel=HWAccel.QSV,
+        )
+
+        call_args = mock_popen.call_args[0][0]
+        input_idx = call_args.index("-i")
+        assert call_args[call_args.index("-filter_hw_device") + 1] == "hw"
+        assert call_args[input_idx - 2:input_idx] == ["-c:v", "hevc_qsv"]
+        assert call_args[call_args.index("-low_power") + 1] == "1"
+        assert call_args[call_args.index("-async_depth") + 1] == "4"
+
+    @patch("frigate_tools.timelapse.get_video_info")
+    @patch("subprocess.Popen")
+    def test_vaapi_keeps_frames_on_gpu(self, mock_popen, mock_info, tmp_path):
+        """VAAPI path selects frames, then converts with scale_vaapi."""
+        mock_info.return_value = (600.0, 30.0, "h264")
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
+        mock_popen.return_value = mock_process
+
+        encode_timelapse(
+            tmp_path / "input.mp4", tmp_path / "output.mp4",
+            target_duration=60.0, hwaccel=HWAccel.VAAPI,
+        )
+
+        call_args = mock_popen.call_args[0][0]
+        assert call_args[call_args.index("-vf") + 1] == (
+            "select='not(mod(n,10))',setpts=PTS/10.0,scale_vaapi=format=nv12"
+        )
+        assert call_args[call_args.index("-c:v") + 1] == "h264_vaapi"
+
+    @patch("frigate_tools.timelapse.get_video_info")
+    @patch("subprocess.Popen")
+    def test_encode_file_list_reads_through_concat_demuxer(self, mock_popen, mock_info, tmp_path):
+        """A list of inputs is encoded in one run via a temporary concat list."""
+        mock_info.return_value = (10.0, 30.0, "h264")
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
+        mock_popen.return_value = mock_process
+
+        input_files = [tmp_path / "a.mp4", tmp_path / "b.mp4", tmp_path / "c.mp4"]
+        result = encode_timelapse(
+            input_files, tmp_path / "output.mp4", target_duration=10.0, hwaccel=HWAccel.NONE
+        )
+
+        assert result is True
+        mock_popen.assert_called_once()
+        call_args = mock_popen.call_args[0][0]
+        input_idx = call_args.index("-i")
+        assert call_args[input_idx - 4:input_idx] == ["-f", "concat", "-safe", "0"]
+        # 30s of source into 10s is 3x
+        assert "not(mod(n,3))" in call_args[call_args.index("-vf") + 1]
+        assert not Path(call_args[input_idx + 1]).exists()
 
     @patch("frigate_tools.timelapse.get_video_info")
     def test_encode_fails_without_duration(self, mock_info, tmp_path):
         """Returns False when source duration cannot be determined."""
-        mock_info.return_value = (0.0, 0.0)
+        mock_info.return_value = (0.0, 0.0, "")
 
         input_path = tmp_path / "input.mp4"
         input_path.touch()
@@ -425,15 +968,14 @@ class TestEncodeTimelapse:
     @patch("subprocess.Popen")
     def test_encode_with_progress_callback(self, mock_popen, mock_info, tmp_path):
         """Calls progress callback with updates."""
-        mock_info.return_value = (100.0, 30.0)
+        mock_info.return_value = (100.0, 30.0, "h264")
         mock_process = MagicMock()
         mock_process.returncode = 0
-        mock_process.stdout = iter([
-            "frame=  50 fps= 30 time=00:00:05.00 speed=1.00x\n",
-            "frame= 100 fps= 30 time=00:00:10.00 speed=1.00x\n",
-        ])
-        mock_process.stderr = MagicMock()
-        mock_process.stderr.read.return_value = ""
+        mock_process.stdout = _pipe(
+            b"frame=  50 fps= 30 time=00:00:05.00 speed=1.00x\n"
+            b"frame= 100 fps= 30 time=00:00:10.00 speed=1.00x"
+        )
+        mock_process.stderr = _pipe(b"")
         mock_popen.return_value = mock_process
 
         callback = MagicMock()
@@ -462,12 +1004,11 @@ class TestCreateTimelapse:
     @patch("frigate_tools.timelapse.encode_timelapse")
     @patch("frigate_tools.timelapse.concat_files")
     @patch("frigate_tools.timelapse.get_video_duration")
-    def test_create_timelapse_low_speedup_uses_concat(
+    def test_create_timelapse_low_speedup_encodes_files_directly(
         self, mock_duration, mock_concat, mock_encode, tmp_path
     ):
-        """Low speedup (<30x) uses concat + encode approach."""
+        """Low speedup (<30x) encodes the input files without a concat intermediate."""
         mock_duration.return_value = 5.0  # 5 seconds per file
-        mock_concat.return_value = True
         mock_encode.return_value = True
 
         input_files = [tmp_path / "a.mp4", tmp_path / "b.mp4"]
@@ -479,33 +1020,18 @@ class TestCreateTimelapse:
         result = create_timelapse(input_files, output_path, target_duration=60.0)
 
         assert result is True
-        mock_concat.assert_called_once()
+        mock_concat.assert_not_called()
         mock_encode.assert_called_once()
-
-    @patch("frigate_tools.timelapse.concat_files")
-    @patch("frigate_tools.timelapse.get_video_duration")
-    def test_create_timelapse_fails_on_concat_failure(
-        self, mock_duration, mock_concat, tmp_path
-    ):
-        """Returns False when concat fails (low speedup path)."""
-        mock_duration.return_value = 5.0
-        mock_concat.return_value = False
-
-        input_files = [tmp_path / "a.mp4"]
-        input_files[0].touch()
-
-        result = create_timelapse(input_files, tmp_path / "output.mp4", target_duration=60.0)
-        assert result is False
+        assert mock_encode.call_args[0][0] == input_files
+        assert not (tmp_path / ".output_concat.mp4").exists()
 
     @patch("frigate_tools.timelapse.encode_timelapse")
-    @patch("frigate_tools.timelapse.concat_files")
     @patch("frigate_tools.timelapse.get_video_duration")
     def test_create_timelapse_fails_on_encode_failure(
-        self, mock_duration, mock_concat, mock_encode, tmp_path
+        self, mock_duration, mock_encode, tmp_path
     ):
         """Returns False when encode fails (low speedup path)."""
         mock_duration.return_value = 5.0
-        mock_concat.return_value = True
         mock_encode.return_value = False
 
         input_files = [tmp_path / "a.mp4"]
@@ -514,53 +1040,6 @@ class TestCreateTimelapse:
         result = create_timelapse(input_files, tmp_path / "output.mp4", target_duration=60.0)
         assert result is False
 
-    @patch("frigate_tools.timelapse.encode_timelapse")
-    @patch("frigate_tools.timelapse.concat_files")
-    @patch("frigate_tools.timelapse.get_video_duration")
-    def test_create_timelapse_cleans_temp_file(
-        self, mock_duration, mock_concat, mock_encode, tmp_path
-    ):
-        """Removes temporary concat file after completion."""
-        mock_duration.return_value = 5.0
-        mock_concat.return_value = True
-        mock_encode.return_value = True
-
-        input_files = [tmp_path / "a.mp4"]
-        input_files[0].touch()
-
-        output_path = tmp_path / "output.mp4"
-        create_timelapse(input_files, output_path, target_duration=60.0)
-
-        # Temp file should be cleaned up
-        temp_file = tmp_path / ".output_concat.mp4"
-        assert not temp_file.exists()
-
-    @patch("frigate_tools.timelapse.encode_timelapse")
-    @patch("frigate_tools.timelapse.concat_files")
-    @patch("frigate_tools.timelapse.get_video_duration")
-    def test_create_timelapse_keeps_temp_when_requested(
-        self, mock_duration, mock_concat, mock_encode, tmp_path
-    ):
-        """Keeps temp file when keep_temp=True."""
-        mock_duration.return_value = 5.0
-
-        # Create actual temp file to test preservation
-        def create_temp(files, output, *args, **kwargs):
-            output.touch()
-            return True
-
-        mock_concat.side_effect = create_temp
-        mock_encode.return_value = True
-
-        input_files = [tmp_path / "a.mp4"]
-        input_files[0].touch()
-
-        output_path = tmp_path / "output.mp4"
-        create_timelapse(input_files, output_path, target_duration=60.0, keep_temp=True)
-
-        # When keep_temp=True, we don't delete, but the mock creates the file
-        # at a different path, so this test mainly verifies the flag is passed
-
     @patch("frigate_tools.timelapse.encode_frames_to_video")
     @patch("frigate_tools.timelapse.extract_keyframes_parallel")
     @patch("frigate_tools.timelapse.get_video_duration")
@@ -593,11 +1072,490 @@ class TestCreateTimelapse:
         result = create_timelapse(input_files, output_path, target_duration=15.0)
 
         assert result is True
-        # Frame extraction should be called
+        # Frame extraction should be called, keeping ~every 4th keyframe
+        # (200 files * 10 keyframes for 450 frames)
         mock_extract.assert_called_once()
+        assert mock_extract.call_args[1]["frame_interval"] == 4
         # Encoding should be called with the extracted frames
         mock_encode.assert_called_once()
 
+    @patch("frigate_tools.timelapse.encode_frames_to_video", return_value=True)
+    @patch("frigate_tools.timelapse.extract_keyframes_parallel")
+    def test_high_speedup_streams_keyframes_without_temp_frames(
+        self, mock_extract, mock_encode, tmp_path
+    ):
+        """One frame per sampled file is piped to the encoder, not extracted to disk."""
+        from frigate_tools.timelapse import SourceKeyframe, _create_timelapse_frames
+
+        input_files = [tmp_path / f"{i}.mp4" for i in range(100)]
+        result = _create_timelapse_frames(
+            input_files, tmp_path / "output.mp4",
+            target_duration=1.0, source_duration=1000.0, hwaccel=HWAccel.NONE,
+        )
+
+        assert result is True
+        mock_extract.assert_not_called()
+        frames = mock_encode.call_args[0][0]
+        assert len(frames) == 30
+        assert frames[0] == SourceKeyframe(input_files[0])
+        assert frames[-1] == SourceKeyframe(input_files[-1])
+
+    @patch("frigate_tools.timelapse.get_keyframe_rate", return_value=1.0)
+    @patch("subprocess.Popen")
+    def test_bsf_default_is_single_keyframe_pass(self, mock_popen, mock_rate, tmp_path):
+        """Keyframe timelapse runs one ffmpeg over the concat list, no intermediate."""
+        from frigate_tools.timelapse import _create_timelapse_bsf
+
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
+        mock_popen.return_value = mock_process
+
+        # 60 files ~ 600 keyframes; 10s at 30fps needs 300 -> every 2nd keyframe
+        input_files = [tmp_path / f"{i}.mp4" for i in range(60)]
+        result = _create_timelapse_bsf(
+            input_files, tmp_path / "output.mp4",
+            target_duration=10.0, source_duration=600.0, hwaccel=HWAccel.NONE,
+        )
+
+        assert result is True
+        mock_popen.assert_called_once()
+        call_args = mock_popen.call_args[0][0]
+        assert call_args[call_args.index("-skip_frame") + 1] == "nokey"
+        assert call_args[call_args.index("-f") + 1] == "concat"
+        assert "not(mod(n,2))" in call_args[call_args.index("-vf") + 1]
+        assert not (tmp_path / ".output_concat.mp4").exists()
+
+
+    @patch("frigate_tools.timelapse.get_keyframe_rate", return_value=1.0)
+    @patch("subprocess.Popen")
+    def test_bsf_stream_copies_sampled_files_when_enough(self, mock_popen, mock_rate, tmp_path):
+        """With a file per output frame, every Nth file's first frame is copied."""
+        from frigate_tools.timelapse import _create_timelapse_bsf
+
+        concat_lists = []
+
+        def fake_popen(cmd, **kwargs):
+            concat_lists.append(Path(cmd[cmd.index("-i") + 1]).read_text())
+            process = MagicMock()
+            process.returncode = 0
+            process.stdout = _pipe(b"")
+            process.stderr = _pipe(b"")
+            return process
+
+        mock_popen.side_effect = fake_popen
+        # 1s at 30fps needs 30 frames from 90 files -> every 3rd file
+        input_files = [tmp_path / f"{i:03d}.mp4" for i in range(90)]
+        result = _create_timelapse_bsf(
+            input_files, tmp_path / "output.mp4",
+            target_duration=1.0, source_duration=900.0, hwaccel=HWAccel.NONE,
+        )
+
+        assert result is True
+        call_args = mock_popen.call_args[0][0]
+        assert call_args[call_args.index("-c") + 1] == "copy"
+        assert "-vf" not in call_args
+        lines = concat_lists[0].splitlines()
+        assert lines[0] == f"file '{input_files[0]}'"
+        assert lines[1] == f"outpoint {1 / 30}"
+        assert lines[2] == f"file '{input_files[3]}'"
+        assert len(lines) == 60
+
+    @patch("frigate_tools.timelapse.get_keyframe_rate", return_value=1.0)
+    @patch("subprocess.Popen")
+    def test_bsf_stream_copy_samples_whole_range(self, mock_popen, mock_rate, tmp_path):
+        """Sampling spans first to last file when counts don't divide evenly."""
+        from frigate_tools.timelapse import _create_timelapse_bsf
+
+        concat_lists = []
+
+        def fake_popen(cmd, **kwargs):
+            concat_lists.append(Path(cmd[cmd.index("-i") + 1]).read_text())
+            process = MagicMock()
+            process.returncode = 0
+            process.stdout = _pipe(b"")
+            process.stderr = _pipe(b"")
+            return process
+
+        mock_popen.side_effect = fake_popen
+        # 1s at 30fps needs 30 frames from 45 files
+        input_files = [tmp_path / f"{i:03d}.mp4" for i in range(45)]
+        result = _create_timelapse_bsf(
+            input_files, tmp_path / "output.mp4",
+            target_duration=1.0, source_duration=450.0, hwaccel=HWAccel.NONE,
+        )
+
+        assert result is True
+        files = [line for line in concat_lists[0].splitlines() if line.startswith("file ")]
+        assert len(files) == 30
+        assert files[0] == f"file '{input_files[0]}'"
+        assert files[-1] == f"file '{input_files[-1]}'"
+
+    @patch("frigate_tools.timelapse.get_video_info", return_value=(10.0, 30.0, "h264"))
+    @patch("subprocess.Popen")
+    def test_bsf_pass1_reports_ffmpeg_progress(self, mock_popen, mock_info, tmp_path):
+        """Two-pass concat progress comes from -progress, scaled into 5-85%."""
+        from frigate_tools.timelapse import _bsf_pass1_concat
+
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"out_time=00:00:10.000000\nprogress=end\n")
+        mock_process.stderr = _pipe(b"")
+        mock_popen.return_value = mock_process
+        output = tmp_path / "concat.mp4"
+        output.touch()
+        updates = []
+
+        result = _bsf_pass1_concat(
+            [tmp_path / "a.mp4", tmp_path / "b.mp4"], output, progress_callback=updates.append
+        )
+
+        assert result is True
+        assert "pipe:1" in mock_popen.call_args[0][0]
+        assert [u.percent for u in updates] == [pytest.approx(45.0)]
+        assert updates[0].frame == 1
+
+    @patch("frigate_tools.timelapse.BSF_GROUP_SIZE", 2)
+    @patch("frigate_tools.timelapse.BSF_GROUP_THRESHOLD", 4)
+    @patch("frigate_tools.timelapse._concat_batch")
+    def test_bsf_pass1_concats_long_lists_in_groups(self, mock_concat, tmp_path):
+        """Long lists are concatenated as parallel groups, then joined."""
+        from frigate_tools.timelapse import _bsf_pass1_concat
+
+        output = tmp_path / "concat.mp4"
+
+        def fake_concat(files, out, *args, **kwargs):
+            out.touch()
+            return True
+
+        mock_concat.side_effect = fake_concat
+        input_files = [tmp_path / f"{i}.mp4" for i in range(5)]
+        updates = []
+
+        assert _bsf_pass1_concat(input_files, output, progress_callback=updates.append)
+
+        group_calls = [c[0][0] for c in mock_concat.call_args_list[:-1]]
+        assert sorted(group_calls) == [input_files[0:2], input_files[2:4], input_files[4:5]]
+        final_inputs, final_output = mock_concat.call_args_list[-1][0]
+        assert [p.name for p in final_inputs] == ["group_0000.mp4", "group_0001.mp4", "group_0002.mp4"]
+        assert final_output == output
+        assert updates[-1].percent == 85.0
+        assert list(tmp_path.iterdir()) == [output]
+
+    @patch("frigate_tools.timelapse.get_keyframe_rate", return_value=1.0)
+    @patch("subprocess.Popen")
+    def test_bsf_vaapi_keeps_surfaces_on_gpu(self, mock_popen, mock_rate, tmp_path):
+        """VAAPI keyframe pass decodes to VAAPI surfaces and encodes them directly."""
+        from frigate_tools.timelapse import _create_timelapse_bsf
+
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
+        mock_popen.return_value = mock_process
+
+        _create_timelapse_bsf(
+            [tmp_path / "a.mp4"], tmp_path / "output.mp4",
+            target_duration=1.0, source_duration=60.0, hwaccel=HWAccel.VAAPI,
+        )
+
+        call_args = mock_popen.call_args[0][0]
+        assert call_args[call_args.index("-hwaccel_output_format") + 1] == "vaapi"
+        assert call_args[call_args.index("-vf") + 1].endswith(",scale_vaapi=format=nv12")
+        assert "hwupload" not in " ".join(call_args)
+        assert call_args[call_args.index("-c:v") + 1] == "h264_vaapi"
+
+    @patch("frigate_tools.timelapse.get_keyframe_rate", return_value=1.0)
+    @patch("subprocess.Popen")
+    def test_bsf_rejects_too_few_keyframes(self, mock_popen, mock_rate, tmp_path):
+        """A low speedup with fewer keyframes than output frames is refused."""
+        from frigate_tools.timelapse import _create_timelapse_bsf
+
+        # 5x: 60 files x 10s give ~600 keyframes for 120s at 30fps (3600 frames)
+        input_files = [tmp_path / f"{i:03d}.mp4" for i in range(60)]
+        for two_pass in (False, True):
+            assert _create_timelapse_bsf(
+                input_files, tmp_path / "output.mp4",
+                target_duration=120.0, source_duration=600.0,
+                two_pass=two_pass, hwaccel=HWAccel.NONE,
+            ) is False
+        mock_popen.assert_not_called()
+
+
+class TestExtractKeyframesParallel:
+    """Tests for parallel keyframe extraction."""
+
+    @patch("subprocess.run")
+    def test_extracts_first_frame_per_file_in_order(self, mock_run, tmp_path):
+        """Returns one frame per file, ordered like the inputs."""
+        def fake_ffmpeg(cmd, **kwargs):
+            Path(cmd[-1]).touch()
+            return MagicMock(returncode=0, stderr="")
+
+        mock_run.side_effect = fake_ffmpeg
+        files = [tmp_path / f"{i}.mp4" for i in range(5)]
+        progress = []
+
+        frames = extract_keyframes_parallel(
+            files, tmp_path / "frames",
+            progress_callback=lambda done, total: progress.append((done, total)),
+        )
+
+        assert [f.name for f in frames] == [f"{i:06d}_0001.jpg" for i in range(5)]
+        assert progress[-1] == (5, 5)
+
+    @patch("frigate_tools.timelapse.get_video_info", return_value=(10.0, 30.0, "h264"))
+    @patch("subprocess.run")
+    def test_extract_all_uses_single_concat_run(self, mock_run, mock_info, tmp_path):
+        """All keyframes from same-codec files come from one ffmpeg run."""
+        output_dir = tmp_path / "frames"
+
+        def fake_ffmpeg(cmd, **kwargs):
+            assert cmd[cmd.index("-f") + 1] == "concat"
+            assert cmd[cmd.index("-vf") + 1] == "select='not(mod(n,3))'"
+            for n in range(1, 4):
+                (output_dir / f"{n:06d}.jpg").touch()
+            return MagicMock(returncode=0, stderr="")
+
+        mock_run.side_effect = fake_ffmpeg
+        files = [tmp_path / f"{i}.mp4" for i in range(3)]
+
+        frames = extract_keyframes_parallel(files, output_dir, extract_all=True, frame_interval=3)
+
+        mock_run.assert_called_once()
+        assert [f.name for f in frames] == ["000001.jpg", "000002.jpg", "000003.jpg"]
+
+    @patch("frigate_tools.timelapse.get_video_info")
+    @patch("subprocess.run")
+    def test_extract_all_mixed_codecs_runs_per_file(self, mock_run, mock_info, tmp_path):
+        """Files with different codecs are extracted one ffmpeg per file."""
+        mock_info.side_effect = [(10.0, 30.0, "h264"), (10.0, 30.0, "hevc")]
+        mock_run.return_value = MagicMock(returncode=0, stderr="")
+        files = [tmp_path / f"{i}.mp4" for i in range(3)]
+
+        extract_keyframes_parallel(files, tmp_path / "frames", extract_all=True)
+
+        assert mock_run.call_count == 3
+        for call in mock_run.call_args_list:
+            assert "concat" not in call[0][0]
+
+    @patch("frigate_tools.timelapse.get_video_info")
+    @patch("subprocess.run")
+    def test_extract_all_per_file_collects_numbered_frames(self, mock_run, mock_info, tmp_path):
+        """Per-file extraction picks up each file's consecutively numbered frames."""
+        mock_info.side_effect = [(10.0, 30.0, "h264"), (10.0, 30.0, "hevc")]
+
+        def fake_ffmpeg(cmd, **kwargs):
+            for n in range(1, 4):
+                Path(cmd[-1].replace("%04d", f"{n:04d}")).touch()
+            return MagicMock(returncode=0, stderr="")
+
+        mock_run.side_effect = fake_ffmpeg
+        files = [tmp_path / f"{i}.mp4" for i in range(2)]
+
+        frames = extract_keyframes_parallel(files, tmp_path / "frames", extract_all=True)
+
+        assert [f.name for f in frames] == [
+            f"{i:06d}_{n:04d}.jpg" for i in range(2) for n in range(1, 4)
+        ]
+
+    @patch("subprocess.run")
+    def test_skips_failed_files(self, mock_run, tmp_path):
+        """Files whose ffmpeg run fails contribute no frames."""
+        mock_run.return_value = MagicMock(returncode=1, stderr="boom")
+
+        frames = extract_keyframes_parallel([tmp_path / "a.mp4"], tmp_path / "frames")
+        assert len(frames) == 0
+
+    def test_frame_list_slices_stay_compact(self, tmp_path):
+        """Slicing a FrameList keeps packed numbers and builds paths on access."""
+        from array import array
+
+        from frigate_tools.timelapse import FrameList
+
+        frames = FrameList(str(tmp_path), array("I", [1, 2, 1, 2]), array("I", [0, 0, 1, 1]))
+
+        sampled = frames[::2]
+        assert isinstance(sampled, FrameList)
+        assert list(sampled) == [tmp_path / "000000_0001.jpg", tmp_path / "000001_0001.jpg"]
+        assert frames[-1] == tmp_path / "000001_0002.jpg"
+
+
+class TestSourceKeyframe:
+    """Tests for on-demand keyframe extraction."""
+
+    @patch("subprocess.run")
+    def test_returns_jpeg_from_stdout(self, mock_run, tmp_path):
+        """The first keyframe is written as MJPEG to stdout and returned."""
+        from frigate_tools.timelapse import SourceKeyframe
+
+        mock_run.return_value = MagicMock(returncode=0, stdout=b"\xff\xd8jpeg")
+
+        assert SourceKeyframe(tmp_path / "a.mp4").read_bytes() == b"\xff\xd8jpeg"
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("-f") + 1] == "mjpeg"
+        assert cmd[-1] == "pipe:1"
+
+    @patch("subprocess.run")
+    def test_failure_skips_frame(self, mock_run, tmp_path):
+        """A file that fails to decode yields no bytes rather than raising."""
+        from frigate_tools.timelapse import SourceKeyframe
+
+        mock_run.return_value = MagicMock(returncode=1, stdout=b"", stderr=b"corrupt")
+
+        assert SourceKeyframe(tmp_path / "a.mp4").read_bytes() == b""
+
+
+class TestEncodeFramesToVideo:
+    """Tests for encoding extracted frames."""
+
+    @patch("subprocess.Popen")
+    def test_streams_frames_through_stdin(self, mock_popen, tmp_path):
+        """Frame bytes are piped to ffmpeg in order as an image2pipe input."""
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
+        mock_popen.return_value = mock_process
+
+        frames = [tmp_path / f"{i:06d}.jpg" for i in range(3)]
+        for i, frame in enumerate(frames):
+            frame.write_bytes(f"jpeg{i}".encode())
+
+        result = encode_frames_to_video(frames, tmp_path / "out.mp4", hwaccel=HWAccel.NONE)
+
+        assert result is True
+        call_args = mock_popen.call_args[0][0]
+        assert call_args[call_args.index("-f") + 1] == "image2pipe"
+        assert call_args[call_args.index("-i") + 1] == "pipe:0"
+        written = [c[0][0] for c in mock_process.stdin.write.call_args_list]
+        assert written == [b"jpeg0", b"jpeg1", b"jpeg2"]
+        mock_process.stdin.close.assert_called_once()
+
+    @patch("subprocess.Popen")
+    def test_software_segments_encode_in_parallel_then_concat(self, mock_popen, tmp_path):
+        """Software encodes split frames into segments and stream-copy them together."""
+        def fake_popen(cmd, **kwargs):
+            process = MagicMock()
+            process.returncode = 0
+            process.stdout = _pipe(b"")
+            process.stderr = _pipe(b"")
+            process.communicate.return_value = ("", "")
+            return process
+
+        mock_popen.side_effect = fake_popen
+        frames = [tmp_path / f"{i:06d}.jpg" for i in range(6)]
+        for frame in frames:
+            frame.write_bytes(b"jpeg")
+
+        result = encode_frames_to_video(frames, tmp_path / "out.mp4", segments=3)
+
+        assert result is True
+        commands = [c[0][0] for c in mock_popen.call_args_list]
+        encodes = [cmd for cmd in commands if "image2pipe" in cmd]
+        concats = [cmd for cmd in commands if "concat" in cmd]
+        assert len(encodes) == 3
+        assert len(concats) == 1
+        assert concats[0][concats[0].index("-c") + 1] == "copy"
+        assert concats[0][-1] == str(tmp_path / "out.mp4")
+        # Segment files are cleaned up afterwards
+        assert not any(p.is_dir() for p in tmp_path.iterdir())
+
+    @patch("frigate_tools.timelapse.qsv_low_power_supported", return_value=False)
+    @patch("frigate_tools.timelapse._hw_encoder_usable", return_value=True)
+    @patch("frigate_tools.timelapse.has_ffmpeg_decoder", return_value=True)
+    @patch("subprocess.Popen")
+    def test_qsv_decodes_jpegs_on_gpu(
+        self, mock_popen, mock_decoder, mock_usable, mock_low_power, tmp_path
+    ):
+        """QSV uses mjpeg_qsv with QSV surfaces when the decoder is available."""
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
+        mock_popen.return_value = mock_process
+        frame = tmp_path / "000001.jpg"
+        frame.write_bytes(b"jpeg")
+
+        encode_frames_to_video([frame], tmp_path / "out.mp4", hwaccel=HWAccel.QSV)
+
+        call_args = mock_popen.call_args[0][0]
+        input_idx = call_args.index("-i")
+        assert call_args[input_idx - 2:input_idx] == ["-c:v", "mjpeg_qsv"]
+        assert call_args[call_args.index("-hwaccel_output_format") + 1] == "qsv"
+        # A software pixel format would force a conversion of the QSV surfaces
+        assert "-pix_fmt" not in call_args
+        mock_decoder.assert_called_with("mjpeg_qsv")
+
+    @patch("subprocess.Popen")
+    def test_numbered_run_uses_image2_demuxer(self, mock_popen, tmp_path):
+        """An unbroken %06d.jpg run is read by ffmpeg directly, not piped."""
+        from array import array
+
+        from frigate_tools.timelapse import FrameList
+
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
+        mock_popen.return_value = mock_process
+        frames = FrameList(str(tmp_path), array("I", range(1, 11)))[2:6]
+
+        assert encode_frames_to_video(frames, tmp_path / "out.mp4", hwaccel=HWAccel.NONE)
+
+        call_args = mock_popen.call_args[0][0]
+        assert call_args[call_args.index("-i") + 1] == f"{tmp_path}/%06d.jpg"
+        assert call_args[call_args.index("-start_number") + 1] == "3"
+        assert call_args[call_args.index("-frames:v") + 1] == "4"
+        assert call_args[call_args.index("-movflags") + 1] == "+faststart"
+        assert "-nostats" in call_args
+        assert call_args[call_args.index("-loglevel") + 1] == "error"
+        assert mock_popen.call_args[1]["stdin"] == subprocess.DEVNULL
+        mock_process.stdin.write.assert_not_called()
+
+    @patch("frigate_tools.timelapse.has_ffmpeg_encoder", return_value=False)
+    @patch("os.path.exists", return_value=True)
+    @patch("subprocess.Popen")
+    def test_unavailable_hw_encoder_goes_straight_to_software(
+        self, mock_popen, mock_exists, mock_encoder, tmp_path
+    ):
+        """A hardware encoder ffmpeg lacks is skipped without a failing attempt."""
+        from frigate_tools.timelapse import _hw_encoder_usable
+
+        _hw_encoder_usable.cache_clear()
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
+        mock_popen.return_value = mock_process
+        frame = tmp_path / "000001.jpg"
+        frame.write_bytes(b"jpeg")
+
+        encode_frames_to_video([frame], tmp_path / "out.mp4", hwaccel=HWAccel.VAAPI)
+        _hw_encoder_usable.cache_clear()
+
+        mock_popen.assert_called_once()
+        call_args = mock_popen.call_args[0][0]
+        assert call_args[call_args.index("-c:v", call_args.index("-i")) + 1] == "libx264"
+        mock_encoder.assert_called_once_with("h264_vaapi")
+
+    @patch("subprocess.Popen")
+    def test_missing_frame_fails(self, mock_popen, tmp_path):
+        """An unreadable frame fails the encode instead of truncating it."""
+        mock_process = MagicMock()
+        mock_process.returncode = 0
+        mock_process.stdout = _pipe(b"")
+        mock_process.stderr = _pipe(b"")
+        mock_popen.return_value = mock_process
+
+        result = encode_frames_to_video(
+            [tmp_path / "missing.jpg"], tmp_path / "out.mp4", hwaccel=HWAccel.NONE
+        )
+
+        assert result is False
+        mock_process.stdin.close.assert_called_once()
+
 
 @pytest.mark.skipif(not ffmpeg_available(), reason="ffmpeg not available")
 class TestTimelapseIntegration:
@@ -643,6 +1601,29 @@ class TestTimelapseIntegration:
         # Should be approximately 2 seconds
         assert 1.9 <= duration <= 2.1
 
+    def test_mp4_frame_rate_matches_ffprobe(self, create_test_videos):
+        """The moov-box frame rate matches ffprobe's r_frame_rate."""
+        from frigate_tools.timelapse import _mp4_video_info
+
+        files = create_test_videos(count=1, duration=2.0)
+        result = subprocess.run(
+            [
+                "ffprobe", "-v", "error",
+                "-select_streams", "v:0",
+                "-show_entries", "stream=r_frame_rate",
+                "-of", "default=noprint_wrappers=1:nokey=1",
+                str(files[0]),
+            ],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        num, _, den = result.stdout.strip().partition("/")
+
+        info = _mp4_video_info(files[0])
+        assert info is not None
+        assert info[1] == pytest.approx(int(num) / int(den or 1))
+
     def test_concat_files_real_videos(self, create_test_videos, tmp_path):
         """concat_files concatenates real video files."""
         files = create_test_videos(count=3, duration=1.0)
@@ -699,6 +1680,23 @@ class TestTimelapseIntegration:
         duration = get_video_duration(output)
         assert 0.8 <= duration <= 1.2
 
+    def test_encode_timelapse_fractional_speed(self, create_test_videos, tmp_path):
+        """A 2.9x speedup produces target_duration, not source / int(speed)."""
+        files = create_test_videos(count=1, duration=2.9)
+        output = tmp_path / "timelapse.mp4"
+
+        result = encode_timelapse(
+            input_path=files[0],
+            output_path=output,
+            target_duration=1.0,
+            preset="ultrafast",
+            hwaccel=HWAccel.NONE,
+        )
+
+        assert result is True
+        # Truncating the speed to 2 would give ~1.45 seconds
+        assert 0.85 <= get_video_duration(output) <= 1.15
+
     def test_create_timelapse_full_pipeline(self, create_test_videos, tmp_path):
         """create_timelapse works end-to-end with real files."""
         # Create 5 x 1-second videos = 5 seconds total